@@ -1,32 +1,18 @@
-import os
-import time
 import streamlit as st
-from pymongo import MongoClient
+from comun.accesos import registrar_acceso
+from comun.precalentado import mostrar_precalentado
 
 st.set_page_config(page_title="Dashboard SDS", layout="wide")
 
-# Cargar variables desde "Secrets" Streamlit
-MONGO_URI = st.secrets["MONGO_URI"]
-DATABASE_NAME = st.secrets["DATABASE_NAME"]
-
-# Conectar a MongoDB
-client = MongoClient(MONGO_URI)
-db = client[DATABASE_NAME]
-logs_collection = db["ACCESS_LOGS"]
-
-# En Streamlit Cloud, st.experimental_user.email 
-if hasattr(st, "experimental_user") and st.experimental_user:
-    user_email = st.experimental_user.email or "unknown"
-else:
-    user_email = "anonymous"
-
-# —————— Insertar registro de acceso ——————
-logs_collection.insert_one({
-    "user_email": user_email,
-    "timestamp":  time.strftime("%Y-%m-%d %H:%M:%S"),
-    "page":       st.query_params.get("page", ["app"])[0]  # opcional, si usas query param 'page'
-})
+# —————— Registrar acceso ——————
+# Se encola y un hilo en segundo plano lo guarda en ACCESS_LOGS (ver comun.accesos)
+registrar_acceso("app")
 
 st.title("📊 Dashboard SDS")
 st.write("Selecciona una sección desde el menú lateral.")
 st.info("Usa el menú lateral para navegar entre dispositivos, suministros y contadores")
+
+# —————— Estado de la caché ——————
+# Al arrancar el servidor un hilo carga y une los datos de todas las páginas (ver comun.precalentado)
+with st.expander("Estado de los datos"):
+    mostrar_precalentado()
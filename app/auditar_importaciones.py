@@ -0,0 +1,131 @@
+import os
+import re
+import ast
+import sys
+import logging
+import subprocess
+from pathlib import Path
+
+# -------------------------------------------------
+# Configuración del Logger para consola y archivo
+# -------------------------------------------------
+log_dir = r"D:\ProyectoSIMP\2025\DashBoardSIMP\app\logs"
+if not os.path.exists(log_dir):
+    os.makedirs(log_dir)
+log_file = os.path.join(log_dir, "importaciones_script.log")
+
+logging.basicConfig(
+    level=logging.INFO,  # Se registran INFO, WARNING, ERROR y CRITICAL
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler(log_file, mode='a', encoding='utf-8'),
+        logging.StreamHandler()  # Muestra el log en la consola
+    ]
+)
+logger = logging.getLogger()
+
+# -------------------------------------------------
+# Configuración
+# -------------------------------------------------
+APP_DIR = Path(__file__).resolve().parent
+# Scripts de Streamlit a auditar: la página de inicio y las de pages/
+PAGINAS = [APP_DIR / "app.py", *sorted((APP_DIR / "pages").glob("*.py"))]
+# Módulos que el servidor de Streamlit ya tiene cargados antes de ejecutar cualquier página
+BASE_SERVIDOR = ["streamlit"]
+# Marca en stderr entre la base del servidor y las importaciones de la página
+MARCA = "--importaciones de la pagina--"
+# Línea de "python -X importtime": "import time: <propio us> | <acumulado us> | <módulo>"
+LINEA_IMPORTTIME = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( +)(\S+)")
+
+# -------------------------------------------------
+# Análisis de las importaciones de cada página
+# -------------------------------------------------
+def importaciones(ruta):
+    """
+    (iniciales, diferidas): sentencias import del bloque inicial del script (se
+    ejecutan antes de mostrar nada) y las demás, dentro de funciones o más
+    abajo en el script (se ejecutan al llegar a la sección que las usa).
+    """
+    arbol = ast.parse(ruta.read_text(encoding="utf-8"))
+    iniciales = []
+    for nodo in arbol.body:
+        if not isinstance(nodo, (ast.Import, ast.ImportFrom)):
+            break
+        iniciales.append(nodo)
+    diferidas = [nodo for nodo in ast.walk(arbol)
+                 if isinstance(nodo, (ast.Import, ast.ImportFrom)) and nodo not in iniciales]
+    return iniciales, diferidas
+
+def nombres_sin_uso(ruta):
+    """Nombres importados (en cualquier nivel) que el script nunca usa."""
+    arbol = ast.parse(ruta.read_text(encoding="utf-8"))
+    importados = {}
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, (ast.Import, ast.ImportFrom)):
+            for alias in nodo.names:
+                nombre = alias.asname or alias.name.split(".")[0]
+                importados[nombre] = alias.name
+    usados = {nodo.id for nodo in ast.walk(arbol) if isinstance(nodo, ast.Name)}
+    return sorted(importados[nombre] for nombre in importados if nombre not in usados)
+
+def medir_importaciones(sentencias):
+    """
+    Importa las sentencias en un intérprete nuevo (arranque en frío), después
+    de BASE_SERVIDOR, y retorna {módulo de primer nivel: milisegundos acumulados}.
+    """
+    codigo = "\n".join(
+        [f"import {modulo}" for modulo in BASE_SERVIDOR]
+        + [f"import sys; sys.stderr.write({MARCA!r} + '\\n')"]
+        + [ast.unparse(sentencia) for sentencia in sentencias]
+    )
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                             cwd=APP_DIR, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+
+    tiempos = {}
+    lineas = proceso.stderr.splitlines()
+    for linea in lineas[lineas.index(MARCA) + 1:]:
+        coincidencia = LINEA_IMPORTTIME.match(linea)
+        # Solo los módulos de primer nivel (un espacio de sangría): su acumulado incluye a los anidados
+        if coincidencia and len(coincidencia.group(3)) == 1:
+            tiempos[coincidencia.group(4)] = int(coincidencia.group(2)) / 1000
+    return tiempos
+
+# -------------------------------------------------
+# Auditoría de todas las páginas
+# -------------------------------------------------
+def main():
+    """Registra el tiempo de importación de cada página. Retorna 1 si alguna importa módulos que no usa."""
+    con_sobrantes = 0
+    for ruta in PAGINAS:
+        iniciales, diferidas = importaciones(ruta)
+        tiempos = medir_importaciones(iniciales)
+        total = sum(tiempos.values())
+        detalle = ", ".join(f"{modulo} {ms:.0f} ms" for modulo, ms in
+                            sorted(tiempos.items(), key=lambda item: item[1], reverse=True)[:8])
+        logger.info("%s: %.0f ms de importaciones en frío (además de %s). Mayores: %s",
+                    ruta.name, total, ", ".join(BASE_SERVIDOR), detalle or "ninguna")
+        if diferidas:
+            logger.info("%s: importaciones diferidas: %s", ruta.name,
+                        ", ".join(ast.unparse(sentencia) for sentencia in diferidas))
+
+        sobrantes = nombres_sin_uso(ruta)
+        if sobrantes:
+            con_sobrantes += 1
+            logger.warning("%s: importa y no usa: %s", ruta.name, ", ".join(sobrantes))
+
+    if con_sobrantes:
+        logger.warning("%d páginas importan módulos que no usan.", con_sobrantes)
+        return 1
+    logger.info("Ninguna página importa módulos que no usa.")
+    return 0
+
+# -------------------------------------------------
+# Ejecución del script (después de cambiar las importaciones de las páginas)
+# -------------------------------------------------
+if __name__ == "__main__":
+    logger.info("Inicio de ejecución de la auditoría de importaciones.")
+    codigo = main()
+    logger.info("Fin de ejecución del script.")
+    sys.exit(codigo)
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import time
+import logging
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from pathlib import Path
+
+from datos.cache_incremental import CacheIncremental
+from datos.consultas import CARGAS
+from datos.flota_sintetica import escribir_flota, generar_flota, tablas_flota
+from datos.metricas_consumibles import marcar_estado_suministros
+from datos.paginas import consumibles, contadores, dispositivos, monitores
+
+# -------------------------------------------------
+# Configuración del Logger para consola y archivo
+# -------------------------------------------------
+log_dir = r"D:\ProyectoSIMP\2025\DashBoardSIMP\app\logs"
+if not os.path.exists(log_dir):
+    os.makedirs(log_dir)
+log_file = os.path.join(log_dir, "benchmark_script.log")
+
+logging.basicConfig(
+    level=logging.INFO,  # Se registran INFO, WARNING, ERROR y CRITICAL
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler(log_file, mode='a', encoding='utf-8'),
+        logging.StreamHandler()  # Muestra el log en la consola
+    ]
+)
+logger = logging.getLogger()
+
+# -------------------------------------------------
+# Cargar variables de entorno desde config.env
+# -------------------------------------------------
+env_path = Path(r"D:\ProyectoSIMP\2025\DashBoardSIMP\config.env")
+load_dotenv(dotenv_path=env_path)
+
+# -------------------------------------------------
+# Obtener configuraciones desde variables de entorno
+# -------------------------------------------------
+# Tamaños de flota a medir, separados por coma (ver TAMANOS)
+BENCHMARK_TAMANOS = os.getenv("BENCHMARK_TAMANOS", "pequena,mediana,grande").split(",")
+# Archivo con los tiempos de referencia; BENCHMARK_GUARDAR_BASE=1 lo reescribe con esta corrida
+BENCHMARK_BASE = os.getenv("BENCHMARK_BASE", str(Path(__file__).with_name("benchmark_base.json")))
+BENCHMARK_GUARDAR_BASE = os.getenv("BENCHMARK_GUARDAR_BASE") == "1"
+# Opcional: MongoDB local donde escribir la flota para medir también la carga de las colecciones
+BENCHMARK_MONGO_URI = os.getenv("BENCHMARK_MONGO_URI")
+BENCHMARK_DATABASE = os.getenv("BENCHMARK_DATABASE", "SDSAPI_BENCHMARK")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "SDSAPI")
+
+# Argumentos de generar_flota por tamaño
+TAMANOS = {
+    "pequena": {"clientes": 50, "dispositivos_por_cliente": 20, "consumibles_por_dispositivo": 4, "lecturas_por_dispositivo": 30},
+    "mediana": {"clientes": 200, "dispositivos_por_cliente": 50, "consumibles_por_dispositivo": 6, "lecturas_por_dispositivo": 30},
+    "grande": {"clientes": 500, "dispositivos_por_cliente": 100, "consumibles_por_dispositivo": 8, "lecturas_por_dispositivo": 60},
+}
+
+# Repeticiones por caso: se toma el mejor tiempo (el menos afectado por el resto del sistema)
+REPETICIONES = 3
+# Un caso es regresión si tarda más que la referencia * (1 + TOLERANCIA) y al menos MINIMO_S más
+TOLERANCIA = 0.25
+MINIMO_S = 0.05
+
+# -------------------------------------------------
+# Casos: cada uno recibe las tablas cargadas y mide una etapa de las páginas
+# -------------------------------------------------
+def _unidos_contadores(tablas):
+    return contadores.unir_datos_meters(tablas["METERS"], tablas["DEVICE"], tablas["CUSTOMER"])
+
+CASOS = {
+    "unir_datos (Dispositivos)": lambda t: dispositivos.unir_datos(t["CUSTOMER"], t["DEVICE"]),
+    "unir_monitores (Monitores)": lambda t: monitores.unir_monitores(t["DEVICE"], t["CUSTOMER"], t["MONITOR"]),
+    "unir_datos_consumibles": lambda t: consumibles.unir_datos_consumibles(t["CONSUMABLE"], t["DEVICE"], t["CUSTOMER"]),
+    "marcar_estado_suministros": lambda t: marcar_estado_suministros(t["CONSUMABLE"]),
+    "unir_datos_meters (Contadores)": _unidos_contadores,
+    "calcular_consumo_diario": lambda t: contadores.calcular_consumo_diario(t["unidos_contadores"]),
+    "armar_datos Dispositivos": dispositivos.armar_datos,
+    "armar_datos Monitores": monitores.armar_datos,
+    "armar_datos Consumibles": consumibles.armar_datos,
+    "armar_datos Contadores": contadores.armar_datos,
+}
+
+def medir_caso(funcion, tablas):
+    mejor = None
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion(tablas)
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return mejor
+
+def medir_carga(db):
+    """Tiempo de la carga completa de cada colección con los mismos argumentos que el dashboard."""
+    tiempos = {}
+    for coleccion, carga in CARGAS.items():
+        inicio = time.perf_counter()
+        CacheIncremental(db[coleccion], ttl=None, **carga).obtener()
+        tiempos[f"carga {coleccion}"] = time.perf_counter() - inicio
+        logger.info("Carga de %s: %.3f s", coleccion, tiempos[f"carga {coleccion}"])
+    return tiempos
+
+def medir_tamano(nombre):
+    flota = generar_flota(**TAMANOS[nombre])
+    logger.info("Flota %s: %s", nombre, ", ".join(f"{c} {len(df):,}" for c, df in flota.items()))
+
+    tiempos = {}
+    if BENCHMARK_MONGO_URI:
+        db = MongoClient(BENCHMARK_MONGO_URI)[BENCHMARK_DATABASE]
+        escribir_flota(db, flota)
+        tiempos.update(medir_carga(db))
+
+    tablas = tablas_flota(flota)
+    tablas["unidos_contadores"] = _unidos_contadores(tablas)
+    for caso, funcion in CASOS.items():
+        tiempos[caso] = medir_caso(funcion, tablas)
+        logger.info("%s | %s: %.3f s", nombre, caso, tiempos[caso])
+    return tiempos
+
+# -------------------------------------------------
+# Comparación con la referencia
+# -------------------------------------------------
+def regresiones(resultados, base):
+    """Lista de (tamaño, caso, segundos, referencia) que superan la tolerancia."""
+    lentos = []
+    for tamano, tiempos in resultados.items():
+        for caso, segundos in tiempos.items():
+            referencia = base.get(tamano, {}).get(caso)
+            if referencia is not None and segundos > referencia * (1 + TOLERANCIA) and segundos - referencia > MINIMO_S:
+                lentos.append((tamano, caso, segundos, referencia))
+    return lentos
+
+def main():
+    """Mide cada tamaño de flota y retorna 1 si algún caso es más lento que la referencia."""
+    if BENCHMARK_MONGO_URI and BENCHMARK_DATABASE == DATABASE_NAME:
+        logger.error("BENCHMARK_DATABASE no puede ser la base del dashboard (%s): se reemplazan sus colecciones.", DATABASE_NAME)
+        return 1
+
+    resultados = {nombre: medir_tamano(nombre) for nombre in BENCHMARK_TAMANOS}
+
+    if BENCHMARK_GUARDAR_BASE or not os.path.exists(BENCHMARK_BASE):
+        with open(BENCHMARK_BASE, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        logger.info("Referencia guardada en %s.", BENCHMARK_BASE)
+        return 0
+
+    with open(BENCHMARK_BASE, encoding="utf-8") as f:
+        base = json.load(f)
+    lentos = regresiones(resultados, base)
+    for tamano, caso, segundos, referencia in lentos:
+        logger.error("Regresión en %s | %s: %.3f s (referencia %.3f s, +%.0f%%)",
+                     tamano, caso, segundos, referencia, 100 * (segundos / referencia - 1))
+    if lentos:
+        return 1
+    logger.info("Sin regresiones respecto de %s.", BENCHMARK_BASE)
+    return 0
+
+# -------------------------------------------------
+# Ejecución del script (antes de integrar cambios en las uniones de las páginas)
+# -------------------------------------------------
+if __name__ == "__main__":
+    logger.info("Inicio de ejecución del benchmark de las páginas.")
+    codigo = main()
+    logger.info("Fin de ejecución del script.")
+    sys.exit(codigo)
@@ -0,0 +1,37 @@
+import atexit
+from datetime import datetime, timezone
+
+import streamlit as st
+
+from comun.cargas import obtener_db
+from datos.registro import RegistroBuffer, asegurar_indice_ttl
+
+# Días que se conservan los registros de ACCESS_LOGS (índice TTL sobre "timestamp")
+RETENCION_DIAS = 180
+
+
+# Un registrador por proceso: los accesos se escriben en lotes desde un hilo en segundo plano
+@st.cache_resource(show_spinner=False)
+def obtener_registro_accesos():
+    coleccion = obtener_db()["ACCESS_LOGS"]
+    asegurar_indice_ttl(coleccion, "timestamp", RETENCION_DIAS)
+    registro = RegistroBuffer(coleccion)
+    # Escribir lo pendiente al cerrar el servidor
+    atexit.register(registro.detener)
+    return registro
+
+
+def usuario_actual():
+    # En Streamlit Cloud, st.experimental_user.email
+    if hasattr(st, "experimental_user") and st.experimental_user:
+        return st.experimental_user.email or "unknown"
+    return "anonymous"
+
+
+def registrar_acceso(pagina):
+    """Registra la ejecución de una página en ACCESS_LOGS sin esperar a MongoDB."""
+    obtener_registro_accesos().registrar({
+        "user_email": usuario_actual(),
+        "timestamp": datetime.now(timezone.utc),
+        "page": pagina,
+    })
@@ -0,0 +1,63 @@
+"""
+Señal de "render completo" para los scripts de email que capturan el
+dashboard en PDF (pyppeteer o wkhtmltopdf).
+
+Las páginas terminan con marcar_render_completo(). Si la URL trae el
+parámetro ?captura=1, la página agrega un componente invisible que espera a
+que todos los gráficos (Vega-Lite, Plotly, imágenes de matplotlib) y tablas
+estén dibujados y entonces:
+
+- pone window.status = ESTADO_VENTANA (wkhtmltopdf --window-status), y
+- agrega el atributo data-render al <body>: "completo", o "tiempo-agotado" si
+  pasaron TIEMPO_MAXIMO_S segundos sin que todo se dibujara (así la captura
+  nunca espera indefinidamente).
+
+Sin el parámetro no se agrega nada: las sesiones normales no cambian.
+"""
+import streamlit as st
+import streamlit.components.v1 as components
+
+# Parámetro de la URL que activa la señal
+PARAMETRO = "captura"
+# Valor de window.status al terminar la espera (completo o no)
+ESTADO_VENTANA = "render-terminado"
+# Espera máxima en el navegador
+TIEMPO_MAXIMO_S = 60
+
+# El componente se ejecuta en un iframe del mismo origen: revisa el documento de la página
+_SCRIPT = """
+<script>
+const doc = window.parent.document;
+const inicio = Date.now();
+
+function dibujado() {
+    const graficos = doc.querySelectorAll(
+        '[data-testid="stVegaLiteChart"], [data-testid="stPlotlyChart"], [data-testid="stDataFrame"]');
+    const imagenes = doc.querySelectorAll('[data-testid="stImage"] img');
+    return Array.from(graficos).every(g => g.querySelector("canvas, svg"))
+        && Array.from(imagenes).every(i => i.complete);
+}
+
+function marcar(resultado) {
+    doc.body.setAttribute("data-render", resultado);
+    window.parent.status = "%(estado)s";
+}
+
+(function esperar() {
+    if (dibujado()) {
+        marcar("completo");
+    } else if (Date.now() - inicio > %(maximo_ms)d) {
+        marcar("tiempo-agotado");
+    } else {
+        setTimeout(esperar, 100);
+    }
+})();
+</script>
+"""
+
+
+def marcar_render_completo():
+    """Al final de cada página: con ?captura=1 agrega la señal de render completo."""
+    if PARAMETRO not in st.query_params:
+        return
+    components.html(_SCRIPT % {"estado": ESTADO_VENTANA, "maximo_ms": TIEMPO_MAXIMO_S * 1000}, height=0)
@@ -0,0 +1,118 @@
+import streamlit as st
+from pymongo import MongoClient
+
+from datos.cache_incremental import CacheIncremental
+from datos.consultas import CARGAS
+from datos.instantaneas import leer_instantanea, ultima_version
+from datos.rendimiento import medir
+from datos.versiones import VigilanteColecciones
+
+# Sin change streams: tiempo tras el cual se buscan cambios en MongoDB (segundos)
+TTL_SEGUNDOS = 300
+# Sin change streams: cada cuánto se sondea la firma de cada colección (segundos)
+INTERVALO_SONDEO = 30
+# Primer elemento de la clave de caché cuando los datos vienen de una instantánea en disco
+INSTANTANEA = "instantanea"
+
+
+# Conexión compartida por todas las páginas y sesiones
+@st.cache_resource(show_spinner=False)
+def obtener_db():
+    # Cargar variables desde "Secrets" Streamlit
+    client = MongoClient(st.secrets["MONGO_URI"])
+    return client[st.secrets["DATABASE_NAME"]]
+
+
+# Vigilante de cambios: un hilo por proceso que aumenta la versión de cada colección
+@st.cache_resource(show_spinner=False)
+def obtener_vigilante():
+    return VigilanteColecciones(obtener_db(), intervalo_sondeo=INTERVALO_SONDEO).iniciar()
+
+
+# -------------------------------------------------
+# Cachés por colección (una instancia por proceso)
+# -------------------------------------------------
+# Qué se carga de cada colección y cómo se detectan sus cambios: datos.consultas.CARGAS.
+# Con change streams las cachés no vencen: se refrescan solo cuando cambia la versión.
+@st.cache_resource(show_spinner=False)
+def obtener_caches():
+    db = obtener_db()
+    ttl = None if obtener_vigilante().modo == "change_stream" else TTL_SEGUNDOS
+    return {coleccion: CacheIncremental(db[coleccion], ttl=ttl, **argumentos) for coleccion, argumentos in CARGAS.items()}
+
+
+def _obtener(coleccion):
+    with medir(f"MongoDB {coleccion}"):
+        return obtener_caches()[coleccion].obtener(obtener_vigilante().version(coleccion))
+
+def get_customer_data():
+    return _obtener("CUSTOMER")
+
+def get_device_data():
+    return _obtener("DEVICE")
+
+def get_consumable_data():
+    return _obtener("CONSUMABLE")
+
+def get_consumable_metrics_data():
+    return _obtener("CONSUMABLE_METRICS")
+
+def get_meters_data():
+    return _obtener("METERS")
+
+def get_monitor_data():
+    return _obtener("MONITOR")
+
+
+def versiones_datos(*colecciones):
+    """
+    Versión actual de cada colección (refrescando la caché si cambió).
+    Las páginas la usan como clave de st.cache_data para sus uniones.
+    """
+    caches = obtener_caches()
+    vigilante = obtener_vigilante()
+    return tuple(caches[c].sincronizar(vigilante.version(c)) for c in colecciones)
+
+
+# -------------------------------------------------
+# Datos de las páginas (instantánea en disco o colecciones en caché)
+# -------------------------------------------------
+def directorio_instantaneas():
+    """Directorio donde publicar_instantaneas.py deja los datos de las páginas (None si no se usan)."""
+    return st.secrets.get("SNAPSHOT_DIR")
+
+
+def clave_datos(nombre, colecciones):
+    """
+    Clave de caché de los datos de una página: (INSTANTANEA, versión) si hay
+    una instantánea publicada para la página; si no, las versiones de sus
+    colecciones. Con instantáneas el proceso no carga las colecciones.
+    """
+    directorio = directorio_instantaneas()
+    version = ultima_version(directorio, nombre) if directorio else None
+    if version is not None:
+        return (INSTANTANEA, version)
+    return versiones_datos(*colecciones)
+
+
+def usa_instantanea(clave):
+    """True si la clave de clave_datos() corresponde a una instantánea en disco."""
+    return clave[0] == INSTANTANEA
+
+
+def datos_pagina(clave, nombre, colecciones, armar):
+    """
+    (DataFrame, reporte_memoria) de una página para la clave de clave_datos().
+    Se sirve con st.cache_resource (comun.paginas): con instantánea, las
+    columnas sin copiar quedan en el archivo mapeado y se comparten.
+    """
+    if usa_instantanea(clave):
+        return leer_instantanea(directorio_instantaneas(), nombre, clave[1])
+    return armar({coleccion: _obtener(coleccion) for coleccion in colecciones})
+
+
+def boton_recarga():
+    """Botón de la barra lateral para forzar la recarga completa de todas las colecciones."""
+    if st.sidebar.button("🔄 Recargar datos", help="Vuelve a leer todas las colecciones desde MongoDB"):
+        for cache in obtener_caches().values():
+            cache.recargar()
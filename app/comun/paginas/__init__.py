@@ -0,0 +1,63 @@
+"""
+Datos cacheados de las páginas del dashboard (la unión está en datos.paginas).
+
+funciones_pagina(modulo) retorna las funciones comunes de una página a
+partir de su módulo de datos.paginas (NOMBRE, COLECCIONES, armar_datos,
+columnas_filtro y resumen): clave_pagina, cargar_datos, obtener_indice y
+cargar_resumen. Los módulos de este paquete agregan lo propio de cada página.
+"""
+from functools import partial
+
+import streamlit as st
+
+from comun.cargas import clave_datos, datos_pagina
+from datos.indice_filtros import IndiceFiltros
+from datos.rendimiento import medir
+
+# Entradas de cada caché: dos versiones de los datos (la vigente y la anterior) por cada una
+# de las cuatro páginas (dispositivos, monitores, consumibles, contadores)
+MAX_ENTRADAS = 2 * 4
+
+# -------------------------------------------------
+# Funciones cacheadas comunes a las páginas
+# -------------------------------------------------
+# Se cachean por (nombre de la página, clave); el módulo de datos.paginas se pasa como
+# `_pagina`, que Streamlit no incluye en la clave de la caché.
+
+@medir("clave de caché")
+def _clave_pagina(pagina):
+    return clave_datos(pagina.NOMBRE, pagina.COLECCIONES)
+
+# DataFrame de la página cacheado por clave: se recalcula solo cuando cambian los datos.
+# Es un st.cache_resource: todas las sesiones reciben el mismo DataFrame sin copiarlo (con
+# instantáneas, respaldado por el archivo mapeado en memoria). Es de solo lectura: las
+# páginas filtran con el índice (take) y agregan columnas con assign, nunca en el original.
+@medir("cargar_datos")
+@st.cache_resource(max_entries=MAX_ENTRADAS, show_spinner=False)
+def _cargar_datos(nombre, clave, _pagina):
+    return datos_pagina(clave, nombre, _pagina.COLECCIONES, _pagina.armar_datos)
+
+# Índice de filtros del DataFrame cacheado: opciones y posiciones por valor, uno por versión de los datos
+@medir("obtener_indice")
+@st.cache_resource(max_entries=MAX_ENTRADAS, show_spinner=False)
+def _obtener_indice(nombre, clave, _pagina):
+    return IndiceFiltros(_cargar_datos(nombre, clave, _pagina)[0], _pagina.columnas_filtro)
+
+# Lo que la página necesita antes de filtrar (datos.paginas.<página>.resumen), calculado una vez por clave:
+# las páginas muestran los indicadores y arman los filtros antes de cargar la tabla
+@medir("cargar_resumen")
+@st.cache_data(max_entries=MAX_ENTRADAS, show_spinner=False)
+def _cargar_resumen(nombre, clave, _pagina):
+    return _pagina.resumen(*_cargar_datos(nombre, clave, _pagina))
+
+
+def funciones_pagina(pagina):
+    """
+    (clave_pagina, cargar_datos, obtener_indice, cargar_resumen) de la página
+    cuyo módulo de datos.paginas es `pagina`: clave_pagina() sin argumentos y
+    las demás con la clave que retorna.
+    """
+    return (partial(_clave_pagina, pagina),
+            partial(_cargar_datos, pagina.NOMBRE, _pagina=pagina),
+            partial(_obtener_indice, pagina.NOMBRE, _pagina=pagina),
+            partial(_cargar_resumen, pagina.NOMBRE, _pagina=pagina))
@@ -0,0 +1,40 @@
+import streamlit as st
+
+from comun.paginas import funciones_pagina
+from datos.cache_resultados import CacheResultados, normalizar_filtros
+from datos.rendimiento import medir
+from datos.paginas import consumibles as pagina
+from datos.paginas.consumibles import armar_vista
+
+# Memoria para las vistas filtradas compartidas entre sesiones (secret VISTAS_CACHE_MB)
+PRESUPUESTO_VISTAS_MB = 256
+
+# Datos cacheados de la página Consumibles (la unión está en datos.paginas.consumibles)
+clave_pagina, cargar_datos, obtener_indice, cargar_resumen = funciones_pagina(pagina)
+
+# -------------------------------------------------
+# Vistas filtradas compartidas entre sesiones
+# -------------------------------------------------
+# Varias sesiones con los mismos filtros (el caso de los informes por cliente) reciben la
+# misma vista ya calculada: DataFrame filtrado, indicadores y datos de los gráficos.
+# Es un st.cache_resource y no un st.cache_data para no copiar la vista en cada acierto
+# y para limitar la memoria total en lugar de la cantidad de entradas.
+
+@st.cache_resource(show_spinner=False)
+def obtener_vistas():
+    return CacheResultados(int(st.secrets.get("VISTAS_CACHE_MB", PRESUPUESTO_VISTAS_MB) * 1024 * 1024))
+
+@medir("vista filtrada")
+def vista_filtrada(clave, filtros, rango_dias, slider_max):
+    """Vista de la página para la clave de datos y los filtros dados (ver datos.paginas.consumibles.armar_vista)."""
+    llave = (clave, normalizar_filtros(filtros), tuple(rango_dias), slider_max)
+    return obtener_vistas().obtener(
+        llave, lambda: armar_vista(cargar_datos(clave)[0], filtros, obtener_indice(clave), rango_dias, slider_max))
+
+def precalentar(clave):
+    """Deja en caché los datos, el índice de filtros y la vista sin filtros de la clave dada (ver comun.precalentado)."""
+    cargar_datos(clave)
+    obtener_indice(clave)
+    resumen = cargar_resumen(clave)
+    if not resumen["vacio"]:
+        vista_filtrada(clave, {}, (0, resumen["slider_max"]), resumen["slider_max"])
@@ -0,0 +1,25 @@
+import streamlit as st
+
+from comun.paginas import funciones_pagina
+from datos.indice_filtros import IndiceFiltros
+from datos.rendimiento import medir
+from datos.paginas import contadores as pagina
+from datos.paginas.contadores import ultima_lectura_por_dispositivo
+
+# Datos cacheados de la página Contadores (la unión está en datos.paginas.contadores)
+clave_pagina, cargar_datos, obtener_indice, cargar_resumen = funciones_pagina(pagina)
+
+# Última lectura por dispositivo de todo el histórico (un registro por impresora) con su índice de
+# filtros por cliente y dispositivo: calculados una vez por versión y compartidos como cargar_datos
+@medir("cargar_ultimas_lecturas")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def cargar_ultimas_lecturas(clave):
+    df_ultimas = ultima_lectura_por_dispositivo(cargar_datos(clave)[0])
+    return df_ultimas, IndiceFiltros(df_ultimas, ["Cliente", "Serial Dispositivo"])
+
+def precalentar(clave):
+    """Deja en caché los datos y el índice de filtros de la clave dada (ver comun.precalentado)."""
+    cargar_datos(clave)
+    cargar_resumen(clave)
+    cargar_ultimas_lecturas(clave)
+    obtener_indice(clave)
@@ -0,0 +1,38 @@
+import streamlit as st
+
+from comun.cargas import obtener_db, usa_instantanea
+from comun.paginas import funciones_pagina
+from datos.cache_resultados import normalizar_filtros
+from datos.indicadores import indicadores_dispositivos
+from datos.rendimiento import medir
+from datos.paginas import dispositivos as pagina
+from datos.paginas.dispositivos import indicadores
+
+# Datos cacheados de la página Dispositivos (la unión está en datos.paginas.dispositivos)
+clave_pagina, cargar_datos, obtener_indice, cargar_resumen = funciones_pagina(pagina)
+
+# -------------------------------------------------
+# Indicadores del encabezado
+# -------------------------------------------------
+# Con instantánea se calculan del mismo DataFrame filtrado que la tabla: la instantánea
+# puede estar atrasada respecto de MongoDB y los indicadores deben coincidir con ella.
+# En vivo se calculan en MongoDB (datos.indicadores), cacheados con la misma clave que
+# la tabla (versiones_datos de las colecciones) y los filtros activos.
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _indicadores(clave, filtros, rango_contacto, rango_descubrimiento):
+    return indicadores_dispositivos(obtener_db(), dict(filtros), rango_contacto, rango_descubrimiento)
+
+@medir("indicadores")
+def cargar_indicadores(clave, filtros, df_filtrado, rango_contacto=None, rango_descubrimiento=None):
+    """Total de dispositivos, monitoreados y porcentaje para los filtros de la página."""
+    if usa_instantanea(clave):
+        return indicadores(df_filtrado)
+    return _indicadores(clave, normalizar_filtros(filtros), rango_contacto, rango_descubrimiento)
+
+def precalentar(clave):
+    """Deja en caché los datos, el resumen, el índice de filtros y los indicadores sin filtros (ver comun.precalentado)."""
+    df, _ = cargar_datos(clave)
+    obtener_indice(clave)
+    resumen = cargar_resumen(clave)
+    cargar_indicadores(clave, {}, df, resumen["fechas"]["lastContact"], resumen["fechas"]["discoveryDate"])
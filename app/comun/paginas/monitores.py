@@ -0,0 +1,65 @@
+from datetime import date
+
+import streamlit as st
+
+from comun.cargas import obtener_db, usa_instantanea
+from comun.paginas import dispositivos, funciones_pagina
+from datos.cache_resultados import normalizar_filtros
+from datos.indicadores import indicadores_monitores
+from datos.indice_filtros import IndiceFiltros
+from datos.rendimiento import medir
+from datos.paginas import monitores as pagina
+from datos.paginas.monitores import indicadores
+
+# Datos cacheados de la página Monitores (la unión está en datos.paginas.monitores)
+clave_pagina, cargar_datos, obtener_indice, cargar_resumen = funciones_pagina(pagina)
+
+# -------------------------------------------------
+# Indicadores del encabezado
+# -------------------------------------------------
+# Con instantánea se calculan del mismo DataFrame filtrado que la tabla: la instantánea
+# puede estar atrasada respecto de MongoDB y los indicadores deben coincidir con ella.
+# En vivo se calculan en MongoDB (datos.indicadores), cacheados con la misma clave que
+# la tabla (versiones_datos de las colecciones), los filtros activos y el día: los días
+# sin reporte y hasta el vencimiento cambian con la fecha aunque los datos no cambien.
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _indicadores(clave, filtros, seriales, dia):
+    return indicadores_monitores(obtener_db(), dict(filtros), list(seriales))
+
+@medir("indicadores")
+def cargar_indicadores(clave, filtros, df_filtrado, seriales=()):
+    """Total, online, offline, promedio de días sin reporte y licencias por vencer para los filtros de la página."""
+    if usa_instantanea(clave):
+        return indicadores(df_filtrado)
+    return _indicadores(clave, normalizar_filtros(filtros), tuple(sorted(seriales)), date.today())
+
+# -------------------------------------------------
+# Dispositivos de cada cliente (filtro "Seleccionar Dispositivo")
+# -------------------------------------------------
+# Los datos de la página tienen un registro por monitor; los seriales de los dispositivos
+# salen de los datos ya cacheados de la página Dispositivos (misma unión CUSTOMER-DEVICE),
+# indexados por cliente y serial.
+
+@medir("obtener_dispositivos")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def obtener_dispositivos(clave_dispositivos):
+    return IndiceFiltros(dispositivos.cargar_datos(clave_dispositivos)[0], ["name", "serialNumber"])
+
+def seriales_de_clientes(indice_dispositivos, clientes):
+    """Seriales ordenados de los dispositivos de los clientes dados."""
+    return indice_dispositivos.opciones("serialNumber", indice_dispositivos.filas({"name": clientes}))
+
+def clientes_de_dispositivos(indice_dispositivos, seriales):
+    """Clientes de los dispositivos elegidos (None si no hay ninguno elegido: no filtra)."""
+    if not seriales:
+        return None
+    return indice_dispositivos.opciones("name", indice_dispositivos.filas({"serialNumber": seriales}))
+
+def precalentar(clave):
+    """Deja en caché los datos, el índice de filtros, los dispositivos por cliente y los indicadores sin filtros (ver comun.precalentado)."""
+    df, _ = cargar_datos(clave)
+    obtener_indice(clave)
+    cargar_resumen(clave)
+    obtener_dispositivos(dispositivos.clave_pagina())
+    cargar_indicadores(clave, {}, df)
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from comun.cargas import INTERVALO_SONDEO
+from comun.paginas import consumibles, contadores, dispositivos, monitores
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Precalentado de las cachés en segundo plano
+# -------------------------------------------------
+# Los datos de cada página (comun.paginas) se cachean con st.cache_data. Un hilo por
+# proceso los calcula al arrancar y cada vez que cambia su clave (colecciones modificadas
+# por los sync_*.py o nueva instantánea publicada), así el visitante encuentra la caché llena.
+# Si un usuario llega mientras se calcula la misma unión, Streamlit lo hace esperar a
+# ese cálculo en lugar de repetirlo.
+
+# Páginas a precalentar, de la más liviana a la más pesada: las primeras quedan listas antes
+PAGINAS = {
+    "Dispositivos": dispositivos,
+    "Monitores": monitores,
+    "Consumibles": consumibles,
+    "Contadores": contadores,
+}
+
+
+class Precalentador:
+    """
+    Hilo daemon que mantiene calientes las uniones de las páginas.
+
+    Cada `intervalo` segundos calcula la clave de cada página (lo que
+    sincroniza las cachés de las colecciones, igual que una visita) y carga
+    los datos de las páginas cuya clave cambió desde la última vuelta.
+    estado() expone el avance.
+    """
+
+    def __init__(self, paginas, intervalo=INTERVALO_SONDEO):
+        self.paginas = dict(paginas)
+        self.intervalo = intervalo
+        self.vueltas = 0
+        self.ultima_vuelta = None
+        self._tareas = {nombre: {"estado": "pendiente", "segundos": None, "error": None} for nombre in self.paginas}
+        self._claves = {}  # Clave de caché ya precalentada por página
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, name="precalentado", daemon=True)
+
+    def iniciar(self):
+        # El hilo llama a funciones st.cache_* y lee st.secrets: lleva el contexto de la
+        # ejecución que lo inicia para que Streamlit no avise que falta un ScriptRunContext
+        add_script_run_ctx(self._hilo, get_script_run_ctx(suppress_warning=True))
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+
+    def estado(self):
+        """Copia del estado: {página: {"estado", "segundos", "error"}}."""
+        with self._lock:
+            return {nombre: dict(tarea) for nombre, tarea in self._tareas.items()}
+
+    def listo(self):
+        """True si todas las páginas tienen sus datos en caché."""
+        return all(tarea["estado"] == "listo" for tarea in self.estado().values())
+
+    # -------------------------------------------------
+    # Funciones internas
+    # -------------------------------------------------
+    def _actualizar(self, nombre, **campos):
+        with self._lock:
+            self._tareas[nombre].update(campos)
+
+    def _ejecutar(self):
+        while not self._detener.is_set():
+            self._vuelta()
+            self._detener.wait(self.intervalo)
+
+    def _vuelta(self):
+        calculadas = 0
+        for nombre, modulo in self.paginas.items():
+            if self._detener.is_set():
+                return
+            inicio = time.monotonic()
+            try:
+                clave = modulo.clave_pagina()
+                if clave == self._claves.get(nombre):
+                    continue
+                self._actualizar(nombre, estado="en curso")
+                modulo.precalentar(clave)
+                self._claves[nombre] = clave
+                calculadas += 1
+                self._actualizar(nombre, estado="listo", segundos=time.monotonic() - inicio, error=None)
+                logger.info("Precalentado de %s listo en %.1f s.", nombre, time.monotonic() - inicio)
+            except Exception as e:
+                # Se reintenta en la próxima vuelta; la página calcula sus datos si llega antes
+                self._claves.pop(nombre, None)
+                self._actualizar(nombre, estado="error", segundos=time.monotonic() - inicio, error=str(e))
+                logger.exception("Error al precalentar %s: %s", nombre, e)
+        if calculadas:
+            self.vueltas += 1
+            self.ultima_vuelta = datetime.now()
+
+
+# Un precalentador por proceso: arranca con la primera ejecución de cualquier página
+@st.cache_resource(show_spinner=False)
+def obtener_precalentador():
+    return Precalentador(PAGINAS).iniciar()
+
+
+def iniciar_precalentado():
+    """Arranca el precalentado (si no está corriendo) y avisa en la barra lateral mientras no termine."""
+    precalentador = obtener_precalentador()
+    estado = precalentador.estado()
+    listas = sum(tarea["estado"] == "listo" for tarea in estado.values())
+    if listas < len(estado):
+        st.sidebar.caption(f"⏳ Preparando datos en segundo plano: {listas} de {len(estado)} páginas listas.")
+    return precalentador
+
+
+def mostrar_precalentado():
+    """Avance del precalentado para la página de inicio."""
+    precalentador = obtener_precalentador()
+    estado = precalentador.estado()
+    listas = sum(tarea["estado"] == "listo" for tarea in estado.values())
+    st.progress(listas / len(estado), text=f"Datos en caché: {listas} de {len(estado)} páginas")
+    for nombre, tarea in estado.items():
+        detalle = f" ({tarea['segundos']:.1f} s)" if tarea["segundos"] is not None else ""
+        if tarea["error"]:
+            detalle += f": {tarea['error']}"
+        st.caption(f"{nombre}: {tarea['estado']}{detalle}")
+    if precalentador.ultima_vuelta:
+        st.caption(f"Última actualización: {precalentador.ultima_vuelta:%Y-%m-%d %H:%M:%S}")
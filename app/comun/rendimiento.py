@@ -0,0 +1,151 @@
+import atexit
+import io
+import random
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+from comun.accesos import usuario_actual
+from comun.cargas import obtener_db
+from datos.registro import RegistroBuffer, asegurar_indice_ttl
+from datos.rendimiento import iniciar_medicion, medicion_actual, medir, terminar_medicion
+
+# Fracción de ejecuciones que se miden y se guardan en PERF_LOG (secret PERF_SAMPLE_RATE)
+MUESTREO = 0.05
+# Días que se conservan los registros de PERF_LOG (índice TTL sobre "timestamp")
+RETENCION_DIAS = 30
+
+
+# Un registrador por proceso, igual que ACCESS_LOGS (ver comun.accesos)
+@st.cache_resource(show_spinner=False)
+def obtener_registro_rendimiento():
+    coleccion = obtener_db()["PERF_LOG"]
+    asegurar_indice_ttl(coleccion, "timestamp", RETENCION_DIAS)
+    registro = RegistroBuffer(coleccion)
+    atexit.register(registro.detener)
+    return registro
+
+
+def es_administrador():
+    """Usuarios de la lista ADMIN_EMAILS de los secrets."""
+    return usuario_actual() in st.secrets.get("ADMIN_EMAILS", [])
+
+
+def _panel_activo():
+    return es_administrador() and st.session_state.get("panel_rendimiento", False)
+
+
+# -------------------------------------------------
+# Medición de una ejecución de página
+# -------------------------------------------------
+def iniciar_medicion_pagina(pagina):
+    """
+    Mide esta ejecución si sale en el muestreo o si un administrador tiene el
+    panel de rendimiento abierto. Los reruns de un solo fragmento no se miden.
+    """
+    if _panel_activo() or random.random() < st.secrets.get("PERF_SAMPLE_RATE", MUESTREO):
+        iniciar_medicion(pagina)
+
+
+def cerrar_medicion_pagina():
+    """Guarda la medición en PERF_LOG y, para administradores, muestra el panel en la barra lateral."""
+    medicion = terminar_medicion()
+    if es_administrador():
+        st.sidebar.toggle("⏱️ Panel de rendimiento", key="panel_rendimiento",
+                          help="Mide cada ejecución de la página y muestra el tiempo por etapa")
+    if medicion is None:
+        return
+    obtener_registro_rendimiento().registrar({
+        "timestamp": datetime.now(timezone.utc),
+        "page": medicion.pagina,
+        "user_email": usuario_actual(),
+        "total_s": medicion.total_s,
+        "etapas": medicion.etapas,
+        "cargas": medicion.cargas,
+    })
+    if _panel_activo():
+        _mostrar_panel(medicion)
+
+
+def panel_memoria(reporte_memoria):
+    """
+    Expander "Memoria del dataset" con el reporte de aplicar_esquema (que ya
+    queda en el log al armar el DataFrame). Solo se muestra a administradores
+    con el panel de rendimiento abierto; retorna el expander para agregar más
+    datos, o None si no se muestra.
+    """
+    if not _panel_activo():
+        return None
+    expander = st.sidebar.expander("Memoria del dataset")
+    expander.caption(f"{reporte_memoria['filas']} filas: {reporte_memoria['antes_mb']:.2f} MB → "
+                     f"{reporte_memoria['despues_mb']:.2f} MB")
+    return expander
+
+
+def _mostrar_panel(medicion):
+    with st.sidebar.expander("⏱️ Rendimiento de esta ejecución", expanded=True):
+        st.caption(f"Total: {medicion.total_s:.2f} s")
+        etapas = pd.DataFrame(medicion.etapas)
+        if not etapas.empty:
+            etapas["etapa"] = ["· " * nivel + etapa for nivel, etapa in zip(etapas["nivel"], etapas["etapa"])]
+            st.dataframe(etapas[["etapa", "segundos"]], hide_index=True)
+        cargas = pd.DataFrame(medicion.cargas)
+        if not cargas.empty:
+            cargas["KB"] = cargas["bytes"] / 1024
+            st.dataframe(cargas[["nombre", "tipo", "KB"]].sort_values("KB", ascending=False), hide_index=True)
+
+
+# -------------------------------------------------
+# Gráficos y tablas medidos (tiempo de envío y tamaño de lo enviado al navegador)
+# -------------------------------------------------
+def _registrar_carga(nombre, tipo, calcular_bytes):
+    medicion = medicion_actual()
+    if medicion is None:
+        return
+    try:
+        medicion.agregar_carga(nombre, tipo, calcular_bytes())
+    except Exception:
+        # El tamaño es informativo: un tipo que no se pueda serializar no debe romper la página
+        pass
+
+
+def _bytes_tabla(df):
+    # st.dataframe envía el DataFrame como Arrow IPC. pyarrow se importa solo al medir una tabla
+    import pyarrow as pa
+
+    tabla = pa.Table.from_pandas(df)
+    salida = pa.BufferOutputStream()
+    with pa.ipc.new_stream(salida, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return salida.getvalue().size
+
+
+def _bytes_pyplot(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.tell()
+
+
+def mostrar_altair(chart, nombre, **kwargs):
+    with medir(f"gráfico {nombre}"):
+        st.altair_chart(chart, **kwargs)
+    _registrar_carga(nombre, "altair", lambda: len(chart.to_json(validate=False, indent=None)))
+
+
+def mostrar_plotly(fig, nombre, **kwargs):
+    with medir(f"gráfico {nombre}"):
+        st.plotly_chart(fig, **kwargs)
+    _registrar_carga(nombre, "plotly", lambda: len(fig.to_json()))
+
+
+def mostrar_pyplot(fig, nombre, **kwargs):
+    with medir(f"gráfico {nombre}"):
+        st.pyplot(fig, **kwargs)
+    _registrar_carga(nombre, "pyplot", lambda: _bytes_pyplot(fig))
+
+
+def mostrar_tabla(df, nombre, **kwargs):
+    with medir(f"tabla {nombre}"):
+        st.dataframe(df, **kwargs)
+    _registrar_carga(nombre, "tabla", lambda: _bytes_tabla(df))
@@ -0,0 +1,71 @@
+import math
+import os
+import tempfile
+
+import streamlit as st
+
+from comun.rendimiento import mostrar_tabla
+
+TAMANOS_PAGINA = [50, 100, 250, 500]
+SIN_ORDEN = "(sin orden)"
+# Filas que pandas convierte y escribe por bloque al preparar la descarga
+FILAS_POR_BLOQUE = 10000
+
+
+def _pagina(df, columna, ascendente, numero, tamano):
+    """Filas de la página `numero` (desde 1) ordenando solo la columna elegida, no el DataFrame completo."""
+    inicio = (numero - 1) * tamano
+    if columna is None:
+        return df.iloc[inicio:inicio + tamano]
+    orden = df[columna].reset_index(drop=True).sort_values(ascending=ascendente, kind="stable", na_position="last")
+    return df.take(orden.index[inicio:inicio + tamano])
+
+
+def _boton_descarga(df, clave, nombre_archivo):
+    """
+    Botón de descarga del CSV completo. El CSV se escribe por bloques en un
+    archivo temporal en lugar de armarlo en memoria con to_csv() (el texto
+    completo más su copia codificada) y el botón lee los bytes del archivo.
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, nombre_archivo)
+        df.to_csv(ruta, index=False, encoding="utf-8-sig", chunksize=FILAS_POR_BLOQUE)
+        with open(ruta, "rb") as archivo:
+            st.download_button(
+                "⬇️ Descargar CSV",
+                data=archivo,
+                file_name=nombre_archivo,
+                mime="text/csv",
+                key=f"{clave}_descargar",
+            )
+
+
+def tabla_paginada(df, clave, altura=None, nombre_archivo="datos.csv"):
+    """
+    Tabla paginada: solo la página actual se envía al navegador.
+
+    Muestra controles de orden (columna y sentido), tamaño de página y número
+    de página. La descarga del resultado completo se genera solo al pulsar
+    "Preparar descarga", así el CSV no se arma en cada ejecución.
+    `clave` distingue los controles cuando hay varias tablas en la página.
+    Conviene llamarla dentro de un st.fragment para que cambiar de página
+    vuelva a ejecutar solo la tabla.
+    """
+    col_orden, col_sentido, col_tamano, col_pagina = st.columns([3, 2, 1, 1])
+    columna = col_orden.selectbox("Ordenar por", [SIN_ORDEN, *df.columns], key=f"{clave}_orden")
+    sentido = col_sentido.radio("Sentido", ["Ascendente", "Descendente"], horizontal=True, key=f"{clave}_sentido")
+    tamano = col_tamano.selectbox("Filas por página", TAMANOS_PAGINA, index=1, key=f"{clave}_tamano")
+
+    paginas = max(1, math.ceil(len(df) / tamano))
+    # Si los filtros redujeron el resultado, volver a una página que exista
+    if st.session_state.get(f"{clave}_pagina", 1) > paginas:
+        st.session_state[f"{clave}_pagina"] = paginas
+    numero = col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{clave}_pagina")
+
+    pagina = _pagina(df, None if columna == SIN_ORDEN else columna, sentido == "Ascendente", numero, tamano)
+    mostrar_tabla(pagina, clave, height=altura)
+    inicio = (numero - 1) * tamano
+    st.caption(f"Filas {min(inicio + 1, len(df)):,}–{inicio + len(pagina):,} de {len(df):,} (página {numero} de {paginas})")
+
+    if st.button("Preparar descarga", key=f"{clave}_preparar"):
+        _boton_descarga(df, clave, nombre_archivo)
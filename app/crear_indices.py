@@ -0,0 +1,75 @@
+import os
+import sys
+import logging
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from pathlib import Path
+
+from datos.indices import crear_indices, verificar_planes
+
+# -------------------------------------------------
+# Configuración del Logger para consola y archivo
+# -------------------------------------------------
+log_dir = r"D:\ProyectoSIMP\2025\DashBoardSIMP\app\logs"
+if not os.path.exists(log_dir):
+    os.makedirs(log_dir)
+log_file = os.path.join(log_dir, "indices_script.log")
+
+logging.basicConfig(
+    level=logging.INFO,  # Se registran INFO, WARNING, ERROR y CRITICAL
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler(log_file, mode='a', encoding='utf-8'),
+        logging.StreamHandler()  # Muestra el log en la consola
+    ]
+)
+logger = logging.getLogger()
+
+# -------------------------------------------------
+# Cargar variables de entorno desde config.env
+# -------------------------------------------------
+env_path = Path(r"D:\ProyectoSIMP\2025\DashBoardSIMP\config.env")
+load_dotenv(dotenv_path=env_path)
+
+# -------------------------------------------------
+# Obtener configuraciones desde variables de entorno
+# -------------------------------------------------
+MONGO_URI = os.getenv("MONGO_URI")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "SDSAPI")
+
+# -------------------------------------------------
+# Conectar a MongoDB
+# -------------------------------------------------
+client = MongoClient(MONGO_URI)
+db = client[DATABASE_NAME]
+
+# -------------------------------------------------
+# Crear índices y verificar los planes de consulta
+# -------------------------------------------------
+def main():
+    """Crea los índices declarados en datos.indices. Retorna 1 si alguna consulta hace COLLSCAN."""
+    for coleccion, nombres in crear_indices(db).items():
+        logger.info("Índices de %s: %s", coleccion, ", ".join(nombres))
+
+    fallidas = 0
+    for coleccion, descripcion, etapas, collscan in verificar_planes(db):
+        if collscan:
+            fallidas += 1
+            logger.error("COLLSCAN en %s (%s): %s", coleccion, descripcion, " > ".join(etapas))
+        else:
+            logger.info("OK %s (%s): %s", coleccion, descripcion, " > ".join(etapas))
+
+    if fallidas:
+        logger.error("%d consultas recorren la colección completa.", fallidas)
+        return 1
+    logger.info("Todas las consultas usan índices.")
+    return 0
+
+# -------------------------------------------------
+# Ejecución del script (al desplegar o después de cambiar consultas)
+# -------------------------------------------------
+if __name__ == "__main__":
+    logger.info("Inicio de ejecución del script de índices.")
+    codigo = main()
+    logger.info("Fin de ejecución del script.")
+    sys.exit(codigo)
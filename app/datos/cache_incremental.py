@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Caché de una colección con refresco incremental
+# -------------------------------------------------
+class CacheIncremental:
+    """
+    Mantiene una colección de MongoDB en memoria como DataFrame.
+
+    La primera carga es completa; al vencer el TTL, o cuando cambia la
+    versión externa de la colección (ver datos.versiones), solo se consultan
+    los documentos con la marca ("updatedAt", "_id"...) mayor a la última
+    vista y se combinan con el DataFrame en caché usando la clave. Con
+    fechas la consulta usa $gte (empates en la marca), así que los documentos
+    que vuelven iguales a los de la caché se descartan: la versión solo
+    aumenta si algo se insertó, cambió o se borró. Los documentos borrados no
+    tienen marca: en cada refresco se compara la cantidad de documentos de la
+    colección con la del DataFrame y, si no coincide, se quitan las claves
+    que ya no existen. Se recarga todo solo si
+    cambia el esquema, si la colección no tiene la marca, si las claves no
+    alcanzan para conciliar o si se pide explícitamente con recargar(). Con
+    ttl=None el DataFrame se reutiliza hasta que cambie la versión externa.
+    """
+
+    def __init__(self, coleccion, clave, proyeccion, filtro=None, marca="updatedAt", fechas=(), ttl=300):
+        self.coleccion = coleccion
+        self.clave = clave
+        self.filtro = filtro or {}
+        self.marca = marca
+        self.fechas = list(fechas)
+        self.ttl = ttl
+
+        # Se aceptan proyecciones de find() o etapas {"$project": {...}}
+        proyeccion = dict(proyeccion.get("$project", proyeccion))
+        self._internas = [campo for campo in {clave, marca} if not proyeccion.get(campo)]
+        for campo in self._internas:
+            proyeccion[campo] = 1
+        self._proyeccion = proyeccion
+
+        self._df = None
+        self.version = 0  # Aumenta cada vez que cambia el DataFrame en caché
+        self._version_externa = None
+        self._valor_marca = None
+        self._ultima_carga = 0.0
+        self._forzar = False
+        self._lock = threading.Lock()
+
+    def sincronizar(self, version_externa=None):
+        """
+        Refresca el DataFrame si hace falta y retorna su versión, sin copiarlo.
+        Sirve como clave de caché para los cálculos que dependen de esta colección.
+        """
+        with self._lock:
+            if self._df is None or self._forzar:
+                self._carga_completa()
+            elif version_externa is not None and version_externa != self._version_externa:
+                self._refrescar()
+            elif self.ttl is not None and time.monotonic() - self._ultima_carga >= self.ttl:
+                self._refrescar()
+            self._version_externa = version_externa
+            return self.version
+
+    def obtener(self, version_externa=None):
+        """Retorna una copia del DataFrame en caché, refrescándolo si hace falta."""
+        self.sincronizar(version_externa)
+        with self._lock:
+            return self._df.drop(columns=self._internas, errors="ignore")
+
+    def recargar(self):
+        """Fuerza una recarga completa en la próxima llamada a obtener()."""
+        self._forzar = True
+
+    # -------------------------------------------------
+    # Funciones internas
+    # -------------------------------------------------
+    def _consultar(self, condicion):
+        documentos = list(self.coleccion.aggregate([{"$match": condicion}, {"$project": self._proyeccion}]))
+        df = pd.DataFrame(documentos)
+        for col in self.fechas:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        return df
+
+    def _calcular_marca(self):
+        if self.marca not in self._df.columns or self._df[self.marca].isna().all():
+            return None
+        valor = self._df[self.marca].max()
+        return valor.to_pydatetime() if isinstance(valor, pd.Timestamp) else valor
+
+    def _carga_completa(self):
+        df = self._consultar(self.filtro)
+        # Una recarga (ej. colección sin marca) que trae lo mismo no invalida lo calculado con la versión anterior
+        cambio = self._df is None or not df.equals(self._df)
+        self._df = df
+        self._valor_marca = self._calcular_marca()
+        self._ultima_carga = time.monotonic()
+        self._forzar = False
+        if cambio:
+            self.version += 1
+        logger.info("Carga completa de %s: %d documentos%s.", self.coleccion.name, len(self._df),
+                    "" if cambio else " (sin cambios)")
+
+    def _refrescar(self):
+        # Sin marca no hay forma de saber qué cambió: se recarga todo
+        if self._valor_marca is None or self._df.empty:
+            self._carga_completa()
+            return
+
+        # "_id" es único y creciente: basta con $gt. Con fechas se usa $gte por si hay empates
+        operador = "$gt" if self.marca == self.clave else "$gte"
+        condicion = {self.marca: {operador: self._valor_marca}}
+        consulta = {"$and": [self.filtro, condicion]} if self.filtro else condicion
+        df_nuevos = self._consultar(consulta)
+
+        if set(df_nuevos.columns) - set(self._df.columns):
+            logger.info("Cambio de esquema en %s, se recarga la colección completa.", self.coleccion.name)
+            self._carga_completa()
+            return
+
+        # Con $gte vuelven los documentos con la última marca aunque no hayan cambiado
+        if self.marca != self.clave and not df_nuevos.empty:
+            df_nuevos = df_nuevos[~self._sin_cambios(df_nuevos)].reset_index(drop=True)
+
+        # Documentos modificados que ya no cumplen el filtro (ej. cliente que pasó a INACTIVE) y siguen en caché
+        salientes = []
+        if self.filtro:
+            salientes = self.coleccion.distinct(self.clave, {"$and": [{"$nor": [self.filtro]}, condicion]})
+            salientes = list(self._df.loc[self._df[self.clave].isin(salientes), self.clave].unique())
+
+        df = self._df
+        if not df_nuevos.empty or salientes:
+            if self.marca != self.clave:
+                cambiados = set(df_nuevos[self.clave]) if not df_nuevos.empty else set()
+                df = df[~df[self.clave].isin(cambiados.union(salientes))]
+            df = pd.concat([df, df_nuevos], ignore_index=True) if not df_nuevos.empty else df.reset_index(drop=True)
+
+        # Documentos borrados (ej. métricas obsoletas de sync_consumable_metrics.py): no aparecen en la consulta por marca
+        # Sin filtro (ej. METERS) alcanza el conteo de los metadatos de la colección, sin recorrer el índice
+        total = (self.coleccion.count_documents(self.filtro) if self.filtro
+                 else self.coleccion.estimated_document_count())
+        eliminados = 0
+        if total != len(df):
+            vigentes = self._claves_vigentes()
+            retirar = ~df[self.clave].isin(vigentes)
+            eliminados = int(retirar.sum())
+            df = df[~retirar].reset_index(drop=True)
+            if len(df) != total:
+                logger.info("%s no se pudo conciliar por clave (%d en caché, %d en MongoDB), se recarga completa.",
+                            self.coleccion.name, len(df), total)
+                self._carga_completa()
+                return
+
+        if not df_nuevos.empty or salientes or eliminados:
+            self._df = df
+            self._valor_marca = self._calcular_marca() or self._valor_marca
+            self.version += 1
+            logger.info("Refresco incremental de %s: %d nuevos/modificados, %d retirados, %d eliminados.",
+                        self.coleccion.name, len(df_nuevos), len(salientes), eliminados)
+        self._ultima_carga = time.monotonic()
+
+    def _sin_cambios(self, df_nuevos):
+        """Máscara de las filas de df_nuevos iguales (clave y valores) a una fila de la caché."""
+        columnas = list(self._df.columns)
+        previos = self._df[self._df[self.clave].isin(df_nuevos[self.clave])]
+        if previos.empty:
+            return pd.Series(False, index=df_nuevos.index)
+
+        def filas(df):
+            # NaN/NaT como None para que dos valores ausentes sean iguales
+            df = df.reindex(columns=columnas).astype(object)
+            return df.where(df.notna(), None).itertuples(index=False, name=None)
+
+        posicion = columnas.index(self.clave)
+        por_clave = {}
+        for fila in filas(previos):
+            por_clave.setdefault(fila[posicion], []).append(fila)
+        return pd.Series([fila in por_clave.get(fila[posicion], ()) for fila in filas(df_nuevos)],
+                         index=df_nuevos.index)
+
+    def _claves_vigentes(self):
+        # Solo la clave de cada documento (cubierta por su índice): el cursor no trae los documentos completos
+        proyeccion = {self.clave: 1} if self.clave == "_id" else {self.clave: 1, "_id": 0}
+        return [documento[self.clave] for documento in self.coleccion.find(self.filtro, proyeccion)
+                if self.clave in documento]
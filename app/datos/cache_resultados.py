@@ -0,0 +1,87 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# -------------------------------------------------
+# Caché LRU de resultados con presupuesto de memoria
+# -------------------------------------------------
+class CacheResultados:
+    """
+    Resultados ya calculados (DataFrames, indicadores, datos de gráficos)
+    compartidos entre sesiones, con un presupuesto de memoria en bytes.
+
+    obtener(clave, calcular) retorna el resultado guardado para la clave o lo
+    calcula, lo guarda y lo retorna. Al superar el presupuesto se descartan
+    los resultados usados hace más tiempo. Los resultados se entregan sin
+    copiar: quien los recibe no debe modificarlos.
+    """
+
+    def __init__(self, presupuesto_bytes):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartados = 0
+        self._entradas = OrderedDict()  # clave -> (resultado, bytes), de la menos a la más reciente
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, calcular):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[0]
+            self.fallos += 1
+
+        # Se calcula fuera del lock para no bloquear a las demás sesiones
+        resultado = calcular()
+        tamano = tamano_bytes(resultado)
+        with self._lock:
+            if clave not in self._entradas and tamano <= self.presupuesto_bytes:
+                self._entradas[clave] = (resultado, tamano)
+                self.bytes += tamano
+                self._liberar()
+        return resultado
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estado(self):
+        """Entradas, bytes usados, aciertos, fallos y descartados."""
+        with self._lock:
+            return {"entradas": len(self._entradas), "bytes": self.bytes, "presupuesto_bytes": self.presupuesto_bytes,
+                    "aciertos": self.aciertos, "fallos": self.fallos, "descartados": self.descartados}
+
+    def _liberar(self):
+        while self.bytes > self.presupuesto_bytes and self._entradas:
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self.bytes -= tamano
+            self.descartados += 1
+
+
+def tamano_bytes(valor):
+    """Memoria aproximada de un resultado (DataFrames con deep=True, recorriendo dicts, listas y tuplas)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True, index=True))
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+def normalizar_filtros(filtros):
+    """Clave estable de los filtros {columna: valores}: sin filtros vacíos y sin depender del orden elegido."""
+    return tuple(sorted((columna, tuple(sorted(map(str, seleccion))))
+                        for columna, seleccion in filtros.items() if seleccion))
@@ -0,0 +1,132 @@
+# -------------------------------------------------
+# Consultas y proyecciones compartidas con MongoDB
+# -------------------------------------------------
+
+# Campos de "extendedFields" que usan las páginas (todos excepto "sku" e "internalId")
+CAMPOS_EXTRA = ["model", "zone", "location", "firmware", "hostName", "monitorName", "manufacturer", "mibDescription"]
+
+# Definir los campos necesarios para cada colección
+
+# CUSTOMER
+customer_fields = {
+    "customerId": 1,
+    "name": 1,
+    "status": 1,
+    "city": 1,
+    "_id": 0
+}
+
+# DEVICE
+device_fields = {
+    "deviceId": 1,
+    "customerId": 1,
+    "serialNumber": 1,  # Serial del dispositivo
+    "ipAddress": 1,
+    "monitorStatus": 1,
+    "extendedFields": 1,  # Se aplana en la consulta (model, zone, location, firmware, etc.)
+    "discoveryDate": 1,
+    "lastContact": 1,
+    "_id": 0
+}
+
+# CONSUMABLE
+consumable_fields = {
+    "deviceId": 1,
+    "consumableId": 1,
+    "colour": 1,
+    "daysLeft": 1,
+    "daysMonitored": 1,
+    "description": 1,  # Descripción del consumible
+    "engineCyclesMonitored": 1,
+    "lastRead": 1,
+    "pagesLeft": 1,
+    "percentLeft": 1,
+    "serialNumber": 1,  # Serial del consumible
+    "sku": 1,
+    "type": 1,
+    "yield": 1,
+    "_id": 0
+}
+
+# CONSUMABLE_METRICS (métricas calculadas por sync_consumable_metrics.py)
+consumable_metrics_fields = {
+    "consumableId": 1,
+    "supplyStatus": 1,
+    "consumptionRate": 1,
+    "reorderRecommendation": 1,
+    "supplyCoverage": 1,
+    "supplyPerformance": 1,
+    "_id": 0
+}
+
+# METERS (Contadores)
+meters_fields = {
+    "billingDate": 1,
+    "readingDate": 1,
+    "readingDateTime": 1,
+    "a4Mono": 1,
+    "a4Colour": 1,
+    "engineCycles": 1,
+    "scans": 1,
+    "nonCopyScans": 1,
+    "monoSmall": 1,
+    "monoLarge": 1,
+    "colourSmall": 1,
+    "colourLarge": 1,
+    "monoTier": 1,
+    "colourTier1": 1,
+    "colourTier2": 1,
+    "colourTier3": 1,
+    "monoPages": 1,
+    "colourPages": 1,
+    "duplex": 1,
+    "deviceId": 1,
+    "_id": 0
+}
+
+# MONITOR
+monitor_fields = {
+    "monitorId": 1,
+    "createdDate": 1,
+    "customerId": 1,
+    "lastContact": 1,
+    "licenceDeviceLimit": 1,
+    "licenceExpiryDate": 1,
+    "licenceKey": 1,
+    "licenceProviderCode": 1,
+    "name": 1,
+    "online": 1,
+    "remoteApplication": 1,
+    "status": 1,
+    "_id": 0
+}
+
+
+def proyeccion_dispositivos(campos=device_fields, campos_extra=CAMPOS_EXTRA, valor_defecto="Desconocido"):
+    """
+    Construye la etapa $project para DEVICE que aplana "extendedFields".
+    Cada subcampo llega como columna plana y con el valor por defecto aplicado
+    en la consulta, así se evita expandir la columna fila por fila en pandas.
+    """
+    proyeccion = {campo: valor for campo, valor in campos.items() if campo != "extendedFields"}
+    for campo in campos_extra:
+        proyeccion[campo] = {"$ifNull": [f"$extendedFields.{campo}", valor_defecto]}
+    return {"$project": proyeccion}
+
+
+# -------------------------------------------------
+# Carga de cada colección en memoria (argumentos de datos.cache_incremental.CacheIncremental)
+# -------------------------------------------------
+# DEVICE, MONITOR: "updatedAt" lo mantienen sync_devices.py y sync_monitors.py (datos.marcas).
+# CONSUMABLE_METRICS: sync_consumable_metrics.py reescribe "updatedAt" en cada cálculo.
+# CUSTOMER, CONSUMABLE: si la colección no trae "updatedAt" se recarga completa al vencer el TTL.
+# METERS: solo recibe inserciones, "_id" sirve como marca (una lectura tardía puede
+# tener un readingDateTime anterior al máximo ya cargado, pero su _id siempre es mayor).
+CARGAS = {
+    "CUSTOMER": {"clave": "customerId", "proyeccion": customer_fields, "filtro": {"status": "ACTIVE"}},
+    "DEVICE": {"clave": "deviceId", "proyeccion": proyeccion_dispositivos(), "fechas": ["discoveryDate", "lastContact"]},
+    "CONSUMABLE": {"clave": "consumableId", "proyeccion": consumable_fields},
+    "CONSUMABLE_METRICS": {"clave": "consumableId", "proyeccion": consumable_metrics_fields},
+    "METERS": {"clave": "_id", "proyeccion": meters_fields, "marca": "_id", "fechas": ["readingDateTime", "billingDate"]},
+    "MONITOR": {"clave": "monitorId", "proyeccion": monitor_fields, "fechas": ["lastContact", "createdDate"]},
+}
@@ -0,0 +1,68 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from datos.rendimiento import medir
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Esquema compacto para los DataFrames de las páginas
+# -------------------------------------------------
+# Cada página declara un diccionario con tres listas de columnas:
+#   "categorias": etiquetas repetidas (Cliente, Modelo, Zona...) -> dtype category
+#   "enteros":    contadores enteros -> int32 cuando los valores caben
+#   "fechas":     columnas de fecha -> datetime ya parseado
+
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def memoria_mb(df):
+    """Memoria ocupada por el DataFrame (incluyendo cadenas) en MB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def _reducir_entero(serie):
+    # Solo se reduce a int32 (no a int8/int16) para que las sumas entre contadores no desborden
+    if not pd.api.types.is_integer_dtype(serie) or serie.empty:
+        return serie
+    if serie.min() >= INT32_MIN and serie.max() <= INT32_MAX:
+        return serie.astype(np.int32)
+    return serie
+
+
+@medir("aplicar_esquema")
+def aplicar_esquema(df, esquema, nombre="dataset"):
+    """
+    Aplica el esquema declarado de la página sobre df (modifica sus columnas)
+    y retorna el DataFrame junto con el reporte de memoria antes/después.
+    """
+    antes = memoria_mb(df)
+
+    for col in esquema.get("fechas", []):
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in esquema.get("enteros", []):
+        if col in df.columns:
+            df[col] = _reducir_entero(df[col])
+    for col in esquema.get("categorias", []):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    despues = memoria_mb(df)
+    reporte = {"nombre": nombre, "filas": len(df), "antes_mb": antes, "despues_mb": despues}
+    logger.info("Memoria de %s (%d filas): %.2f MB -> %.2f MB", nombre, len(df), antes, despues)
+    return df, reporte
+
+
+def contar_valores(serie):
+    """
+    value_counts que ignora las categorías sin filas (las que dejan los filtros)
+    y devuelve un índice de valores simples, no categórico.
+    """
+    conteo = serie.value_counts()
+    conteo = conteo[conteo > 0]
+    conteo.index = conteo.index.astype(object)
+    return conteo
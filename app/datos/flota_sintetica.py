@@ -0,0 +1,212 @@
+"""
+Flota sintética para medir cómo escalan las uniones de las páginas.
+
+generar_flota() arma, con numpy y sin tocar MongoDB, un DataFrame por
+colección con un registro por documento y los mismos campos que guardan los
+sync_*.py (fechas como texto ISO, igual que llegan de la API). Desde ahí:
+
+- tablas_flota(flota) retorna {colección: DataFrame} tal como los entrega
+  CacheIncremental con CARGAS (filtro, "extendedFields" aplanado y fechas
+  convertidas), listo para los armar_datos de datos.paginas.
+- escribir_flota(db, flota) inserta los documentos en una base de MongoDB
+  local para medir también la carga.
+
+La generación es determinista para una misma semilla.
+"""
+import numpy as np
+import pandas as pd
+
+from datos.consultas import CAMPOS_EXTRA, CARGAS
+from datos.metricas_consumibles import COLUMNAS_METRICAS, calcular_metricas_consumibles
+
+# Fecha de la última lectura de la flota; las demás fechas se cuentan hacia atrás
+FECHA_BASE = pd.Timestamp("2025-01-31", tz="UTC")
+
+# Fracción de clientes inactivos (CARGAS["CUSTOMER"] los excluye)
+INACTIVOS = 0.1
+# Fracción de dispositivos sin "extendedFields" y de campos extra ausentes en el resto
+SIN_EXTENDIDOS = 0.05
+CAMPOS_AUSENTES = 0.1
+
+MODELOS = [f"Modelo {i}" for i in range(40)]
+FIRMWARES = [f"FW {i}.{j}" for i in range(8) for j in range(5)]
+TIPOS_COLORES = [("TONER", "BLACK"), ("TONER", "CYAN"), ("TONER", "MAGENTA"), ("TONER", "YELLOW"),
+                 ("DRUM", "BLACK"), ("UNKNOWN", "NONE")]
+
+
+def _iso(fechas):
+    # Mismo formato que la API: "2025-01-31T08:15:00Z"
+    return pd.DatetimeIndex(fechas).strftime("%Y-%m-%dT%H:%M:%SZ").to_numpy(dtype=object)
+
+
+def generar_flota(clientes=100, dispositivos_por_cliente=20, consumibles_por_dispositivo=4,
+                  lecturas_por_dispositivo=30, monitores_por_cliente=2, semilla=0):
+    """
+    Retorna {colección: DataFrame} con los documentos de una flota sintética.
+    Los consumibles se reparten entre los tipos y colores de TIPOS_COLORES, con
+    reemplazos (el mismo tipo y color leído en fechas distintas) cuando hay más
+    consumibles que combinaciones. Las lecturas son diarias y acumuladas.
+    """
+    rng = np.random.default_rng(semilla)
+
+    # CUSTOMER
+    id_clientes = np.array([f"C{i:06d}" for i in range(clientes)], dtype=object)
+    customers = pd.DataFrame({
+        "customerId": id_clientes,
+        "name": [f"Cliente {i}" for i in range(clientes)],
+        "status": np.where(rng.random(clientes) < INACTIVOS, "INACTIVE", "ACTIVE").astype(object),
+        "city": rng.choice(["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga"], clientes).astype(object),
+    })
+
+    # DEVICE
+    n_disp = clientes * dispositivos_por_cliente
+    id_disp = np.array([f"D{i:08d}" for i in range(n_disp)], dtype=object)
+    descubiertos = FECHA_BASE - pd.to_timedelta(rng.integers(30, 1500, n_disp), unit="D")
+    contactos = FECHA_BASE - pd.to_timedelta(rng.integers(0, 60 * 24 * 3600, n_disp), unit="s")
+    devices = pd.DataFrame({
+        "deviceId": id_disp,
+        "customerId": np.repeat(id_clientes, dispositivos_por_cliente),
+        "serialNumber": [f"SN{i:08d}" for i in range(n_disp)],
+        "ipAddress": [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(n_disp)],
+        "monitorStatus": rng.choice(["Y", "N"], n_disp, p=[0.85, 0.15]).astype(object),
+        "discoveryDate": _iso(descubiertos),
+        "lastContact": _iso(contactos),
+    })
+    extras = {
+        "model": rng.choice(MODELOS, n_disp),
+        "zone": rng.choice([f"Zona {i}" for i in range(12)], n_disp),
+        "location": rng.choice([f"Piso {i}" for i in range(30)], n_disp),
+        "firmware": rng.choice(FIRMWARES, n_disp),
+        "hostName": [f"host-{i}" for i in range(n_disp)],
+        "monitorName": rng.choice([f"monitor-{i}" for i in range(monitores_por_cliente)], n_disp),
+        "manufacturer": rng.choice(["HP", "Lexmark", "Ricoh", "Kyocera"], n_disp),
+        "mibDescription": rng.choice(["Printer MIB", "Host Resources MIB"], n_disp),
+    }
+    sin_extendidos = rng.random(n_disp) < SIN_EXTENDIDOS
+    for campo in CAMPOS_EXTRA:
+        valores = pd.Series(extras[campo], dtype=object)
+        devices[campo] = valores.mask(sin_extendidos | (rng.random(n_disp) < CAMPOS_AUSENTES))
+
+    # CONSUMABLE
+    n_cons = n_disp * consumibles_por_dispositivo
+    posicion = np.tile(np.arange(consumibles_por_dispositivo), n_disp)
+    tipo_color = np.array(TIPOS_COLORES, dtype=object)[posicion % len(TIPOS_COLORES)]
+    rendimiento = rng.choice([1500, 3000, 6000, 12000, 25000], n_cons)
+    paginas_restantes = (rendimiento * rng.random(n_cons)).astype(np.int64)
+    # Cada reemplazo (vuelta por TIPOS_COLORES) se leyó 90 días antes que el siguiente
+    lecturas = FECHA_BASE - pd.to_timedelta(90 * (posicion // len(TIPOS_COLORES)) + rng.integers(0, 3, n_cons), unit="D")
+    consumables = pd.DataFrame({
+        "deviceId": np.repeat(id_disp, consumibles_por_dispositivo),
+        "consumableId": [f"K{i:09d}" for i in range(n_cons)],
+        "colour": tipo_color[:, 1],
+        "daysLeft": rng.integers(0, 365, n_cons),
+        "daysMonitored": rng.integers(0, 720, n_cons),
+        "description": [f"Suministro {t.lower()} {c.lower()}" for t, c in tipo_color],
+        "engineCyclesMonitored": rng.integers(0, 50000, n_cons),
+        "lastRead": _iso(lecturas),
+        "pagesLeft": paginas_restantes,
+        "percentLeft": (100 * paginas_restantes // rendimiento).astype(np.int64),
+        "serialNumber": [f"CS{i:09d}" for i in range(n_cons)],
+        "sku": rng.choice([f"SKU-{i:03d}" for i in range(60)], n_cons).astype(object),
+        "type": tipo_color[:, 0],
+        "yield": rendimiento,
+    })
+
+    # METERS: una lectura diaria por dispositivo con contadores acumulados
+    n_lect = n_disp * lecturas_por_dispositivo
+    dia = np.tile(np.arange(lecturas_por_dispositivo)[::-1], n_disp)
+    leido = FECHA_BASE.normalize() - pd.to_timedelta(dia, unit="D") + pd.to_timedelta(rng.integers(0, 86400, n_lect), unit="s")
+
+    def acumulado(maximo):
+        inicial = np.repeat(rng.integers(0, 500000, n_disp), lecturas_por_dispositivo)
+        diario = rng.integers(0, maximo, n_lect).reshape(n_disp, lecturas_por_dispositivo)
+        return inicial + diario.cumsum(axis=1).ravel()
+
+    mono = acumulado(400)
+    color = acumulado(150)
+    meters = pd.DataFrame({
+        "deviceId": np.repeat(id_disp, lecturas_por_dispositivo),
+        "billingDate": leido.strftime("%Y-%m-%d").to_numpy(dtype=object),
+        "readingDate": leido.strftime("%Y-%m-%d").to_numpy(dtype=object),
+        "readingDateTime": _iso(leido),
+        "engineCycles": mono + color,
+        "monoSmall": mono,
+        "colourSmall": color,
+        "colourPages": color,
+        "a4Mono": mono,
+        "a4Colour": color,
+        "scans": acumulado(200),
+        # Fracción fija de impresiones a doble cara por dispositivo: el contador sigue siendo acumulado
+        "duplex": ((mono + color) * np.repeat(rng.uniform(0.1, 0.5, n_disp), lecturas_por_dispositivo)).astype(np.int64),
+    })
+
+    # MONITOR
+    n_mon = clientes * monitores_por_cliente
+    monitors = pd.DataFrame({
+        "monitorId": [f"M{i:07d}" for i in range(n_mon)],
+        "customerId": np.repeat(id_clientes, monitores_por_cliente),
+        "name": [f"monitor-{i % monitores_por_cliente}" for i in range(n_mon)],
+        "status": rng.choice(["ACTIVE", "DISCONTINUED"], n_mon, p=[0.9, 0.1]).astype(object),
+        "online": rng.random(n_mon) < 0.8,
+        "lastContact": _iso(FECHA_BASE - pd.to_timedelta(rng.integers(0, 45 * 24 * 3600, n_mon), unit="s")),
+        "createdDate": _iso(FECHA_BASE - pd.to_timedelta(rng.integers(30, 1500, n_mon), unit="D")),
+        "licenceExpiryDate": _iso(FECHA_BASE + pd.to_timedelta(rng.integers(-30, 400, n_mon), unit="D")),
+        "licenceDeviceLimit": rng.choice([50, 100, 250, 500], n_mon),
+        "licenceProviderCode": "SIMP",
+        "remoteApplication": rng.choice(["4.1.0", "4.2.3", "5.0.1"], n_mon).astype(object),
+    })
+
+    # CONSUMABLE_METRICS: lo que guardaría sync_consumable_metrics.py
+    metricas = calcular_metricas_consumibles(consumables, devices)
+
+    return {
+        "CUSTOMER": customers,
+        "DEVICE": devices,
+        "CONSUMABLE": consumables,
+        "CONSUMABLE_METRICS": metricas,
+        "METERS": meters,
+        "MONITOR": monitors,
+    }
+
+
+def tablas_flota(flota):
+    """{colección: DataFrame} como los entrega CacheIncremental con CARGAS, sin pasar por MongoDB."""
+    tablas = {}
+    for coleccion, df in flota.items():
+        carga = CARGAS[coleccion]
+        df = df.copy()
+        for campo, valor in (carga.get("filtro") or {}).items():
+            df = df[df[campo] == valor].reset_index(drop=True)
+        if coleccion == "DEVICE":
+            df[CAMPOS_EXTRA] = df[CAMPOS_EXTRA].fillna("Desconocido")
+        if coleccion == "CONSUMABLE_METRICS":
+            df = df[["consumableId", *COLUMNAS_METRICAS]]
+        for col in carga.get("fechas", []):
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        tablas[coleccion] = df
+    return tablas
+
+
+def documentos(flota, coleccion):
+    """Documentos de la colección como los guardan los sync_*.py (sin nulos, "extendedFields" anidado)."""
+    df = flota[coleccion]
+    extras = CAMPOS_EXTRA if coleccion == "DEVICE" else []
+    base = df.drop(columns=extras).astype(object)
+    base = base.where(base.notna(), None)
+    registros = base.to_dict("records")
+    if extras:
+        for registro, campos in zip(registros, df[extras].to_dict("records")):
+            presentes = {campo: valor for campo, valor in campos.items() if isinstance(valor, str)}
+            if presentes:
+                registro["extendedFields"] = presentes
+    return [{campo: valor for campo, valor in registro.items() if valor is not None} for registro in registros]
+
+
+def escribir_flota(db, flota, lote=10000):
+    """Reemplaza las colecciones de la flota en `db` (solo para bases locales de prueba)."""
+    for coleccion in flota:
+        db[coleccion].delete_many({})
+        docs = documentos(flota, coleccion)
+        for inicio in range(0, len(docs), lote):
+            db[coleccion].insert_many(docs[inicio:inicio + lote], ordered=False)
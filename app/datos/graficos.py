@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Datos para los gráficos (agregación y muestreo en el servidor)
+# -------------------------------------------------
+# Altair incrusta los datos del gráfico en la página como JSON: con toda la flota
+# seleccionada eso son megas por gráfico. Estas funciones dejan solo las columnas
+# usadas y, si se supera el presupuesto de puntos, reducen los datos antes de enviarlos.
+
+MAX_PUNTOS = 5000   # Presupuesto de puntos por gráfico
+MAX_SERIES = 20     # Series que se conservan al agrupar el resto en "Otros"
+ETIQUETA_OTROS = "Otros (promedio)"
+
+
+def lttb(x, y, umbral):
+    """
+    Largest-Triangle-Three-Buckets: índices de `umbral` puntos que conservan la
+    forma de la serie (x ordenado de forma ascendente). Siempre incluye el
+    primer y el último punto.
+    """
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    tamano = (n - 2) / (umbral - 2)
+    indices = np.empty(umbral, dtype=np.int64)
+    indices[0] = 0
+    a = 0
+    for i in range(umbral - 2):
+        inicio = int(i * tamano) + 1
+        fin = int((i + 1) * tamano) + 1
+        # Promedio del siguiente bloque (el último bloque es solo el último punto)
+        sig_fin = min(int((i + 2) * tamano) + 1, n)
+        prom_x = x[fin:sig_fin].mean()
+        prom_y = y[fin:sig_fin].mean()
+        areas = np.abs((x[a] - prom_x) * (y[inicio:fin] - y[a]) - (x[a] - x[inicio:fin]) * (prom_y - y[a]))
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+    indices[-1] = n - 1
+    return indices
+
+
+def _agregar(df, fecha, serie, valor, frecuencia):
+    # Promedio por serie y periodo: el valor sigue siendo "diario" aunque el periodo sea una semana
+    periodos = df[fecha].dt.to_period(frecuencia).dt.start_time
+    return (df.assign(**{fecha: periodos})
+              .groupby([serie, fecha], as_index=False, observed=True, sort=True)[valor].mean())
+
+
+def serie_temporal(df, fecha, valor, serie, extras=(), max_puntos=MAX_PUNTOS, max_series=MAX_SERIES):
+    """
+    Datos para un gráfico de líneas con una línea por `serie`.
+
+    Siempre agrega por serie y día (promedio de las lecturas del mismo día).
+    Si los puntos superan `max_puntos`:
+      1. conserva las `max_series` series con mayor suma de `valor` y promedia el resto en "Otros",
+      2. si aún no alcanza, agrega por semana,
+      3. y por último reduce cada serie con LTTB.
+    `extras` son columnas constantes por serie (ej. "Cliente") que se conservan para el tooltip.
+    Retorna (DataFrame, resumen) con la fecha como texto "YYYY-MM-DD".
+    """
+    columnas = [serie, fecha, valor]
+    datos = df[columnas].dropna(subset=[valor]).copy()
+    datos[fecha] = pd.to_datetime(datos[fecha], errors="coerce")
+    datos = datos.dropna(subset=[fecha])
+    datos[serie] = datos[serie].astype(str)
+    resumen = {"puntos_originales": len(datos), "series_originales": datos[serie].nunique(), "periodo": "día"}
+
+    datos = _agregar(datos, fecha, serie, valor, "D")
+    if len(datos) > max_puntos and resumen["series_originales"] > max_series:
+        totales = datos.groupby(serie)[valor].sum().sort_values(ascending=False)
+        principales = totales.index[:max_series]
+        otros = datos[~datos[serie].isin(principales)]
+        otros = otros.groupby(fecha, as_index=False)[valor].mean().assign(**{serie: ETIQUETA_OTROS})
+        datos = pd.concat([datos[datos[serie].isin(principales)], otros[columnas]], ignore_index=True)
+    if len(datos) > max_puntos:
+        datos = _agregar(datos, fecha, serie, valor, "W")
+        resumen["periodo"] = "semana"
+    if len(datos) > max_puntos:
+        por_serie = max(3, max_puntos // datos[serie].nunique())
+        partes = []
+        for _, grupo in datos.groupby(serie, sort=False):
+            grupo = grupo.sort_values(fecha)
+            partes.append(grupo.iloc[lttb(grupo[fecha].astype("int64").to_numpy(), grupo[valor].to_numpy(), por_serie)])
+        datos = pd.concat(partes, ignore_index=True)
+
+    # Columnas constantes por serie para el tooltip ("Otros" queda vacío)
+    if extras:
+        por_serie = df[[serie, *extras]].astype({serie: str}).drop_duplicates(subset=[serie])
+        datos = datos.merge(por_serie, on=serie, how="left")
+    datos[fecha] = datos[fecha].dt.strftime("%Y-%m-%d")
+
+    resumen["puntos"] = len(datos)
+    resumen["series"] = datos[serie].nunique()
+    return datos, resumen
+
+
+def puntos_dispersion(df, columnas, max_puntos=MAX_PUNTOS, semilla=0):
+    """
+    Datos para un gráfico de dispersión: solo las `columnas` usadas en el
+    gráfico y, si se supera el presupuesto, una muestra aleatoria reproducible.
+    Retorna (DataFrame, resumen).
+    """
+    datos = df[list(dict.fromkeys(columnas))]
+    resumen = {"puntos_originales": len(datos), "periodo": None}
+    if len(datos) > max_puntos:
+        datos = datos.sample(n=max_puntos, random_state=semilla).sort_index()
+    resumen["puntos"] = len(datos)
+    return datos, resumen
+
+
+def descripcion_muestreo(resumen):
+    """Texto para mostrar bajo el gráfico cuando se descartaron puntos o series ("" si no)."""
+    descartados = resumen["puntos_originales"] - resumen["puntos"]
+    if descartados <= 0 and resumen.get("series", 0) >= resumen.get("series_originales", 0):
+        return ""
+    texto = f"Se muestran {resumen['puntos']:,} de {resumen['puntos_originales']:,} puntos"
+    if resumen.get("series_originales", 0) > resumen.get("series", 0):
+        texto += f"; {resumen['series_originales'] - resumen['series'] + 1} series agrupadas en \"{ETIQUETA_OTROS}\""
+    if resumen.get("periodo") == "semana":
+        texto += "; promedio semanal"
+    return texto + "."
@@ -0,0 +1,161 @@
+"""
+Indicadores del encabezado de las páginas Dispositivos y Monitores, calculados en MongoDB.
+
+Son conteos y promedios: en lugar de cargar todos los documentos en pandas
+se calculan con un pipeline de agregación ($match con los filtros activos y
+$group/$facet) que retorna un solo documento. Las páginas los muestran en
+cuanto tienen los filtros, antes de cargar los datos de la tabla y los
+gráficos.
+
+Mismo criterio que las uniones de datos.paginas: solo clientes activos
+(filtro de CARGAS["CUSTOMER"]), los campos de "extendedFields" con el mismo
+valor por defecto que la carga y, en Monitores, solo clientes con
+dispositivos y monitores que no están "DISCONTINUED".
+
+Las fechas se guardan como texto ISO, tal como llegan de la API; se
+convierten con $convert (una fecha inválida queda en null, igual que
+pd.to_datetime(errors="coerce")). Requiere MongoDB 4.0 o superior.
+"""
+from datetime import datetime, time, timezone
+
+from datos.consultas import CARGAS, proyeccion_dispositivos
+
+# Días en milisegundos (las restas de fechas en MongoDB dan milisegundos)
+DIA_MS = 24 * 3600 * 1000
+
+# Monitores que no cuentan para el indicador de licencias por vencer
+PREFIJOS_EXCLUIDOS_LICENCIA = ("sda_", "hpc_")
+# Días para considerar que una licencia está próxima a vencer
+DIAS_LICENCIA = 60
+
+
+# -------------------------------------------------
+# Expresiones comunes
+# -------------------------------------------------
+def _fecha(campo):
+    """Expresión con la fecha del campo (texto ISO o fecha); null si falta o no es válida."""
+    return {"$convert": {"input": f"${campo}", "to": "date", "onError": None, "onNull": None}}
+
+
+def _dias(desde, hasta):
+    """Días completos entre dos expresiones de fecha (como Timedelta.days: redondeo hacia abajo)."""
+    return {"$floor": {"$divide": [{"$subtract": [hasta, desde]}, DIA_MS]}}
+
+
+def _en_rango(campo, rango):
+    """
+    Condición ($expr) de que la fecha (UTC, sin hora) del campo esté en el
+    rango (inicio, fin), ambos incluidos. Igual que datos.paginas.en_rango:
+    sin rango o con uno incompleto no filtra; las fechas nulas quedan fuera.
+    """
+    if not rango or len(rango) != 2:
+        return None
+    inicio, fin = rango
+    return {"$and": [
+        {"$gte": [_fecha(campo), datetime.combine(inicio, time.min, tzinfo=timezone.utc)]},
+        {"$lte": [_fecha(campo), datetime.combine(fin, time.max, tzinfo=timezone.utc)]},
+    ]}
+
+
+def ids_clientes(db, nombres=None):
+    """customerId de los clientes activos, solo los de esos nombres si se pasan."""
+    consulta = dict(CARGAS["CUSTOMER"].get("filtro") or {})
+    if nombres:
+        consulta["name"] = {"$in": list(nombres)}
+    return db["CUSTOMER"].distinct("customerId", consulta)
+
+
+def _primero(resultado, faceta, campo="n", defecto=0):
+    # $facet retorna una lista por faceta (vacía si ningún documento llega a la etapa final);
+    # $avg sin valores da null
+    documentos = resultado[faceta]
+    valor = documentos[0][campo] if documentos else None
+    return defecto if valor is None else valor
+
+
+# -------------------------------------------------
+# Dispositivos
+# -------------------------------------------------
+def indicadores_dispositivos(db, filtros, rango_contacto=None, rango_descubrimiento=None):
+    """
+    Total de dispositivos, monitoreados ("monitorStatus" Y) y porcentaje
+    monitoreado para los filtros de la página: {columna: valores} con las
+    columnas de datos.paginas.dispositivos (name, model, monitorStatus,
+    zone, location) y los rangos de fechas (inicio, fin).
+    """
+    filtros = {columna: list(seleccion) for columna, seleccion in filtros.items() if seleccion}
+    clientes = ids_clientes(db, filtros.pop("name", None))
+
+    condiciones = [c for c in (_en_rango("lastContact", rango_contacto),
+                               _en_rango("discoveryDate", rango_descubrimiento)) if c]
+    coincidencia = {columna: {"$in": seleccion} for columna, seleccion in filtros.items()}
+    if condiciones:
+        coincidencia["$expr"] = {"$and": condiciones}
+
+    pipeline = [
+        {"$match": {"customerId": {"$in": clientes}}},
+        # Misma proyección que la carga: "extendedFields" aplanado con "Desconocido" por defecto
+        proyeccion_dispositivos(),
+        {"$match": coincidencia},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "monitoreados": {"$sum": {"$cond": [{"$eq": ["$monitorStatus", "Y"]}, 1, 0]}},
+        }},
+    ]
+    resultado = next(db["DEVICE"].aggregate(pipeline), {"total": 0, "monitoreados": 0})
+    total, monitoreados = resultado["total"], resultado["monitoreados"]
+    return {
+        "total": total,
+        "monitoreados": monitoreados,
+        "porcentaje_monitoreados": (monitoreados / total * 100) if total > 0 else 0,
+    }
+
+
+# -------------------------------------------------
+# Monitores
+# -------------------------------------------------
+def indicadores_monitores(db, filtros, seriales=None, ahora=None):
+    """
+    Total de monitores, online y offline, promedio de días sin reporte y
+    licencias que vencen en menos de DIAS_LICENCIA días para los filtros de
+    la página ({"Cliente": nombres, "Estado monitor": estados}) y los
+    seriales de dispositivos elegidos (se filtra por sus clientes).
+    """
+    ahora = ahora or datetime.now(timezone.utc)
+
+    # Clientes activos (de los nombres elegidos) que tienen dispositivos (de los seriales elegidos)
+    consulta_dispositivos = {"customerId": {"$in": ids_clientes(db, filtros.get("Cliente"))}}
+    if seriales:
+        consulta_dispositivos["serialNumber"] = {"$in": list(seriales)}
+    clientes = db["DEVICE"].distinct("customerId", consulta_dispositivos)
+
+    coincidencia = {"customerId": {"$in": clientes}, "status": {"$ne": "DISCONTINUED"}}
+    if filtros.get("Estado monitor"):
+        coincidencia["status"] = {"$ne": "DISCONTINUED", "$in": list(filtros["Estado monitor"])}
+
+    dias_a_vencer = _dias(ahora, _fecha("licenceExpiryDate"))
+    pipeline = [
+        {"$match": coincidencia},
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "online": [{"$match": {"online": True}}, {"$count": "n"}],
+            # $avg ignora los monitores sin fecha de contacto
+            "dias_sin_reporte": [{"$group": {"_id": None, "n": {"$avg": _dias(_fecha("lastContact"), ahora)}}}],
+            "licencia_proxima": [
+                {"$match": {"name": {"$not": {"$regex": "^(" + "|".join(PREFIJOS_EXCLUIDOS_LICENCIA) + ")"}}}},
+                {"$match": {"$expr": {"$and": [{"$ne": [dias_a_vencer, None]}, {"$lt": [dias_a_vencer, DIAS_LICENCIA]}]}}},
+                {"$count": "n"},
+            ],
+        }},
+    ]
+    resultado = next(db["MONITOR"].aggregate(pipeline))
+    total = _primero(resultado, "total")
+    online = _primero(resultado, "online")
+    return {
+        "total": total,
+        "online": online,
+        "offline": total - online,
+        "promedio_dias_sin_reporte": _primero(resultado, "dias_sin_reporte", defecto=float("nan")),
+        "licencia_proxima": _primero(resultado, "licencia_proxima"),
+    }
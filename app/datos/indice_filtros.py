@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from datos.rendimiento import medir
+
+
+# -------------------------------------------------
+# Índice de filtros de la barra lateral
+# -------------------------------------------------
+class IndiceFiltros:
+    """
+    Índice de las columnas que se filtran con multiselect.
+
+    Se construye una vez por DataFrame cacheado: para cada columna guarda la
+    lista ordenada de opciones y, para cada opción, las posiciones de sus
+    filas (arreglos de enteros ordenados). Aplicar los filtros es entonces
+    unir las posiciones de los valores elegidos en cada columna e
+    intersectar las columnas, sin recorrer ni copiar el DataFrame completo.
+
+    Las posiciones son posicionales (iloc). El índice y el DataFrame se
+    guardan juntos con st.cache_resource (comun.paginas): filtrar toma las
+    filas del DataFrame compartido (take) sin copiarlo entero.
+    """
+
+    def __init__(self, df, columnas):
+        self.filas_totales = len(df)
+        self._valores = {}
+        self._codigos = {}
+        self._posiciones = {}
+        self._orden_valores = {}
+        for columna in columnas:
+            if columna not in df.columns:
+                continue
+            # Códigos ordenados según el valor (-1 para nulos): la opción k es self._valores[columna][k]
+            codigos, valores = pd.factorize(df[columna], sort=True)
+            orden = np.argsort(codigos, kind="stable")
+            limites = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+            self._valores[columna] = list(valores)
+            self._codigos[columna] = codigos
+            self._posiciones[columna] = [orden[limites[k]:limites[k + 1]] for k in range(len(valores))]
+            self._orden_valores[columna] = {valor: k for k, valor in enumerate(self._valores[columna])}
+
+    def opciones(self, columna, filas=None):
+        """
+        Opciones ordenadas (sin nulos) de la columna. Si se pasan posiciones
+        de filas, solo las opciones presentes en esas filas.
+        """
+        if columna not in self._valores:
+            return []
+        if filas is None:
+            return self._valores[columna]
+        presentes = np.unique(self._codigos[columna][filas])
+        return [self._valores[columna][k] for k in presentes if k >= 0]
+
+    def filas(self, filtros):
+        """
+        Posiciones de las filas que cumplen todos los filtros {columna: valores elegidos}.
+        Retorna None si no hay ningún filtro activo (todas las filas).
+        """
+        resultado = None
+        for columna, seleccion in filtros.items():
+            if not seleccion or columna not in self._valores:
+                continue
+            indices = self._orden_valores[columna]
+            partes = [self._posiciones[columna][indices[v]] for v in seleccion if v in indices]
+            if not partes:
+                posiciones = np.empty(0, dtype=np.intp)
+            elif len(partes) == 1:
+                posiciones = partes[0]
+            else:
+                posiciones = np.sort(np.concatenate(partes))
+            resultado = posiciones if resultado is None else np.intersect1d(resultado, posiciones, assume_unique=True)
+        return resultado
+
+    @medir("filtros")
+    def filtrar(self, df, filtros):
+        """Subconjunto de df con los filtros aplicados (df sin copiar si no hay filtros activos)."""
+        filas = self.filas(filtros)
+        return df if filas is None else df.take(filas)
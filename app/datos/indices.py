@@ -0,0 +1,145 @@
+"""
+Índices de MongoDB que necesitan el dashboard y los scripts de sincronización.
+
+INDICES declara los índices de cada colección y CONSULTAS las formas de
+consulta que se ejecutan en producción (cachés incrementales, sondeo de
+versiones, upserts de los scripts sync_*.py, indicadores del encabezado de
+Dispositivos y Monitores y consultas del envío de correos). crear_indices() crea lo declarado (create_indexes no hace nada
+si el índice ya existe) y verificar_planes() ejecuta explain() sobre cada
+consulta y devuelve las que recorren la colección completa (COLLSCAN).
+
+Las lecturas completas intencionales (find({}) de los scripts, primera
+carga de las cachés sin filtro) no se verifican: ahí un COLLSCAN es lo
+correcto. ACCESS_LOGS tampoco aparece: su índice TTL lo crea
+comun.accesos con la retención configurada.
+
+Uso: python app/crear_indices.py
+"""
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# -------------------------------------------------
+# Índices por colección
+# -------------------------------------------------
+# No se declaran únicos los identificadores que llegan de la API (deviceId,
+# monitorId...): un duplicado histórico haría fallar la creación. La
+# excepción es CONSUMABLE_METRICS, que escribe solo sync_consumable_metrics.py.
+INDICES = {
+    "CUSTOMER": [
+        IndexModel([("customerId", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("updatedAt", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ],
+    "DEVICE": [
+        IndexModel([("deviceId", ASCENDING)]),
+        IndexModel([("customerId", ASCENDING)]),
+        IndexModel([("monitorStatus", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ],
+    "CONSUMABLE": [
+        IndexModel([("consumableId", ASCENDING)]),
+        IndexModel([("deviceId", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ],
+    # Mismos índices que crea sync_consumable_metrics.py (mismos nombres por defecto)
+    "CONSUMABLE_METRICS": [
+        IndexModel([("consumableId", ASCENDING)], unique=True),
+        IndexModel([("customerId", ASCENDING)]),
+        IndexModel([("daysLeft", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ],
+    "METERS": [
+        IndexModel([("deviceId", ASCENDING), ("readingDateTime", ASCENDING)]),
+        IndexModel([("readingDateTime", ASCENDING)]),
+        IndexModel([("billingDate", ASCENDING)]),
+        # METERS no mantiene "updatedAt", pero el sondeo de versiones lo consulta igual
+        IndexModel([("updatedAt", ASCENDING)]),
+    ],
+    "MONITOR": [
+        IndexModel([("monitorId", ASCENDING)]),
+        IndexModel([("customerId", ASCENDING)]),
+        IndexModel([("updatedAt", ASCENDING)]),
+    ],
+}
+
+# -------------------------------------------------
+# Formas de consulta a verificar
+# -------------------------------------------------
+# Los valores son de ejemplo: el plan depende de la forma del filtro, no del valor.
+# Los $match iniciales de aggregate y los filtros de update/delete usan el mismo
+# planificador que find(), así que todas se verifican como find(filtro).sort(orden).
+_FECHA = datetime(2025, 1, 1, tzinfo=timezone.utc)
+_ACTIVO = {"status": "ACTIVE"}
+_CAMBIADOS = {"updatedAt": {"$gte": _FECHA}}
+
+CONSULTAS = [
+    # (colección, descripción, filtro, orden)
+    ("CUSTOMER", "caché: carga de clientes activos", _ACTIVO, None),
+    ("CUSTOMER", "caché: refresco incremental", {"$and": [_ACTIVO, _CAMBIADOS]}, None),
+    ("CUSTOMER", "caché: clientes que dejaron de estar activos", {"$and": [{"$nor": [_ACTIVO]}, _CAMBIADOS]}, None),
+    ("CUSTOMER", "correo: clientes activos", _ACTIVO, None),
+    ("DEVICE", "caché: refresco incremental", _CAMBIADOS, None),
+    ("DEVICE", "sync_devices: upsert", {"deviceId": "D-0001"}, None),
+    ("DEVICE", "correo: dispositivos monitoreados", {"monitorStatus": "Y"}, None),
+    ("CONSUMABLE", "caché: refresco incremental", _CAMBIADOS, None),
+    ("CONSUMABLE_METRICS", "caché: refresco incremental", _CAMBIADOS, None),
+    ("CONSUMABLE_METRICS", "sync_consumable_metrics: upsert", {"consumableId": "C-0001"}, None),
+    ("CONSUMABLE_METRICS", "sync_consumable_metrics: borrar obsoletas", {"consumableId": {"$in": ["C-0001"]}}, None),
+    ("METERS", "caché: refresco incremental", {"_id": {"$gt": ObjectId.from_datetime(_FECHA)}}, None),
+    ("METERS", "sync_meters: lectura existente", {"deviceId": "D-0001", "readingDateTime": "2025-01-01T00:00:00Z"}, None),
+    ("MONITOR", "caché: refresco incremental", _CAMBIADOS, None),
+    ("MONITOR", "sync_monitors: upsert", {"monitorId": "M-0001"}, None),
+    # Indicadores del encabezado (datos.indicadores): distinct de clientes y dispositivos y $match inicial
+    ("CUSTOMER", "indicadores: clientes activos elegidos", {**_ACTIVO, "name": {"$in": ["Cliente"]}}, None),
+    ("DEVICE", "indicadores: dispositivos de los clientes", {"customerId": {"$in": ["CU-0001"]}}, None),
+    ("DEVICE", "indicadores: clientes de los seriales elegidos",
+     {"customerId": {"$in": ["CU-0001"]}, "serialNumber": {"$in": ["S-0001"]}}, None),
+    ("MONITOR", "indicadores: monitores de los clientes",
+     {"customerId": {"$in": ["CU-0001"]}, "status": {"$ne": "DISCONTINUED"}}, None),
+    ("MONITOR", "indicadores: monitores por estado",
+     {"customerId": {"$in": ["CU-0001"]}, "status": {"$ne": "DISCONTINUED", "$in": ["ACTIVE"]}}, None),
+]
+
+# Sondeo de versiones (datos.versiones): último _id y último updatedAt de cada colección
+for _coleccion in INDICES:
+    CONSULTAS.append((_coleccion, "versiones: último _id", {}, [("_id", DESCENDING)]))
+    CONSULTAS.append((_coleccion, "versiones: último updatedAt", {"updatedAt": {"$exists": True}},
+                      [("updatedAt", DESCENDING)]))
+
+
+def crear_indices(db, indices=INDICES):
+    """Crea los índices declarados. Retorna {colección: nombres de índices}."""
+    return {coleccion: db[coleccion].create_indexes(modelos) for coleccion, modelos in indices.items()}
+
+
+def etapas_plan(plan):
+    """Todas las etapas ("stage") de un plan de explain(), recorriendo los planes anidados."""
+    etapas = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            etapas.append(plan["stage"])
+        for valor in plan.values():
+            etapas.extend(etapas_plan(valor))
+    elif isinstance(plan, list):
+        for valor in plan:
+            etapas.extend(etapas_plan(valor))
+    return etapas
+
+
+def verificar_planes(db, consultas=CONSULTAS):
+    """
+    Ejecuta explain() (solo el planificador, sin leer documentos) sobre cada
+    consulta. Retorna una lista de (colección, descripción, etapas del plan
+    ganador, usa_collscan).
+    """
+    resultados = []
+    for coleccion, descripcion, filtro, orden in consultas:
+        comando = {"find": coleccion, "filter": filtro}
+        if orden:
+            comando["sort"] = dict(orden)
+        explicacion = db.command("explain", comando, verbosity="queryPlanner")
+        etapas = etapas_plan(explicacion["queryPlanner"]["winningPlan"])
+        resultados.append((coleccion, descripcion, etapas, "COLLSCAN" in etapas))
+    return resultados
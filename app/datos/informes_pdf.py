@@ -0,0 +1,295 @@
+"""
+Informes PDF de Consumibles y Contadores armados directamente con matplotlib.
+
+Los scripts de email capturaban la página del dashboard con un navegador
+(pyppeteer o wkhtmltopdf) y esperaban a que terminara de dibujarse. Aquí el
+PDF se arma desde los mismos datos de la página (datos.paginas) con el
+backend PDF de matplotlib: sin navegador ni dashboard en ejecución.
+
+Cada informe es un PDF A4 horizontal: una primera hoja con los indicadores
+y los gráficos principales, otra con el resto de los gráficos y las hojas de
+la tabla de detalle (hasta MAX_FILAS_TABLA filas; el detalle completo va en
+el Excel).
+"""
+import io
+
+import numpy as np
+from matplotlib import rc_context
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from datos.paginas import consumibles, contadores
+
+# A4 horizontal en pulgadas
+TAMANO_HOJA = (11.69, 8.27)
+# Filas de la tabla de detalle por hoja y en total, y caracteres por celda
+FILAS_POR_HOJA = 50
+MAX_FILAS_TABLA = 500
+MAX_CARACTERES_CELDA = 40
+# Fuente estándar de PDF (sin incrustar)
+FUENTE_PDF = {"pdf.use14corefonts": True, "font.family": "sans-serif", "font.sans-serif": ["Helvetica"]}
+# Colores de las barras (los de Altair por defecto)
+AZUL = "#4c78a8"
+NARANJA = "#f58518"
+
+
+# -------------------------------------------------
+# Elementos de las hojas
+# -------------------------------------------------
+def _hoja(titulo, subtitulo=None):
+    fig = Figure(figsize=TAMANO_HOJA)
+    fig.text(0.03, 0.955, titulo, fontsize=16, weight="bold")
+    if subtitulo:
+        fig.text(0.03, 0.925, subtitulo, fontsize=9, color="dimgray")
+    return fig
+
+
+def _indicadores(fig, pares, arriba=0.88):
+    """Fila de indicadores [(etiqueta, valor con formato)] bajo el título."""
+    ancho = 0.94 / len(pares)
+    for i, (etiqueta, valor) in enumerate(pares):
+        x = 0.03 + i * ancho
+        fig.text(x, arriba, etiqueta, fontsize=8, color="dimgray")
+        fig.text(x, arriba - 0.045, valor, fontsize=17)
+
+
+def _barras(ax, etiquetas, valores, titulo, horizontal=False, color=AZUL):
+    etiquetas = [str(e) for e in etiquetas]
+    if horizontal:
+        # De mayor a menor leyendo de arriba hacia abajo
+        ax.barh(etiquetas[::-1], list(valores)[::-1], color=color)
+    else:
+        ax.bar(etiquetas, list(valores), color=color)
+        ax.tick_params(axis="x", labelrotation=45 if len(etiquetas) > 6 else 0)
+    _estilo(ax, titulo)
+
+
+def _barras_agrupadas(ax, etiquetas, series, titulo):
+    """Barras lado a lado: series es [(nombre, valores, color)]."""
+    x = np.arange(len(etiquetas))
+    ancho = 0.8 / len(series)
+    for i, (nombre, valores, color) in enumerate(series):
+        ax.bar(x + (i - (len(series) - 1) / 2) * ancho, list(valores), ancho, label=nombre, color=color)
+    ax.set_xticks(x, [str(e) for e in etiquetas], rotation=90)
+    ax.legend(fontsize=7)
+    _estilo(ax, titulo)
+
+
+def _estilo(ax, titulo):
+    ax.set_title(titulo, fontsize=10, loc="left")
+    ax.tick_params(labelsize=7)
+    ax.spines[["top", "right"]].set_visible(False)
+
+
+def _tamanos(valores, minimo=10, maximo=200):
+    """Área de cada punto proporcional al valor (como size de Altair); sin valor, el mínimo."""
+    valores = valores.astype(float)
+    rango = valores.max() - valores.min()
+    if not rango > 0:
+        return np.full(len(valores), minimo, dtype=float)
+    return (minimo + (valores - valores.min()) / rango * (maximo - minimo)).fillna(minimo).to_numpy()
+
+
+def _sin_datos(ax, titulo):
+    ax.axis("off")
+    ax.set_title(titulo, fontsize=10, loc="left")
+    ax.text(0.5, 0.5, "Sin datos", ha="center", va="center", color="dimgray")
+
+
+def _texto_celda(valor):
+    if isinstance(valor, float):
+        return "" if np.isnan(valor) else f"{valor:,.2f}".rstrip("0").rstrip(".")
+    texto = "" if valor is None else str(valor)
+    return texto if len(texto) <= MAX_CARACTERES_CELDA else texto[:MAX_CARACTERES_CELDA - 1] + "…"
+
+
+def _tablas(pdf, df, titulo, subtitulo):
+    """
+    Hojas con la tabla de detalle, FILAS_POR_HOJA filas por hoja y hasta
+    MAX_FILAS_TABLA en total. Cada columna es un solo bloque de texto por
+    hoja (ax.table crea un rectángulo y un texto por celda y es decenas de
+    veces más lento); el ancho de cada columna es proporcional a su texto
+    más largo y la letra se achica si no caben en el ancho de la hoja.
+    """
+    total = len(df)
+    df = df.head(MAX_FILAS_TABLA)
+    if total > MAX_FILAS_TABLA:
+        subtitulo = f"{subtitulo} · Primeras {MAX_FILAS_TABLA} de {total} filas (el detalle completo va en el Excel)"
+    columnas = [str(c) for c in df.columns]
+    celdas = df.astype(object).map(_texto_celda)
+    largos = np.array([max([len(columna)] + celdas.iloc[:, i].str.len().tolist()) for i, columna in enumerate(columnas)]) + 2
+    # Ancho promedio de un carácter: ~0.55 del tamaño de letra (puntos)
+    ancho_puntos = 0.96 * TAMANO_HOJA[0] * 72
+    tamano_letra = min(6.5, ancho_puntos / (0.55 * largos.sum()))
+    posiciones = 0.02 + 0.96 * np.concatenate([[0], np.cumsum(largos)[:-1]]) / largos.sum()
+
+    for inicio in range(0, max(len(df), 1), FILAS_POR_HOJA):
+        fig = _hoja(titulo, subtitulo)
+        bloque = celdas.iloc[inicio:inicio + FILAS_POR_HOJA]
+        if bloque.empty:
+            fig.text(0.5, 0.5, "Sin datos", ha="center", va="center", color="dimgray")
+        for i, columna in enumerate(columnas):
+            fig.text(posiciones[i], 0.89, columna, fontsize=tamano_letra, weight="bold", va="top")
+            fig.text(posiciones[i], 0.865, "\n".join(bloque.iloc[:, i]), fontsize=tamano_letra, va="top", linespacing=1.5)
+        fig.add_artist(Line2D([0.02, 0.98], [0.87, 0.87], transform=fig.transFigure, linewidth=0.5, color="gray"))
+        pdf.savefig(fig)
+
+
+def _pdf(escribir):
+    """
+    Bytes del PDF que arma escribir(pdf). Usa Helvetica, una de las 14 fuentes
+    estándar de PDF: no se incrusta y no hay que trazar cada glifo, que con las
+    tablas es la mayor parte del tiempo.
+    """
+    salida = io.BytesIO()
+    with rc_context(FUENTE_PDF), PdfPages(salida) as pdf:
+        escribir(pdf)
+    return salida.getvalue()
+
+
+# -------------------------------------------------
+# Informe de Consumibles
+# -------------------------------------------------
+def vista_consumibles(df, cliente=None, customer_id=None):
+    """
+    Vista de la página Consumibles (datos.paginas.consumibles.armar_vista)
+    como la abre un enlace con ?Cliente=: filtro por cliente y el rango de
+    "Días Restantes" completo del slider. Con customer_id se filtra por el
+    identificador del cliente (dos clientes pueden tener el mismo nombre).
+    """
+    maximo = consumibles.maximo_dias(df)
+    if customer_id is not None:
+        filtros = {"customerId": [customer_id]}
+    else:
+        filtros = {"Cliente": [cliente] if cliente else []}
+    return consumibles.armar_vista(df, filtros, rango_dias=(0, maximo), slider_max=maximo)
+
+
+def informe_consumibles(vista, titulo="Dashboard de consumibles", subtitulo=None):
+    """PDF (bytes) con los indicadores, los gráficos y el detalle de una vista de Consumibles."""
+    subtitulo = subtitulo or ""
+
+    def escribir(pdf):
+        kpi = vista["indicadores"]
+        fig = _hoja(titulo, subtitulo)
+        _indicadores(fig, [
+            ("Total Consumibles", f"{kpi['total']}"),
+            ("Consumibles (<30 días)", f"{kpi['proximos_30d']}"),
+            ("Porcentaje <30", f"{kpi['porcentaje_30d']:.1f}%"),
+            ("Consumibles Críticos (<10 días)", f"{kpi['criticos']}"),
+            ("Porcentaje Crítico", f"{kpi['porcentaje_criticos']:.1f}%"),
+        ])
+        ejes = fig.subplots(2, 2, gridspec_kw={"left": 0.07, "right": 0.97, "top": 0.74, "bottom": 0.08,
+                                               "hspace": 0.55, "wspace": 0.35})
+
+        rangos = vista["rangos_dias"]
+        _barras(ejes[0, 0], rangos["dias_range"], rangos["count"], "Consumibles por rango de Días Restantes")
+
+        tipo = vista["reorden_tipo"]
+        if tipo.empty:
+            _sin_datos(ejes[0, 1], "Consumibles a reordenar por tipo")
+        else:
+            _barras(ejes[0, 1], tipo["Tipo"], tipo["size"], "Consumibles a reordenar por tipo")
+
+        top = vista["reorden_sku"].head(10)
+        if top.empty:
+            _sin_datos(ejes[1, 0], "Top 10 suministros a reordenar (SKU)")
+        else:
+            _barras(ejes[1, 0], top["SKU"], top["size"], "Top 10 suministros a reordenar (SKU)", horizontal=True)
+
+        cobertura = vista["cobertura"]
+        _barras(ejes[1, 1], cobertura["Rango Cobertura"], cobertura["Cantidad"], "Suministros por rango de cobertura")
+        pdf.savefig(fig)
+
+        # Dispersiones de la página: días restantes vs. tasa de consumo (consumibles actuales) y
+        # rendimiento teórico vs. impresiones (tamaño: páginas restantes, color: porcentaje restante)
+        fig = _hoja(titulo, subtitulo)
+        ejes = fig.subplots(1, 2, gridspec_kw={"left": 0.07, "right": 0.97, "top": 0.86, "bottom": 0.1, "wspace": 0.3})
+        df_scatter, _ = vista["dispersion_consumo"]
+        if df_scatter.empty:
+            _sin_datos(ejes[0], "Días Restantes vs. Tasa de Consumo (Actual)")
+        else:
+            ejes[0].scatter(df_scatter["Días Restantes"], df_scatter["consumption_rate"], s=12, color=AZUL, alpha=0.7)
+            ejes[0].set_xlabel("Días Restantes", fontsize=8)
+            ejes[0].set_ylabel("Tasa de Consumo (Impresiones/Día)", fontsize=8)
+            _estilo(ejes[0], "Días Restantes vs. Tasa de Consumo (Actual)")
+
+        df_scatter, _ = vista["dispersion_rendimiento"]
+        if df_scatter.empty:
+            _sin_datos(ejes[1], "Rendimiento Teórico vs. Impresiones (actuales)")
+        else:
+            puntos = ejes[1].scatter(df_scatter["Impresiones"], df_scatter["durac_teo"],
+                                     s=_tamanos(df_scatter["Páginas Restantes"]), c=df_scatter["Porcentaje Restante"],
+                                     cmap="RdYlGn", alpha=0.8)
+            barra = fig.colorbar(puntos, ax=ejes[1])
+            barra.set_label("Toner Restante", fontsize=8)
+            barra.ax.tick_params(labelsize=7)
+            ejes[1].set_xlabel("Impresiones toner Actual", fontsize=8)
+            ejes[1].set_ylabel("Durac. (teo)", fontsize=8)
+            _estilo(ejes[1], "Rendimiento Teórico vs. Impresiones (actuales)")
+        pdf.savefig(fig)
+
+        _tablas(pdf, vista["filtrado"][consumibles.columnas_detalle], titulo, f"{subtitulo} · Detalle de consumibles")
+
+    return _pdf(escribir)
+
+
+# -------------------------------------------------
+# Informe de Contadores
+# -------------------------------------------------
+# Columnas de la tabla del informe: última lectura de cada dispositivo
+columnas_ultimas_lecturas = ["Cliente", "Serial Dispositivo", "billingDate", "Ciclos de motor", "Paginas mono",
+                             "paginas color", "scans", "duplex", "simplex"]
+
+
+def informe_contadores(df, titulo="Dashboard de contadores", subtitulo=None):
+    """
+    PDF (bytes) con los indicadores, los gráficos y la última lectura de cada
+    dispositivo para los datos de Contadores dados (ya filtrados).
+    """
+    subtitulo = subtitulo or ""
+    ultimas = contadores.ultima_lectura_por_dispositivo(df)
+
+    def escribir(pdf):
+        kpi = contadores.indicadores(df)
+        fig = _hoja(titulo, subtitulo)
+        _indicadores(fig, [
+            ("Promedio Diario (ciclos de motor)", f"{kpi['ciclos_motor']:.0f}"),
+            ("Promedio Diario (Paginas mono)", f"{kpi['paginas_mono']:.0f}"),
+            ("Promedio Diario (Paginas color)", f"{kpi['paginas_color']:.0f}"),
+        ])
+        ejes = fig.subplots(1, 2, gridspec_kw={"left": 0.1, "right": 0.97, "top": 0.74, "bottom": 0.08, "wspace": 0.45})
+        mayores = ultimas.sort_values("Ciclos de motor", ascending=False).head(20)
+        menores = ultimas.sort_values("Ciclos de motor", ascending=True).head(20)
+        _barras(ejes[0], mayores["Serial Dispositivo"], mayores["Ciclos de motor"],
+                "Top 20 impresoras con mayor Engine Cycles", horizontal=True)
+        _barras(ejes[1], menores["Serial Dispositivo"], menores["Ciclos de motor"],
+                "Top 20 impresoras con menor Engine Cycles", horizontal=True)
+        pdf.savefig(fig)
+
+        fig = _hoja(titulo, subtitulo)
+        ejes = fig.subplots(2, 1, gridspec_kw={"left": 0.07, "right": 0.97, "top": 0.86, "bottom": 0.12, "hspace": 0.6})
+        # Consumo diario de todos los dispositivos (la página lo muestra por dispositivo)
+        consumo = df.groupby(df["billingDate"].dt.date)["engineCycles_daily"].sum()
+        if consumo.empty:
+            _sin_datos(ejes[0], "Consumo diario (ciclos de motor)")
+        else:
+            ejes[0].plot(consumo.index, consumo.to_numpy(), color=AZUL)
+            ejes[0].tick_params(axis="x", labelrotation=45)
+            _estilo(ejes[0], "Consumo diario (ciclos de motor, todos los dispositivos)")
+
+        duplex = ultimas.sort_values("duplex", ascending=False).head(20)
+        if duplex.empty:
+            _sin_datos(ejes[1], "Comparativa duplex vs. simplex")
+        else:
+            _barras_agrupadas(ejes[1], duplex["Serial Dispositivo"],
+                              [("duplex", duplex["duplex"], AZUL), ("simplex", duplex["simplex"], NARANJA)],
+                              "Comparativa: impresiones duplex vs. simplex (top impresoras por duplex)")
+        pdf.savefig(fig)
+
+        tabla = ultimas[columnas_ultimas_lecturas].sort_values(["Cliente", "Serial Dispositivo"])
+        tabla = tabla.assign(billingDate=tabla["billingDate"].dt.strftime("%Y-%m-%d"))
+        _tablas(pdf, tabla, titulo, f"{subtitulo} · Última lectura por dispositivo")
+
+    return _pdf(escribir)
@@ -0,0 +1,103 @@
+"""
+Instantáneas en disco de los DataFrames de las páginas, compartidas entre procesos.
+
+publicar_instantaneas.py arma los datos de cada página (datos.paginas) una
+sola vez y los publica aquí; los procesos del dashboard los leen en lugar de
+cargar las colecciones de MongoDB, así la carga sobre MongoDB no crece con
+la cantidad de réplicas.
+
+Formato: archivo Arrow IPC sin compresión ("<Página>-<versión>.arrow"). A
+diferencia de Parquet, que siempre se decodifica a memoria propia del
+proceso, un archivo Arrow se lee con memory_map sin copiar: las columnas
+numéricas y de fechas sin nulos y los códigos de las categóricas quedan
+respaldados por la caché de páginas del sistema, que es una sola para todos
+los procesos del servidor. Esos arreglos son de solo lectura. Las columnas
+de texto (object) y las numéricas con nulos sí se copian a cada proceso.
+
+Para que el mapeo se comparta, el DataFrame se sirve con st.cache_resource
+(comun.paginas: una sola referencia por proceso para todas las sesiones). Un
+st.cache_data lo serializaría y entregaría una copia propia en cada llamada.
+
+Publicación atómica: se escribe un temporal en el mismo directorio y se
+renombra con os.replace; un lector nunca ve un archivo a medio escribir. La
+versión es la marca de tiempo UTC de la publicación y la más reciente es la
+vigente. Se conservan las últimas CONSERVAR versiones para los procesos que
+todavía tienen abierta una anterior.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+EXTENSION = ".arrow"
+CONSERVAR = 3
+
+
+def _archivo(directorio, nombre, version):
+    return Path(directorio) / f"{nombre}-{version}{EXTENSION}"
+
+
+def versiones_instantanea(directorio, nombre):
+    """Versiones publicadas de la página, de la más antigua a la más reciente."""
+    prefijo = f"{nombre}-"
+    try:
+        archivos = os.listdir(directorio)
+    except FileNotFoundError:
+        return []
+    return sorted(a[len(prefijo):-len(EXTENSION)] for a in archivos
+                  if a.startswith(prefijo) and a.endswith(EXTENSION))
+
+
+def ultima_version(directorio, nombre):
+    """Versión vigente de la página o None si nunca se publicó."""
+    versiones = versiones_instantanea(directorio, nombre)
+    return versiones[-1] if versiones else None
+
+
+def publicar_instantanea(directorio, nombre, df, reporte=None):
+    """Escribe df como nueva versión de la página de forma atómica. Retorna la versión."""
+    Path(directorio).mkdir(parents=True, exist_ok=True)
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    tabla = pa.Table.from_pandas(df)
+    # El reporte de memoria de aplicar_esquema viaja en los metadatos del esquema
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos[b"reporte_memoria"] = json.dumps(reporte).encode("utf-8")
+    tabla = tabla.replace_schema_metadata(metadatos)
+
+    destino = _archivo(directorio, nombre, version)
+    temporal = destino.with_suffix(".tmp")
+    with pa.OSFile(str(temporal), "wb") as salida:
+        with pa.ipc.new_file(salida, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    with open(temporal, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(temporal, destino)
+    _limpiar(directorio, nombre)
+    return version
+
+
+def leer_instantanea(directorio, nombre, version):
+    """
+    Retorna (DataFrame, reporte_memoria) de la versión dada, leída con
+    memory_map. Los arreglos sin copiar son de solo lectura: el DataFrame no
+    se debe modificar.
+    """
+    # No se cierra el mapeo: los arreglos sin copiar lo mantienen abierto mientras existan
+    fuente = pa.memory_map(str(_archivo(directorio, nombre, version)), "r")
+    tabla = pa.ipc.open_file(fuente).read_all()
+    reporte = json.loads((tabla.schema.metadata or {}).get(b"reporte_memoria", b"null"))
+    return tabla.to_pandas(split_blocks=True), reporte
+
+
+def _limpiar(directorio, nombre):
+    for version in versiones_instantanea(directorio, nombre)[:-CONSERVAR]:
+        try:
+            os.remove(_archivo(directorio, nombre, version))
+        except OSError as e:
+            # En Windows un archivo mapeado por otro proceso no se puede borrar: queda para la próxima
+            logger.info("No se pudo borrar la instantánea %s %s: %s", nombre, version, e)
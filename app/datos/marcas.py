@@ -0,0 +1,23 @@
+"""
+Marca de actualización ("updatedAt") de los documentos que escriben los sync_*.py.
+
+El refresco incremental del dashboard (datos.cache_incremental) lee solo los
+documentos con "updatedAt" posterior a la última carga: la marca debe
+cambiar cuando cambia el documento y solo entonces.
+"""
+
+
+def actualizacion_con_marca(documento):
+    """
+    Pipeline de update_one que asigna los campos del documento y, en la misma
+    escritura, pone "updatedAt" con la hora del servidor solo si el documento
+    se inserta o algún campo cambia. Si nada cambia MongoDB no escribe.
+    """
+    # $literal: los subdocumentos se reemplazan tal cual (no se mezclan con los existentes)
+    campos = {campo: {"$literal": valor} for campo, valor in documento.items()}
+    cambio = {"$or": [{"$ne": [f"${campo}", valor]} for campo, valor in campos.items()]
+                      + [{"$not": ["$updatedAt"]}]}
+    return [
+        {"$set": {"updatedAt": {"$cond": [cambio, "$$NOW", "$updatedAt"]}}},
+        {"$set": campos},
+    ]
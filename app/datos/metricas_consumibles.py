@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from datos.rendimiento import medir
+
+# -------------------------------------------------
+# Métricas derivadas de consumibles (CONSUMABLE_METRICS)
+# -------------------------------------------------
+# Se calculan una vez por sincronización de consumibles (sync_consumable_metrics.py)
+# y el dashboard y los informes las leen directamente de la colección.
+
+# Parámetros para el forecast
+TARGET_DAYS = 90         # Días de suministro deseados
+THRESHOLD_DAYS = 30      # Umbral para reordenar
+ADJUSTMENT_FACTOR = 0.1
+
+# Nombre de cada métrica en la colección y en las páginas
+COLUMNAS_METRICAS = {
+    "supplyStatus": "Estado Suministro",
+    "consumptionRate": "consumption_rate",
+    "reorderRecommendation": "reorder_recommendation",
+    "supplyCoverage": "Cobertura Suministro",
+    "supplyPerformance": "Rendimiento Consumible",
+}
+
+
+@medir("marcar_estado_suministros")
+def marcar_estado_suministros(df):
+    """
+    Estado de cada consumible: "Actual" si es la última lectura de su grupo
+    (mismo dispositivo, tipo y color; si el tipo es "UNKNOWN" también la
+    descripción) y "Reemplazado" si no. Usa los nombres de campo de CONSUMABLE.
+    """
+    lectura = pd.to_datetime(df["lastRead"], errors="coerce")
+    desconocido = df["type"].str.upper().eq("UNKNOWN")
+    claves = pd.DataFrame({
+        "deviceId": df["deviceId"].values,
+        "type": df["type"].values,
+        "colour": df["colour"].values,
+        "description": df["description"].where(desconocido, "").values,
+        "lastRead": lectura.values,
+    })
+    grupos = claves.groupby(["deviceId", "type", "colour", "description"], dropna=False, sort=False)["lastRead"]
+    maxima = grupos.transform("max").values
+    tamano = grupos.transform("size").values
+    # Si hay empates en la fecha máxima se marcan todos como "Actual"
+    return pd.Series(np.where((tamano == 1) | (lectura.values == maxima), "Actual", "Reemplazado"), index=df.index)
+
+
+@medir("calcular_metricas_consumibles")
+def calcular_metricas_consumibles(df_consumables, df_devices):
+    """
+    Calcula las métricas derivadas de cada consumible a partir de CONSUMABLE
+    y del customerId de DEVICE. Retorna un DataFrame con un registro por consumableId.
+    """
+    df = pd.merge(df_consumables, df_devices[["deviceId", "customerId"]].drop_duplicates("deviceId"),
+                  on="deviceId", how="left")
+    for col in ["engineCyclesMonitored", "daysMonitored"]:
+        if col not in df.columns:
+            df[col] = 0
+
+    actual = marcar_estado_suministros(df) == "Actual"
+    impresiones = df["engineCyclesMonitored"]
+    dias_restantes = df["daysLeft"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        consumo = np.where(df["daysMonitored"] == 0, 0, impresiones / df["daysMonitored"])
+        # Recomendación de compra solo para consumibles "Actual"
+        reorden = np.where(
+            (dias_restantes <= THRESHOLD_DAYS) & actual,
+            consumo * (TARGET_DAYS - dias_restantes) * ADJUSTMENT_FACTOR,
+            0
+        )
+        # Cobertura = (5% * durac_teo / Impresiones) * 100 y Rendimiento = (Impresiones / durac_teo) * 100
+        # Para los consumibles "Actual" se suman las páginas restantes a las impresiones
+        paginas = np.where(actual, impresiones + df["pagesLeft"], impresiones)
+        cobertura = (0.05 * df["yield"]) / paginas * 100
+        rendimiento = paginas / df["yield"] * 100
+
+    return pd.DataFrame({
+        "consumableId": df["consumableId"],
+        "deviceId": df["deviceId"],
+        "customerId": df["customerId"],
+        "daysLeft": dias_restantes,
+        "supplyStatus": np.where(actual, "Actual", "Reemplazado"),
+        "consumptionRate": consumo,
+        "reorderRecommendation": (
+            pd.Series(reorden).replace([np.inf, -np.inf], np.nan).fillna(0).round().astype(int).values
+        ),
+        "supplyCoverage": np.round(cobertura, 2),
+        "supplyPerformance": np.round(rendimiento, 2),
+    })
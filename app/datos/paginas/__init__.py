@@ -0,0 +1,61 @@
+"""
+Datos de cada página del dashboard, sin Streamlit.
+
+Cada módulo (dispositivos, monitores, consumibles, contadores) expone:
+
+- NOMBRE y COLECCIONES: nombre de la página y colecciones de las que depende.
+- armar_datos(tablas): (DataFrame, reporte_memoria) a partir de {colección: DataFrame}.
+- filtrar_datos(df, filtros, ...): el DataFrame con los filtros de la barra lateral.
+- resumen(df, reporte): lo que la página necesita antes de filtrar (fechas, máximos).
+
+Las páginas (a través de comun.paginas), publicar_instantaneas.py, los
+informes de email y benchmark_paginas.py usan las mismas funciones. Fuera
+del dashboard los datos se cargan con cargar_tablas(db, ...) o datos_desde_db.
+"""
+import pandas as pd
+
+from datos.cache_incremental import CacheIncremental
+from datos.consultas import CARGAS
+
+
+def cargar_tablas(db, colecciones):
+    """{colección: DataFrame} leídos de `db` con la misma proyección, filtro y fechas que el dashboard."""
+    return {coleccion: CacheIncremental(db[coleccion], ttl=None, **CARGAS[coleccion]).obtener()
+            for coleccion in colecciones}
+
+
+def datos_desde_db(pagina, db):
+    """(DataFrame, reporte_memoria) de una página (módulo de datos.paginas) leyendo sus colecciones de `db`."""
+    return pagina.armar_datos(cargar_tablas(db, pagina.COLECCIONES))
+
+
+def filtrar_columnas(df, filtros, indice=None):
+    """
+    Filas que cumplen todos los filtros {columna: valores elegidos}; una lista
+    vacía no filtra. Con un IndiceFiltros del mismo DataFrame se usan sus
+    posiciones precalculadas (dashboard); sin índice se compara columna a columna.
+    """
+    if indice is not None:
+        return indice.filtrar(df, filtros)
+    for columna, seleccion in filtros.items():
+        if seleccion:
+            df = df[df[columna].isin(seleccion)]
+    return df
+
+
+def en_rango(df, columna, rango):
+    """
+    Filas cuya fecha (sin hora) de `columna` está en el rango (inicio, fin),
+    ambos incluidos. Sin rango, o con uno incompleto (st.date_input mientras se
+    elige el fin), no filtra. Si todas las filas están en el rango (el rango
+    por defecto de las páginas) retorna df sin copiarlo.
+    """
+    if not rango or len(rango) != 2:
+        return df
+    inicio, fin = rango
+    fechas = df[columna]
+    # Se compara con marcas de tiempo en la zona de la columna: [inicio 00:00, fin + 1 día)
+    desde = pd.Timestamp(inicio).tz_localize(fechas.dt.tz)
+    hasta = pd.Timestamp(fin).tz_localize(fechas.dt.tz) + pd.Timedelta(days=1)
+    dentro = (fechas >= desde) & (fechas < hasta)
+    return df if dentro.all() else df[dentro]
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+
+from datos.esquemas import aplicar_esquema
+from datos.graficos import puntos_dispersion
+from datos.metricas_consumibles import COLUMNAS_METRICAS, THRESHOLD_DAYS, calcular_metricas_consumibles
+from datos.paginas import filtrar_columnas
+from datos.rendimiento import medir
+
+# -------------------------------------------------
+# Datos de la página Consumibles: unión de CONSUMABLE, DEVICE, CUSTOMER y CONSUMABLE_METRICS
+# -------------------------------------------------
+# Nombre de la página (reporte de memoria e instantáneas en disco)
+NOMBRE = "Consumibles"
+
+# Colecciones de las que depende la página, en el orden de la clave de caché
+COLECCIONES = ("CONSUMABLE", "DEVICE", "CUSTOMER", "CONSUMABLE_METRICS")
+
+# Esquema compacto del DataFrame unido (nombres ya renombrados para visualización)
+esquema_consumibles = {
+    "categorias": ["Cliente", "customerId", "Ciudad", "Estado de Monitoreo", "Modelo", "Zona", "Ubicación", "Firmware",
+                   "Tipo", "Color", "SKU", "Descripción", "Estado Suministro"],
+    "enteros": ["Días Restantes", "Porcentaje Restante", "Días Monitoreados", "Impresiones", "Páginas Restantes", "durac. (teo)"],
+    "fechas": ["Última Lectura"]
+}
+
+# Columnas de los filtros multiselect
+columnas_filtro = ["Cliente", "Serial Dispositivo", "Tipo", "Color", "Estado Suministro"]
+
+# "Días Restantes" máximo del slider de la página
+MAX_DIAS_SLIDER = 1000
+
+# Columnas de la tabla de detalle (página e informe PDF)
+columnas_detalle = ["Cliente", "Serial Dispositivo", "Direccion IP", "Serial Consumible", "Tipo", "Color", "SKU", "Descripción",
+                    "Días Restantes", "Porcentaje Restante", "Impresiones", "durac_teo", "reorder_recommendation",
+                    "Estado Suministro", "Cobertura Suministro", "Rendimiento Consumible"]
+
+# Rangos de los gráficos de barras
+ETIQUETAS_DIAS = ["<30", "30-60", "60-90", ">=90"]
+ETIQUETAS_COBERTURA = ["<=5%", "5% - 8%", ">8% - 12%", "12% - 20%", ">20%"]
+
+# Columnas de los gráficos de dispersión (también son su tooltip)
+columnas_dispersion_consumo = ["Cliente", "Serial Dispositivo", "Tipo", "Color", "Porcentaje Restante", "Días Restantes",
+                               "Impresiones", "consumption_rate", "reorder_recommendation"]
+columnas_dispersion_rendimiento = ["Cliente", "Serial Dispositivo", "Tipo", "Color", "Impresiones", "durac_teo",
+                                   "Porcentaje Restante", "Páginas Restantes"]
+
+# Función para unir datos de CONSUMABLE, DEVICE y CUSTOMER (INNER JOIN)
+@medir("unir_datos_consumibles")
+def unir_datos_consumibles(df_consumables, df_devices, df_customers):
+    if df_consumables.empty or df_devices.empty or df_customers.empty:
+        return pd.DataFrame()
+
+    # Unir consumibles con dispositivos usando "deviceId"
+    df_join = pd.merge(df_consumables, df_devices, on="deviceId", how="inner")
+    # Unir con clientes usando "customerId" del DEVICE
+    df_join = pd.merge(df_join, df_customers, on="customerId", how="inner")
+
+    # Renombrar columnas para diferenciar serial de dispositivo y consumible
+    df_join = df_join.rename(columns={
+        "serialNumber_x": "Serial Consumible",
+        "serialNumber_y": "Serial Dispositivo"
+    })
+
+    # Orden deseado de columnas
+    orden_columnas = [
+        "name", "customerId", "city",
+        "deviceId",
+        "Serial Dispositivo",
+        "ipAddress",
+        "monitorStatus",
+        "model", "zone", "location", "firmware",
+        "consumableId",
+        "type", "colour",
+        "daysLeft", "percentLeft", "daysMonitored", "engineCyclesMonitored",
+        "lastRead", "pagesLeft", "sku", "yield",
+        "Serial Consumible",
+        "description"
+    ]
+    df_join = df_join[[col for col in orden_columnas if col in df_join.columns]]
+
+    # Renombrar para visualización
+    df_join = df_join.rename(columns={
+        "name": "Cliente",
+        "city": "Ciudad",
+        "ipAddress": "Direccion IP",
+        "monitorStatus": "Estado de Monitoreo",
+        "model": "Modelo",
+        "zone": "Zona",
+        "location": "Ubicación",
+        "firmware": "Firmware",
+        "consumableId": "ID Consumible",
+        "type": "Tipo",
+        "colour": "Color",
+        "daysLeft": "Días Restantes",
+        "percentLeft": "Porcentaje Restante",
+        "daysMonitored": "Días Monitoreados",
+        "engineCyclesMonitored": "Impresiones",
+        "lastRead": "Última Lectura",
+        "pagesLeft": "Páginas Restantes",
+        "sku": "SKU",
+        "yield": "durac. (teo)",
+        "description": "Descripción"
+    })
+    return df_join
+
+# DataFrame de la página (unión con las métricas de CONSUMABLE_METRICS) a partir de {colección: DataFrame}
+def armar_datos(tablas):
+    df = unir_datos_consumibles(tablas["CONSUMABLE"], tablas["DEVICE"], tablas["CUSTOMER"])
+    if df.empty:
+        return df, None
+
+    # Asegurarse de que "Impresiones" y "Días Monitoreados" existen
+    if "Impresiones" not in df.columns:
+        df["Impresiones"] = 0
+    if "Días Monitoreados" not in df.columns:
+        df["Días Monitoreados"] = 0
+
+    # Métricas precalculadas por sync_consumable_metrics.py (estado, consumo, reorden, cobertura y rendimiento).
+    # Si la colección está vacía o le faltan consumibles se calculan aquí con la misma función.
+    df_metricas = tablas["CONSUMABLE_METRICS"]
+    if df_metricas.empty or not df["ID Consumible"].isin(df_metricas["consumableId"]).all():
+        df_metricas = calcular_metricas_consumibles(tablas["CONSUMABLE"], tablas["DEVICE"])
+    df_metricas = df_metricas[["consumableId", *COLUMNAS_METRICAS]].rename(
+        columns={"consumableId": "ID Consumible", **COLUMNAS_METRICAS})
+    df = pd.merge(df, df_metricas, on="ID Consumible", how="left")
+    return aplicar_esquema(df, esquema_consumibles, NOMBRE)
+
+# Filtros de la barra lateral: multiselect {columna: valores} y rango de "Días Restantes" (mínimo, máximo)
+def filtrar_datos(df, filtros, indice=None, rango_dias=None):
+    df = filtrar_columnas(df, filtros, indice)
+    if rango_dias:
+        df = df[(df["Días Restantes"] >= rango_dias[0]) & (df["Días Restantes"] <= rango_dias[1])]
+    return df
+
+# Consumibles vigentes: "Actual" y de dispositivos en monitoreo (indicadores y recomendaciones)
+def consumibles_actuales(df):
+    return df[(df["Estado Suministro"] == "Actual") & (df["Estado de Monitoreo"] == "Y")]
+
+# Columnas para los gráficos y la tabla de detalle
+def preparar_vista(df):
+    df = df.rename(columns={"durac. (teo)": "durac_teo"})
+    # Si no se ha renombrado previamente, reemplazar "Rendimiento" por "durac_teo"
+    if "durac_teo" not in df.columns and "Rendimiento" in df.columns:
+        df = df.rename(columns={"Rendimiento": "durac_teo"})
+    # Asegurarse de que "Tipo" es de tipo cadena
+    return df.assign(Tipo=df["Tipo"].astype(str))
+
+# -------------------------------------------------
+# Indicadores y datos de los gráficos de la página
+# -------------------------------------------------
+def indicadores(df_actual):
+    total = len(df_actual)
+    proximos = int((df_actual["Días Restantes"] <= THRESHOLD_DAYS).sum())
+    criticos = int((df_actual["Días Restantes"] <= 10).sum())
+    return {
+        "total": total,
+        "proximos_30d": proximos,
+        "porcentaje_30d": (proximos / total * 100) if total > 0 else 0,
+        "criticos": criticos,
+        "porcentaje_criticos": (criticos / total * 100) if total > 0 else 0,
+    }
+
+# Cantidad de consumibles por rango de "Días Restantes" (el último rango llega hasta slider_max).
+# Con slider_max < 90 (ej. un cliente con pocos días restantes) el último rango queda vacío:
+# los bordes de pd.cut deben ser crecientes
+def conteo_rangos_dias(df, slider_max):
+    bins = [0, 30, 60, 90, max(slider_max, 90) + 1]
+    dias_range = pd.cut(df["Días Restantes"], bins=bins, labels=ETIQUETAS_DIAS, include_lowest=True)
+    dias_range = pd.Categorical(dias_range, categories=ETIQUETAS_DIAS, ordered=True)
+    range_counts = pd.Series(dias_range, name="dias_range").value_counts().sort_index()
+    range_counts_df = range_counts.reset_index()
+    range_counts_df.columns = ["dias_range", "count"]
+    return range_counts_df
+
+# Consumibles "Actual" a reordenar por tipo
+def reorden_por_tipo(df_actual):
+    return df_actual[df_actual["reorder_recommendation"] > 0].groupby("Tipo", as_index=False, observed=True).size()
+
+# Consumibles a reordenar agrupados por SKU y Descripción, de mayor a menor cantidad
+def reorden_por_sku(df):
+    df_reorder = df[df["reorder_recommendation"] > 0].groupby(["SKU", "Descripción"], as_index=False, observed=True).size()
+    return df_reorder.sort_values("size", ascending=False)
+
+# Cantidad de suministros por rango de "Cobertura Suministro"
+def conteo_cobertura(df):
+    bins = [0, 5, 8, 12, 20, np.inf]
+    rango_cobertura = pd.cut(df["Cobertura Suministro"], bins=bins, labels=ETIQUETAS_COBERTURA, right=True)
+    rango_cobertura = pd.Categorical(rango_cobertura, categories=ETIQUETAS_COBERTURA, ordered=True)
+    return pd.DataFrame({"Rango Cobertura": rango_cobertura}).groupby("Rango Cobertura", observed=False).size().reset_index(name="Cantidad")
+
+# Máximo del slider de "Días Restantes": el mayor valor del DataFrame, hasta MAX_DIAS_SLIDER
+def maximo_dias(df):
+    return min(int(df["Días Restantes"].max()), MAX_DIAS_SLIDER) if not df.empty else 0
+
+# Lo que la página necesita antes de filtrar: si hay datos, el reporte de memoria y el máximo del slider
+def resumen(df, reporte):
+    return {"vacio": df.empty, "reporte_memoria": reporte, "slider_max": maximo_dias(df)}
+
+@medir("armar_vista")
+def armar_vista(df, filtros, indice=None, rango_dias=None, slider_max=None):
+    """
+    Todo lo que muestra la página para unos filtros: el DataFrame filtrado
+    (con las columnas de preparar_vista), los consumibles actuales, los
+    indicadores y los datos de cada gráfico. comun.paginas.consumibles lo
+    guarda en una caché compartida entre sesiones.
+    """
+    df_filtered = filtrar_datos(df, filtros, indice, rango_dias)
+    df_actual = consumibles_actuales(df_filtered)
+    df_filtered = preparar_vista(df_filtered)
+    if slider_max is None:
+        slider_max = int(df["Días Restantes"].max())
+    return {
+        "filtrado": df_filtered,
+        "indicadores": indicadores(df_actual),
+        "rangos_dias": conteo_rangos_dias(df_filtered, slider_max),
+        "reorden_tipo": reorden_por_tipo(df_actual),
+        "reorden_sku": reorden_por_sku(df_filtered),
+        "dispersion_consumo": puntos_dispersion(df_actual, columnas_dispersion_consumo),
+        "dispersion_rendimiento": puntos_dispersion(df_filtered, columnas_dispersion_rendimiento),
+        "cobertura": conteo_cobertura(df_filtered),
+    }
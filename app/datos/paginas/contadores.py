@@ -0,0 +1,102 @@
+import pandas as pd
+
+from datos.esquemas import aplicar_esquema
+from datos.paginas import en_rango, filtrar_columnas
+from datos.rendimiento import medir
+
+# -------------------------------------------------
+# Datos de la página Contadores: unión de METERS, DEVICE y CUSTOMER
+# -------------------------------------------------
+# Nombre de la página (reporte de memoria e instantáneas en disco)
+NOMBRE = "Contadores"
+
+# Colecciones de las que depende la página, en el orden de la clave de caché
+COLECCIONES = ("METERS", "DEVICE", "CUSTOMER")
+
+# Esquema compacto del DataFrame unido (el histórico repite cliente y dispositivo en cada lectura)
+esquema_contadores = {
+    "categorias": ["Cliente", "Ciudad", "Estado cliente", "Serial Dispositivo", "deviceId", "customerId",
+                   "ipAddress", "monitorStatus"],
+    "enteros": ["a4Mono", "a4Colour", "Ciclos de motor", "scans", "nonCopyScans", "Paginas mono", "monoLarge",
+                "colourSmall", "colourLarge", "monoTier", "colourTier1", "colourTier2", "colourTier3",
+                "monoPages", "paginas color", "duplex", "simplex"],
+    "fechas": ["billingDate", "readingDateTime", "discoveryDate", "lastContact"]
+}
+
+# Columnas de los filtros multiselect
+columnas_filtro = ["Cliente", "Serial Dispositivo"]
+
+# Función para unir los datos de METERS, DEVICE, CUSTOMER y MONITOR
+@medir("unir_datos_meters")
+def unir_datos_meters(df_meters, df_devices, df_customers):
+    if df_meters.empty or df_devices.empty or df_customers.empty:
+        return pd.DataFrame()
+    
+    # Unir METERS con DEVICE usando "deviceId"
+    df = pd.merge(df_meters, df_devices, on="deviceId", how="inner")
+    # Unir con CUSTOMER usando "customerId" del DEVICE
+    df = pd.merge(df, df_customers, on="customerId", how="inner")
+
+    # Renombrar columnas para visualización
+    df = df.rename(columns={
+        "name": "Cliente",
+        "status": "Estado cliente",
+        "lastContact": "lastContact",
+        "city": "Ciudad",
+        "serialNumber": "Serial Dispositivo",
+        "engineCycles": "Ciclos de motor",
+        "monoSmall": "Paginas mono",
+        "colourPages": "paginas color"
+    })
+    return df
+
+# Función para calcular consumos diarios (diferencias) para contadores relevantes
+@medir("calcular_consumo_diario")
+def calcular_consumo_diario(df):
+    # Ordenar por deviceId y readingDateTime
+    df = df.sort_values(["deviceId", "readingDateTime"])
+    # Calcular diferencias por dispositivo para engineCycles y monoPages
+    df["engineCycles_daily"] = df.groupby("deviceId")["Ciclos de motor"].diff()
+    df["monoPages_daily"] = df.groupby("deviceId")["Paginas mono"].diff()
+    df["colourPages_daily"] = df.groupby("deviceId")["paginas color"].diff()
+    df["totalPages_daily"] = df["monoPages_daily"] + df["colourPages_daily"]
+    # Otras métricas se pueden calcular de forma similar
+    return df
+
+# Función para tomar la última lectura (según readingDateTime) de cada dispositivo
+def ultima_lectura_por_dispositivo(df):
+    # Orden estable: ante empates de fecha se conserva el orden por deviceId y readingDateTime
+    df = df.dropna(subset=["Serial Dispositivo"]).sort_values("readingDateTime", kind="stable")
+    return df.drop_duplicates(subset=["Serial Dispositivo"], keep="last")
+
+# Indicadores de la página: promedios diarios sin contar los días sin consumo
+def indicadores(df):
+    promedio = lambda columna: df[df[columna] != 0][columna].mean()
+    return {
+        "ciclos_motor": promedio("engineCycles_daily"),
+        "paginas_mono": promedio("monoPages_daily"),
+        "paginas_color": promedio("colourPages_daily"),
+    }
+
+# DataFrame de la página (unión y consumos diarios) a partir de {colección: DataFrame}
+def armar_datos(tablas):
+    df = unir_datos_meters(tablas["METERS"], tablas["DEVICE"], tablas["CUSTOMER"])
+    if df.empty:
+        return df, None
+    # Calcular consumos diarios
+    df = calcular_consumo_diario(df)
+    # Crear la columna "simplex" (impresiones en modo simplex)
+    df["simplex"] = df["Ciclos de motor"] - df["duplex"]
+    return aplicar_esquema(df, esquema_contadores, NOMBRE)
+
+# Filtros de la barra lateral: multiselect {columna: valores} y rango de "billingDate" (inicio, fin)
+def filtrar_datos(df, filtros, indice=None, rango_fechas=None):
+    df = filtrar_columnas(df, filtros, indice)
+    return en_rango(df, "billingDate", rango_fechas)
+
+# Lo que la página necesita antes de filtrar: reporte de memoria y fechas del filtro de "billingDate"
+def resumen(df, reporte):
+    if df.empty:
+        return {"vacio": True, "reporte_memoria": reporte, "fechas": None}
+    return {"vacio": False, "reporte_memoria": reporte,
+            "fechas": (df["billingDate"].min().date(), df["billingDate"].max().date())}
@@ -0,0 +1,80 @@
+import pandas as pd
+
+from datos.esquemas import aplicar_esquema
+from datos.paginas import en_rango, filtrar_columnas
+from datos.rendimiento import medir
+
+# -------------------------------------------------
+# Datos de la página Dispositivos: unión de CUSTOMER y DEVICE
+# -------------------------------------------------
+# Nombre de la página (reporte de memoria e instantáneas en disco)
+NOMBRE = "Dispositivos"
+
+# Colecciones de las que depende la página, en el orden de la clave de caché
+COLECCIONES = ("CUSTOMER", "DEVICE")
+
+# Esquema compacto del DataFrame unido (etiquetas repetidas como categorías)
+esquema_dispositivos = {
+    "categorias": ["name", "monitorStatus", "model", "zone", "location", "firmware"],
+    "enteros": [],
+    "fechas": ["discoveryDate", "lastContact"]
+}
+
+# Columnas de los filtros multiselect
+columnas_filtro = ["name", "model", "monitorStatus", "zone", "location"]
+
+# Nombres de las columnas en la tabla y los gráficos de la página
+alias_columnas = {
+    "name": "Cliente",
+    "serialNumber": "Serial",
+    "ipAddress": "IP",
+    "monitorStatus": "Estado de Monitoreo",
+    "model": "Modelo",
+    "zone": "Zona",
+    "location": "Ubicación",
+    "firmware": "Firmware",
+    "discoveryDate": "Fecha de Descubrimiento",
+    "lastContact": "Último Contacto"
+}
+
+# Función para unir los datos de CUSTOMER y DEVICE
+# (los campos de "extendedFields" y las fechas ya llegan preparados desde comun.cargas)
+@medir("unir_datos")
+def unir_datos(df_customers, df_devices):
+    # Fusionar los DataFrames por "customerId"
+    if not df_customers.empty and not df_devices.empty:
+        df_merged = pd.merge(df_customers, df_devices, on="customerId", how="inner")
+        # Eliminar columnas innecesarias
+        df_merged = df_merged.drop(columns=["customerId", "status"], errors="ignore")
+        # Definir el orden deseado de columnas (ajusta según tus necesidades)
+        orden_columnas = ["name", "serialNumber", "ipAddress", "monitorStatus", "model", "zone", "location", "firmware", "discoveryDate", "lastContact"]
+        df_merged = df_merged[[col for col in orden_columnas if col in df_merged.columns]]
+        return df_merged
+    return pd.DataFrame()
+
+# DataFrame de la página a partir de las colecciones ya cargadas {colección: DataFrame}
+def armar_datos(tablas):
+    df = unir_datos(tablas["CUSTOMER"], tablas["DEVICE"])
+    return aplicar_esquema(df, esquema_dispositivos, NOMBRE)
+
+# Filtros de la barra lateral: multiselect {columna: valores} y rangos de fechas (inicio, fin)
+def filtrar_datos(df, filtros, indice=None, rango_contacto=None, rango_descubrimiento=None):
+    df = filtrar_columnas(df, filtros, indice)
+    df = en_rango(df, "lastContact", rango_contacto)
+    return en_rango(df, "discoveryDate", rango_descubrimiento)
+
+# Lo que la página necesita antes de filtrar: reporte de memoria y fechas de los filtros de rango
+def resumen(df, reporte):
+    fechas = {columna: (df[columna].min().date(), df[columna].max().date()) if df[columna].notna().any() else None
+              for columna in ("lastContact", "discoveryDate")}
+    return {"reporte_memoria": reporte, "fechas": fechas}
+
+# Indicadores del encabezado a partir del DataFrame filtrado (mismo resultado que datos.indicadores.indicadores_dispositivos)
+def indicadores(df_filtrado):
+    total = len(df_filtrado)
+    monitoreados = int((df_filtrado["monitorStatus"] == "Y").sum())
+    return {
+        "total": total,
+        "monitoreados": monitoreados,
+        "porcentaje_monitoreados": (monitoreados / total * 100) if total > 0 else 0,
+    }
@@ -0,0 +1,102 @@
+import pandas as pd
+
+from datos.esquemas import aplicar_esquema
+from datos.indicadores import DIAS_LICENCIA, PREFIJOS_EXCLUIDOS_LICENCIA
+from datos.paginas import filtrar_columnas
+from datos.rendimiento import medir
+
+# -------------------------------------------------
+# Datos de la página Monitores: MONITOR con su cliente y la cantidad de dispositivos del cliente
+# -------------------------------------------------
+# Nombre de la página (reporte de memoria e instantáneas en disco)
+NOMBRE = "Monitores"
+
+# Colecciones de las que depende la página, en el orden de la clave de caché
+COLECCIONES = ("DEVICE", "CUSTOMER", "MONITOR")
+
+# Esquema compacto del DataFrame de monitores (un registro por monitor, con los datos de su cliente)
+esquema_monitores = {
+    "categorias": ["Cliente", "Ciudad", "Estado cliente", "Nombre monitor", "Estado monitor", "Version agente",
+                   "customerId", "licenceProviderCode"],
+    "enteros": ["licenceDeviceLimit", "Dispositivos"],
+    "fechas": ["lastContact", "createdDate", "licenceExpiryDate"]
+}
+
+# Columnas de los filtros multiselect (el filtro por dispositivo se resuelve a sus clientes, ver filtrar_datos)
+columnas_filtro = ["Cliente", "Estado monitor"]
+
+# Función para unir MONITOR con CUSTOMER y la cantidad de dispositivos de cada cliente
+# Un registro por monitor: los dispositivos se agregan por cliente antes de unir, en lugar de
+# repetir cada monitor por cada dispositivo del cliente.
+@medir("unir_monitores")
+def unir_monitores(df_devices, df_customers, df_monitors):
+    if df_devices.empty or df_customers.empty or df_monitors.empty:
+        return pd.DataFrame()
+
+    # Cantidad de dispositivos por cliente (solo clientes con al menos un dispositivo)
+    dispositivos = df_devices.groupby("customerId", observed=True).size().rename("Dispositivos").reset_index()
+
+    # Monitores de los clientes (activos) que tienen dispositivos
+    df = pd.merge(df_monitors, df_customers, on="customerId", how="inner", suffixes=("_monitor", "_cliente"))
+    df = pd.merge(df, dispositivos, on="customerId", how="inner")
+
+    # Renombrar columnas para visualización
+    df = df.rename(columns={
+        "name_cliente": "Cliente",
+        "name_monitor": "Nombre monitor",
+        "status_cliente": "Estado cliente",
+        "status_monitor": "Estado monitor",
+        "city": "Ciudad",
+        "remoteApplication": "Version agente"
+    })
+
+    # Filtrar para excluir monitores con estado "DISCONTINUED"
+    df = df[df["Estado monitor"] != "DISCONTINUED"].reset_index(drop=True)
+    return df
+
+# DataFrame de la página a partir de las colecciones ya cargadas {colección: DataFrame}
+def armar_datos(tablas):
+    df = unir_monitores(tablas["DEVICE"], tablas["CUSTOMER"], tablas["MONITOR"])
+    if df.empty:
+        return df, None
+    return aplicar_esquema(df, esquema_monitores, NOMBRE)
+
+# Filtros de la barra lateral: multiselect {columna: valores} y clientes de los dispositivos elegidos
+# (None no filtra; un monitor no pertenece a un dispositivo sino al cliente del dispositivo)
+def filtrar_datos(df, filtros, indice=None, clientes_dispositivos=None):
+    if clientes_dispositivos is not None:
+        # Los clientes de los dispositivos elegidos se suman al filtro "Cliente" (intersección)
+        elegidos = filtros.get("Cliente")
+        clientes = [c for c in clientes_dispositivos if not elegidos or c in elegidos]
+        if not clientes:
+            return df.iloc[:0]
+        filtros = {**filtros, "Cliente": clientes}
+    return filtrar_columnas(df, filtros, indice)
+
+# Lo que la página necesita antes de filtrar: si hay datos y el reporte de memoria
+def resumen(df, reporte):
+    return {"vacio": df.empty, "reporte_memoria": reporte}
+
+# Días completos desde `desde` hasta `hasta` (como $floor en datos.indicadores; NaN si falta la fecha)
+def _dias(desde, hasta):
+    return (hasta - desde).dt.days
+
+def _en_utc(fechas):
+    return fechas.dt.tz_localize("UTC") if fechas.dt.tz is None else fechas
+
+# Indicadores del encabezado a partir del DataFrame filtrado (mismo resultado que datos.indicadores.indicadores_monitores)
+def indicadores(df_filtrado, ahora=None):
+    ahora = pd.Timestamp(ahora or pd.Timestamp.now(tz="UTC"))
+    total = len(df_filtrado)
+    # Como {"online": True} en MongoDB: los valores nulos cuentan como offline
+    online = int(df_filtrado["online"].eq(True).sum())
+    dias_sin_reporte = _dias(_en_utc(df_filtrado["lastContact"]), ahora)
+    dias_a_vencer = _dias(ahora, _en_utc(df_filtrado["licenceExpiryDate"]))
+    incluidos = ~df_filtrado["Nombre monitor"].astype(str).str.startswith(PREFIJOS_EXCLUIDOS_LICENCIA)
+    return {
+        "total": total,
+        "online": online,
+        "offline": total - online,
+        "promedio_dias_sin_reporte": dias_sin_reporte.mean() if dias_sin_reporte.notna().any() else float("nan"),
+        "licencia_proxima": int((incluidos & (dias_a_vencer < DIAS_LICENCIA)).sum()),
+    }
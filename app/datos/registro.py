@@ -0,0 +1,85 @@
+import logging
+import queue
+import threading
+import time
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Escritura en lotes a MongoDB desde un hilo en segundo plano
+# -------------------------------------------------
+class RegistroBuffer:
+    """
+    Acumula documentos en memoria y los guarda con insert_many desde un hilo
+    daemon, cuando se juntan `tam_lote` documentos o pasan `intervalo`
+    segundos desde la última escritura.
+
+    registrar() nunca bloquea: si la cola está llena (MongoDB lento o caído)
+    el documento se descarta y se cuenta en `descartados`. Un lote que falla
+    al escribirse también se descarta; es un registro, no un dato de negocio.
+    """
+
+    def __init__(self, coleccion, tam_lote=100, intervalo=5, max_cola=10000):
+        self.coleccion = coleccion
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+        self.descartados = 0
+        self.escritos = 0
+        self._cola = queue.Queue(maxsize=max_cola)
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._escribir, name=f"registro-{coleccion.name}", daemon=True)
+        self._hilo.start()
+
+    def registrar(self, documento):
+        """Encola un documento para escribirlo en el próximo lote. Retorna False si se descartó."""
+        try:
+            self._cola.put_nowait(documento)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            return False
+
+    def detener(self, espera=5):
+        """Escribe lo pendiente y detiene el hilo (ej. al cerrar el proceso)."""
+        self._detener.set()
+        self._hilo.join(espera)
+
+    # -------------------------------------------------
+    # Funciones internas
+    # -------------------------------------------------
+    def _escribir(self):
+        lote = []
+        limite = time.monotonic() + self.intervalo
+        # Al detener se sigue hasta vaciar la cola
+        while not (self._detener.is_set() and self._cola.empty()):
+            try:
+                # Espera como máximo 1 s para notar detener() a tiempo
+                lote.append(self._cola.get(timeout=max(0.0, min(limite - time.monotonic(), 1.0))))
+            except queue.Empty:
+                pass
+            if len(lote) >= self.tam_lote or time.monotonic() >= limite:
+                if lote:
+                    self._guardar(lote)
+                    lote = []
+                limite = time.monotonic() + self.intervalo
+        if lote:
+            self._guardar(lote)
+
+    def _guardar(self, lote):
+        try:
+            self.coleccion.insert_many(lote, ordered=False)
+            self.escritos += len(lote)
+        except PyMongoError as e:
+            self.descartados += len(lote)
+            logger.warning("No se pudieron guardar %d registros en %s: %s", len(lote), self.coleccion.name, e)
+
+
+def asegurar_indice_ttl(coleccion, campo, dias):
+    """Índice TTL: MongoDB borra los documentos cuando `campo` (fecha) tiene más de `dias` días."""
+    try:
+        coleccion.create_index(campo, expireAfterSeconds=dias * 24 * 3600, name=f"{campo}_ttl")
+    except PyMongoError as e:
+        logger.warning("No se pudo crear el índice TTL de %s: %s", coleccion.name, e)
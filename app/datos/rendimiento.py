@@ -0,0 +1,94 @@
+import functools
+import time
+from contextvars import ContextVar
+
+# -------------------------------------------------
+# Medición de tiempos por etapa de una ejecución de página
+# -------------------------------------------------
+# La página abre una Medicion al empezar (comun.rendimiento.iniciar_medicion) y todo
+# lo que se ejecute dentro de medir(...) en ese mismo hilo suma su etapa, incluidas las
+# funciones de datos.* que se ejecutan dentro de un st.cache_data sin acierto. Sin
+# medición activa (ejecuciones no muestreadas, hilos en segundo plano) medir no hace nada.
+
+_actual = ContextVar("medicion_actual", default=None)
+
+
+class Medicion:
+    """Etapas (con su anidamiento) y tamaño de lo enviado al navegador en una ejecución."""
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.etapas = []  # {"etapa", "inicio_s", "segundos", "nivel"}
+        self.cargas = []  # {"nombre", "tipo", "bytes"}
+        self.total_s = None
+        self._inicio = time.perf_counter()
+        self._nivel = 0
+
+    def agregar_carga(self, nombre, tipo, tamano):
+        self.cargas.append({"nombre": nombre, "tipo": tipo, "bytes": int(tamano)})
+
+    def cerrar(self):
+        self.total_s = time.perf_counter() - self._inicio
+        # Las etapas se agregan al terminar: se ordenan por inicio para mostrarlas anidadas
+        self.etapas.sort(key=lambda etapa: etapa["inicio_s"])
+        return self
+
+
+def iniciar_medicion(pagina):
+    """Abre una medición para el hilo actual y la retorna."""
+    medicion = Medicion(pagina)
+    _actual.set(medicion)
+    return medicion
+
+
+def terminar_medicion():
+    """Cierra y retorna la medición del hilo actual (None si no había)."""
+    medicion = _actual.get()
+    _actual.set(None)
+    return medicion.cerrar() if medicion is not None else None
+
+
+def medicion_actual():
+    return _actual.get()
+
+
+class medir:
+    """
+    Mide una etapa: `with medir("unión"):` o como decorador `@medir("unión")`.
+    Sin medición activa solo cuesta una consulta a la ContextVar.
+    """
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+        self._medicion = None
+
+    def __enter__(self):
+        self._medicion = _actual.get()
+        if self._medicion is not None:
+            self._nivel = self._medicion._nivel
+            self._medicion._nivel += 1
+            self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        medicion = self._medicion
+        if medicion is not None:
+            fin = time.perf_counter()
+            medicion._nivel = self._nivel
+            medicion.etapas.append({
+                "etapa": self.etapa,
+                "inicio_s": self._inicio - medicion._inicio,
+                "segundos": fin - self._inicio,
+                "nivel": self._nivel,
+            })
+        return False
+
+    def __call__(self, funcion):
+        etapa = self.etapa
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            # Una instancia nueva por llamada: la misma función puede ejecutarse en varios hilos
+            with medir(etapa):
+                return funcion(*args, **kwargs)
+        return medida
@@ -0,0 +1,166 @@
+"""
+Versiones por colección para invalidar las cachés del dashboard.
+
+Un hilo en segundo plano vigila un change stream de MongoDB sobre las
+colecciones del dashboard y aumenta un contador por colección en cada
+cambio. Las cachés usan esos contadores como clave: se invalidan solo
+cuando los datos cambian. Si el servidor no es un replica set (no hay
+change streams) se usa un sondeo periódico de una firma de cada colección.
+
+Prueba local con un replica set de un solo nodo:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval "rs.initiate()"
+    MONGO_URI="mongodb://localhost:27017/?replicaSet=rs0" python app/datos/versiones.py
+
+y en otra consola insertar o modificar documentos de DEVICE, METERS...
+para ver cómo cambian las versiones.
+"""
+import logging
+import threading
+import time
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+COLECCIONES_DASHBOARD = ["DEVICE", "CONSUMABLE", "CONSUMABLE_METRICS", "METERS", "MONITOR", "CUSTOMER"]
+
+# Espera antes de reintentar tras un error de red en el change stream (segundos)
+ESPERA_REINTENTO = 5
+
+
+class VigilanteColecciones:
+    """Mantiene una versión por colección que aumenta cada vez que la colección cambia."""
+
+    def __init__(self, db, colecciones=COLECCIONES_DASHBOARD, intervalo_sondeo=30):
+        self.db = db
+        self.colecciones = list(colecciones)
+        self.intervalo_sondeo = intervalo_sondeo
+        self.modo = None  # "change_stream" o "sondeo", se define en iniciar()
+        self._versiones = {coleccion: 0 for coleccion in self.colecciones}
+        self._firmas = {}
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        """
+        Abre el change stream en el hilo que llama (así el modo se conoce de
+        inmediato) y deja la vigilancia corriendo en un hilo daemon.
+        """
+        try:
+            stream = self._abrir_stream()
+            self.modo = "change_stream"
+            objetivo, args = self._vigilar_stream, (stream,)
+        except OperationFailure as e:
+            # Código 40573: los change streams solo funcionan en replica sets
+            logger.warning("Change streams no disponibles (%s). Se usa sondeo cada %ss.", e, self.intervalo_sondeo)
+            self.modo = "sondeo"
+            for coleccion in self.colecciones:
+                self._firmas[coleccion] = self._firma(coleccion)
+            objetivo, args = self._sondear, ()
+        self._hilo = threading.Thread(target=objetivo, args=args, name="vigilante-colecciones", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+
+    def version(self, coleccion):
+        with self._lock:
+            return self._versiones.get(coleccion, 0)
+
+    def versiones(self, colecciones=None):
+        """Tupla de versiones, útil como clave de st.cache_data."""
+        with self._lock:
+            return tuple(self._versiones.get(c, 0) for c in (colecciones or self.colecciones))
+
+    # -------------------------------------------------
+    # Funciones internas
+    # -------------------------------------------------
+    def _incrementar(self, coleccion):
+        with self._lock:
+            self._versiones[coleccion] = self._versiones.get(coleccion, 0) + 1
+        logger.debug("Nueva versión de %s: %d", coleccion, self._versiones[coleccion])
+
+    def _abrir_stream(self, resume_token=None):
+        pipeline = [{"$match": {"ns.coll": {"$in": self.colecciones}}}]
+        return self.db.watch(pipeline, resume_after=resume_token, max_await_time_ms=1000)
+
+    def _vigilar_stream(self, stream):
+        resume_token = None
+        while not self._detener.is_set():
+            try:
+                with stream:
+                    while stream.alive and not self._detener.is_set():
+                        cambio = stream.try_next()
+                        resume_token = stream.resume_token
+                        if cambio is None:
+                            continue
+                        coleccion = cambio.get("ns", {}).get("coll")
+                        # dropDatabase y similares no traen colección: se invalidan todas
+                        for c in [coleccion] if coleccion else self.colecciones:
+                            self._incrementar(c)
+            except PyMongoError as e:
+                logger.warning("Error en el change stream (%s). Reintentando en %ss.", e, ESPERA_REINTENTO)
+                time.sleep(ESPERA_REINTENTO)
+            if self._detener.is_set():
+                break
+            try:
+                stream = self._abrir_stream(resume_token)
+            except PyMongoError as e:
+                # El token puede haber salido del oplog: se reabre sin él y se invalida todo
+                logger.warning("No se pudo reanudar el change stream (%s). Se invalida todo.", e)
+                resume_token = None
+                for c in self.colecciones:
+                    self._incrementar(c)
+                time.sleep(ESPERA_REINTENTO)
+                try:
+                    stream = self._abrir_stream()
+                except PyMongoError:
+                    continue
+
+    def _firma(self, coleccion):
+        """Cantidad de documentos, último _id y último updatedAt (si la colección lo mantiene)."""
+        col = self.db[coleccion]
+        ultimo_id = col.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        ultimo_cambio = col.find_one({"updatedAt": {"$exists": True}}, {"updatedAt": 1, "_id": 0},
+                                     sort=[("updatedAt", -1)])
+        return (
+            col.estimated_document_count(),
+            ultimo_id["_id"] if ultimo_id else None,
+            ultimo_cambio["updatedAt"] if ultimo_cambio else None,
+        )
+
+    def _sondear(self):
+        while not self._detener.wait(self.intervalo_sondeo):
+            for coleccion in self.colecciones:
+                try:
+                    firma = self._firma(coleccion)
+                except PyMongoError as e:
+                    logger.warning("Error al sondear %s: %s", coleccion, e)
+                    continue
+                if firma != self._firmas.get(coleccion):
+                    self._firmas[coleccion] = firma
+                    self._incrementar(coleccion)
+
+
+# -------------------------------------------------
+# Ejecución manual para probar con un replica set local
+# -------------------------------------------------
+if __name__ == "__main__":
+    import os
+    from pymongo import MongoClient
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/?replicaSet=rs0"))
+    vigilante = VigilanteColecciones(client[os.getenv("DATABASE_NAME", "SDSAPI")], intervalo_sondeo=5).iniciar()
+    logger.info("Modo: %s", vigilante.modo)
+    ultimas = None
+    while True:
+        versiones = dict(zip(vigilante.colecciones, vigilante.versiones()))
+        if versiones != ultimas:
+            logger.info("Versiones: %s", versiones)
+            ultimas = versiones
+        time.sleep(1)
@@ -1,16 +1,23 @@
 import os
-import pdfkit
+import sys
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Módulos compartidos con el dashboard (carpeta app/)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datos.paginas import contadores, datos_desde_db
+from datos.informes_pdf import informe_contadores
 
 # Cargar variables de entorno
 load_dotenv("D:\\ProyectoSIMP\\2025\\DashBoardSIMP\\config.env")
 
-# Parámetros de conexión a MongoDB y otros (si es necesario)
-# ...
+# Conexión a MongoDB (informe nativo)
+MONGO_URI = os.getenv("MONGO_URI")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "SDSAPI")
 
 # Configuración SMTP (asegúrate de tener estos valores en tu .env)
 SMTP_SERVER = os.getenv("SMTP_SERVER")  
@@ -23,18 +30,40 @@ TO_ADDRS = os.getenv("TO_ADDRS").split(',')
 
 # URL donde está corriendo el dashboard de consumibles (ej: localhost)
 DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://10.0.1.58:8501/Contadores")
+# Parámetro para que la página emita la señal de "render completo" (comun.captura)
+CAPTURA_URL = DASHBOARD_URL + ("&" if "?" in DASHBOARD_URL else "?") + "captura=1"
+
+# Cómo se arma el PDF: "nativo" (datos.informes_pdf, sin navegador) o "navegador" (wkhtmltopdf)
+INFORME_PDF = os.getenv("INFORME_PDF", "nativo")
 
 # Configurar la ruta de wkhtmltopdf (ajusta según la instalación en tu sistema)
 path_wkhtmltopdf = r"D:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
-config_pdf = pdfkit.configuration(wkhtmltopdf=path_wkhtmltopdf)
+
+def generate_pdf_native():
+    """Genera el PDF del dashboard de contadores con los datos de la página, sin navegador."""
+    try:
+        client = MongoClient(MONGO_URI)
+        try:
+            df, _ = datos_desde_db(contadores, client[DATABASE_NAME])
+        finally:
+            client.close()
+        return informe_contadores(df)
+    except Exception as e:
+        print("Error al generar el PDF:", e)
+        return None
 
 def generate_pdf_from_dashboard(url):
     """
     Genera un PDF a partir de la URL del dashboard.
     Retorna un objeto BytesIO con el contenido del PDF.
     """
+    import pdfkit
+    config_pdf = pdfkit.configuration(wkhtmltopdf=path_wkhtmltopdf)
     options = {
-        'javascript-delay': '60000',  # Espera 15s para que cargue JavaScript
+        # Espera a que la página ponga window.status al terminar de dibujarse (comun.captura;
+        # la página lo pone también si pasa su tiempo máximo) y luego 1 s más
+        'window-status': 'render-terminado',
+        'javascript-delay': '1000',
         'no-stop-slow-scripts': '',
         'enable-local-file-access': '',
         'viewport-size': '1280x1024',  # Establece un tamaño de ventana para la captura
@@ -73,7 +102,10 @@ def send_email_with_pdf(pdf_data):
         print("Error al enviar email:", e)
 
 def main():
-    pdf_data = generate_pdf_from_dashboard(DASHBOARD_URL)
+    if INFORME_PDF == "navegador":
+        pdf_data = generate_pdf_from_dashboard(CAPTURA_URL)
+    else:
+        pdf_data = generate_pdf_native()
     if pdf_data is None:
         print("No se pudo generar el PDF.")
     else:
@@ -1,11 +1,17 @@
 import os
+import sys
 import asyncio
-from pyppeteer import launch
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Módulos compartidos con el dashboard (carpeta app/)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datos.paginas import consumibles, datos_desde_db
+from datos.informes_pdf import informe_consumibles, vista_consumibles
 
 # Cargar variables de entorno
 load_dotenv("D:\\ProyectoSIMP\\2025\\DashBoardSIMP\\config.env")
@@ -17,12 +23,39 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 FROM_ADDR = os.getenv("FROM_ADDR")
 TO_ADDRS = os.getenv("TO_ADDRS").split(',')
 DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://10.0.1.58:8501/Consumibles")
+# Parámetro para que la página emita la señal de "render completo" (comun.captura)
+CAPTURA_URL = DASHBOARD_URL + ("&" if "?" in DASHBOARD_URL else "?") + "captura=1"
+
+# Conexión a MongoDB (informe nativo)
+MONGO_URI = os.getenv("MONGO_URI")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "SDSAPI")
+
+# Cómo se arma el PDF: "nativo" (datos.informes_pdf, sin navegador) o "navegador"
+# (captura de la página del dashboard en ejecución con Edge)
+INFORME_PDF = os.getenv("INFORME_PDF", "nativo")
 
 # Ruta a Chromium del sistema.
 
 CHROME_PATH = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+# Espera máxima a la señal de "render completo" de la página (comun.captura)
+ESPERA_RENDER_MS = 90000
+
+def generate_pdf_native():
+    """Genera el PDF del dashboard de consumibles con los datos de la página, sin navegador."""
+    try:
+        client = MongoClient(MONGO_URI)
+        try:
+            df, _ = datos_desde_db(consumibles, client[DATABASE_NAME])
+        finally:
+            client.close()
+        return informe_consumibles(vista_consumibles(df))
+    except Exception as e:
+        print("Error al generar el PDF:", e)
+        return None
 
 async def generate_pdf(url):
+    # pyppeteer solo se necesita en modo "navegador"
+    from pyppeteer import launch
     # Inicia el navegador usando la ruta especificada
     browser = await launch(headless=True, args=['--no-sandbox'], executablePath=CHROME_PATH)
     page = await browser.newPage()
@@ -57,8 +90,11 @@ async def generate_pdf(url):
         });
     }''')
 
-    # Espera adicional para asegurarse de que se renderice todo
-    await asyncio.sleep(20)
+    # Esperar a que la página indique que terminó de dibujar los gráficos y tablas (?captura=1)
+    try:
+        await page.waitForFunction('() => document.body.dataset.render !== undefined', {'timeout': ESPERA_RENDER_MS})
+    except Exception as e:
+        print(f"Sin señal de render completo ({e}); se captura igual.")
     # Generar el PDF con opciones: formato A4 y sin márgenes
     options = {
         'format': 'A4',
@@ -96,8 +132,11 @@ def send_email_with_pdf(pdf_data):
         print("Error al enviar email:", e)
 
 def main():
-    # Usar asyncio.run para generar el PDF
-    pdf_data = asyncio.run(generate_pdf(DASHBOARD_URL))
+    if INFORME_PDF == "navegador":
+        # Usar asyncio.run para generar el PDF
+        pdf_data = asyncio.run(generate_pdf(CAPTURA_URL))
+    else:
+        pdf_data = generate_pdf_native()
     if pdf_data:
         # Opcional: guardar localmente el PDF
         with open("dashboard_consumibles.pdf", "wb") as f:
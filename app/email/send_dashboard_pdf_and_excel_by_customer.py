@@ -1,6 +1,5 @@
 import os
 import asyncio
-from pyppeteer import launch
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
@@ -9,13 +8,12 @@ from dotenv import load_dotenv
 from urllib.parse import urlencode
 import pandas as pd
 from pymongo import MongoClient
-import numpy as np
-import warnings
-warnings.filterwarnings(
-    "ignore", 
-    message="DataFrameGroupBy.apply operated on the grouping columns", 
-    category=DeprecationWarning
-)
+import sys
+
+# Módulos compartidos con el dashboard (carpeta app/)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datos.paginas import consumibles, datos_desde_db
+from datos.informes_pdf import informe_consumibles, vista_consumibles
 
 # Cargar variables de entorno
 load_dotenv("D:\\ProyectoSIMP\\2025\\DashBoardSIMP\\config.env")
@@ -27,8 +25,19 @@ FROM_ADDR = os.getenv("FROM_ADDR")
 DEFAULT_TO_ADDRS = os.getenv("TO_ADDRS").split(',')
 BASE_DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://10.0.1.58:8501/Consumibles")
 
+# Cómo se arma el PDF: "nativo" (datos.informes_pdf, sin navegador) o "navegador"
+# (captura de la página del dashboard en ejecución con Edge)
+INFORME_PDF = os.getenv("INFORME_PDF", "nativo")
+
 # Ruta al ejecutable de Edge (basado en Chromium)
 CHROME_PATH = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+# Pestañas del navegador que capturan clientes a la vez (modo "navegador")
+PAGINAS_NAVEGADOR = int(os.getenv("PAGINAS_NAVEGADOR", 3))
+# Intentos por cliente (si falla la captura o se cae el navegador)
+INTENTOS_CAPTURA = 3
+VIEWPORT = {'width': 1700, 'height': 3500}
+# Espera máxima a la señal de "render completo" de la página (comun.captura, ?captura=1)
+ESPERA_RENDER_MS = 90000
 
 # Conexión a MongoDB
 MONGO_URI = os.getenv("MONGO_URI")
@@ -38,38 +47,6 @@ db = client[DATABASE_NAME]
 
 # --- Funciones para extraer datos desde MongoDB ---
 
-# Campos para la colección CONSUMABLE
-consumable_fields = {
-    "deviceId": 1,
-    "consumableId": 1,
-    "colour": 1,
-    "daysLeft": 1,
-    "daysMonitored": 1,
-    "description": 1,
-    "engineCyclesMonitored": 1,
-    "lastRead": 1,
-    "pagesLeft": 1,
-    "percentLeft": 1,
-    "serialNumber": 1,
-    "sku": 1,
-    "type": 1,
-    "yield": 1,
-    "_id": 0
-}
-
-# Campos para la colección DEVICE
-device_fields = {
-    "deviceId": 1,
-    "customerId": 1,
-    "serialNumber": 1,
-    "ipAddress": 1,
-    "monitorStatus": 1,
-    "extendedFields": 1,
-    "discoveryDate": 1,
-    "lastContact": 1,
-    "_id": 0
-}
-
 # Campos para la colección CUSTOMER
 customer_fields = {
     "customerId": 1,
@@ -80,159 +57,47 @@ customer_fields = {
     "_id": 0
 }
 
-# Campos para la colección MONITOR
-monitor_fields = {
-    "monitorId": 1,
-    "createdDate": 1,
-    "customerId": 1,
-    "lastContact": 1,
-    "licenceDeviceLimit": 1,
-    "licenceExpiryDate": 1,
-    "licenceKey": 1,
-    "licenceProviderCode": 1,
-    "name": 1,
-    "online": 1,
-    "remoteApplication": 1,
-    "status": 1,
-    "_id": 0
-}
-
-def get_consumable_data():
-    consumables = list(db["CONSUMABLE"].find({}, consumable_fields))
-    return pd.DataFrame(consumables)
-
-def get_device_data():
-    devices = list(db["DEVICE"].find({"monitorStatus": "Y"}, device_fields))
-    df = pd.DataFrame(devices)
-    if not df.empty:
-        df["discoveryDate"] = pd.to_datetime(df["discoveryDate"], errors="coerce")
-        df["lastContact"] = pd.to_datetime(df["lastContact"], errors="coerce")
-    return df
-
 def get_customer_data():
     customers = list(db["CUSTOMER"].find({"status": "ACTIVE"}, customer_fields))
     return pd.DataFrame(customers)
 
-def get_monitor_data():
-    monitors = list(db["MONITOR"].find({}, monitor_fields))
-    df = pd.DataFrame(monitors)
-    if not df.empty:
-        df["lastContact"] = pd.to_datetime(df["lastContact"], errors="coerce")
-        df["createdDate"] = pd.to_datetime(df["createdDate"], errors="coerce")
-    return df
-
-def unir_datos_consumibles():
-    df_consumables = get_consumable_data()
-    df_devices = get_device_data()
-    df_customers = get_customer_data()
-    df_monitors = get_monitor_data()
-    
-    if df_consumables.empty or df_devices.empty or df_customers.empty or df_monitors.empty:
-        return pd.DataFrame()
-    
-    # Unir CONSUMABLE con DEVICE usando "deviceId"
-    df = pd.merge(df_consumables, df_devices, on="deviceId", how="inner")
-    # Unir con CUSTOMER usando "customerId" del DEVICE
-    df = pd.merge(df, df_customers, on="customerId", how="inner")
-    # Unir con MONITOR usando "customerId" del DEVICE
-    df = pd.merge(df, df_monitors, on="customerId", how="inner")
-    
-    # Renombrar columnas para diferenciarlas
-    df = df.rename(columns={
-        "serialNumber_x": "Serial Consumible",
-        "serialNumber_y": "Serial Dispositivo",
-        "name_x": "Nombre cliente",
-        "name_y": "Nombre monitor",
-    })
-    
-    # Incluir la columna deviceId para usarla en marcar_estado_suministros
-    # Seleccionar y ordenar columnas (incluyendo deviceId)
-    orden_columnas = [
-        "Nombre cliente", "city", "deviceId", "Serial Dispositivo", "ipAddress", "monitorStatus",
-        "extendedFields", "Serial Consumible", "type", "description", "sku", "colour", "daysLeft", "percentLeft",
-        "daysMonitored", "engineCyclesMonitored", "lastRead", "pagesLeft", "yield", "Estado Suministro", "Cobertura Suministro",
-        "Rendimiento Consumible"
-    ]
-    df = df[[col for col in orden_columnas if col in df.columns]]
-    
-    # Renombrar para visualización
-    df = df.rename(columns={
-        "Nombre cliente": "Cliente",
-        "city": "Ciudad",
-        "ipAddress": "Direccion IP",
-        "monitorStatus": "Estado de Monitoreo",
-        "type": "Tipo",
-        "colour": "Color",
-        "daysLeft": "Días Restantes",
-        "percentLeft": "Porcentaje Restante",
-        "daysMonitored": "Días Monitoreados",
-        "engineCyclesMonitored": "Impresiones",
-        "lastRead": "Última Lectura",
-        "pagesLeft": "Páginas Restantes",
-        "sku": "SKU",
-        "yield": "durac. (teo)",
-        "description": "Descripción"
-    })
-
-    df["Cobertura Suministro"] = ((0.05 * df["durac. (teo)"]) / df["Impresiones"]) * 100
-    df["Rendimiento Consumible"] = (df["Impresiones"] / df["durac. (teo)"]) * 100
-
-    df["Cobertura Suministro"] = df["Cobertura Suministro"].round(2)
-    df["Rendimiento Consumible"] = df["Rendimiento Consumible"].round(2)
-
+# Datos de la página Consumibles (misma unión, métricas y esquema que el dashboard, datos.paginas.consumibles).
+# Se cargan una sola vez por ejecución y se reparten entre los clientes.
+def cargar_datos_consumibles():
+    df, _ = datos_desde_db(consumibles, db)
     return df
 
-# Función para marcar el estado de cada consumible
-def marcar_estado_suministros(df):
-    df["Última Lectura"] = pd.to_datetime(df["Última Lectura"], errors="coerce")
-    # Crear la clave de agrupación
-    df["group_key"] = df.apply(
-        lambda row: f"{row['deviceId']}_{row['Tipo']}_{row['Color']}_{row['Descripción']}" 
-            if row["Tipo"].upper() == "UNKNOWN" 
-            else f"{row['deviceId']}_{row['Tipo']}_{row['Color']}",
-        axis=1
-    )
-    def marcar_grupo(grp):
-        if len(grp) > 1:
-            max_date = grp["Última Lectura"].max()
-            grp["Estado Suministro"] = np.where(grp["Última Lectura"] == max_date, "Actual", "Reemplazado")
-        else:
-            grp["Estado Suministro"] = "Actual"
-        return grp
-    # Utilizamos groupby sin el parámetro include_groups y luego eliminamos la columna de grupo
-    df = df.groupby("group_key", group_keys=False).apply(marcar_grupo).reset_index(drop=True)
-    df.drop(columns=["group_key"], inplace=True)
-    return df
-
-def get_emails_for_customer(customer_name):
-    # Extraer solo los clientes activos
-    customers = list(db["CUSTOMER"].find({"status": "ACTIVE"}, {"name": 1, "contactEmail": 1, "_id": 0}))
-    df = pd.DataFrame(customers)
-    df_selected = df[df["name"] == customer_name]
-    if not df_selected.empty:
-        emails = []
-        for email in df_selected["contactEmail"].dropna().tolist():
-            emails.extend([e.strip() for e in email.split(",") if e.strip() != ""])
-        return list(set(emails))
-    return []
+def detalle_por_cliente(df_pagina):
+    """{customerId: detalle de consumibles de dispositivos en monitoreo} con un solo groupby."""
+    if df_pagina.empty:
+        return {}
+    df = consumibles.filtrar_datos(df_pagina, {"Estado de Monitoreo": ["Y"]})
+    return {customer_id: grupo for customer_id, grupo in df.groupby("customerId", observed=True, sort=False)}
+
+def correos_por_cliente(df_customers):
+    """{customerId: correos de "contactEmail" (separados por coma)} de los clientes activos ya leídos."""
+    correos = {}
+    if df_customers.empty or "contactEmail" not in df_customers.columns:
+        return correos
+    for customer_id, email in zip(df_customers["customerId"], df_customers["contactEmail"]):
+        if isinstance(email, str):
+            correos.setdefault(customer_id, set()).update(e.strip() for e in email.split(",") if e.strip() != "")
+    return {customer_id: list(emails) for customer_id, emails in correos.items()}
 
 def generate_excel_report(df, filename="informe_consumibles.xlsx"):
     writer = pd.ExcelWriter(filename, engine="xlsxwriter")
     # Convertir columnas datetime a timezone-naive
     df = df.apply(lambda x: x.dt.tz_localize(None) if x.dtype == 'datetime64[ns, UTC]' else x)
-    # Excluir la columna 'deviceId'
-    df_sin_deviceId = df.drop(columns=['deviceId'], errors='ignore')
+    # Excluir los identificadores 'deviceId' y 'customerId'
+    df_sin_deviceId = df.drop(columns=['deviceId', 'customerId'], errors='ignore')
     df_sin_deviceId.to_excel(writer, index=False, sheet_name='Detalle Consumibles')
     writer.close()
     with open(filename, "rb") as f:
         excel_data = f.read()
     return excel_data
 
-# Función para generar PDF con pyppeteer
-async def generate_pdf(url):
-    browser = await launch(headless=True, args=['--no-sandbox'], executablePath=CHROME_PATH)
-    page = await browser.newPage()
-    await page.setViewport({'width': 1700, 'height': 3500})
+# Función para generar PDF con pyppeteer en una pestaña ya abierta
+async def generate_pdf(page, url):
     await page.goto(url, {"waitUntil": "networkidle2", "timeout": 40000})
     
     await page.evaluate('''() => {
@@ -258,7 +123,13 @@ async def generate_pdf(url):
         });
     }''')
     
-    await asyncio.sleep(20)
+    # Esperar a que la página indique que terminó de dibujar los gráficos y tablas
+    try:
+        await page.waitForFunction('() => document.body.dataset.render !== undefined', {'timeout': ESPERA_RENDER_MS})
+        if await page.evaluate('() => document.body.dataset.render') != "completo":
+            print(f"La página no terminó de dibujarse a tiempo; se captura igual: {url}")
+    except Exception as e:
+        print(f"Sin señal de render completo ({e}); se captura igual: {url}")
     
     options = {
         'format': 'A4',
@@ -270,9 +141,136 @@ async def generate_pdf(url):
         'margin-left': '10mm',
         'viewport-size': '2480x3500'
     }
-    pdf_bytes = await page.pdf(options=options)
-    await browser.close()
-    return pdf_bytes
+    return await page.pdf(options=options)
+
+class PoolCapturas:
+    """
+    Un solo navegador con `paginas` pestañas reutilizables para capturar el
+    dashboard de varios clientes a la vez dentro del mismo event loop:
+
+        async with PoolCapturas(3) as pool:
+            pdfs = await asyncio.gather(*(pool.capturar(url) for url in urls))
+
+    Las pestañas se crean al usarlas por primera vez. Si una captura falla se
+    cierra su pestaña, vuelve al pool una nueva y se reintenta (hasta
+    INTENTOS_CAPTURA veces); si el proceso del navegador murió se inicia uno
+    nuevo y las pestañas del anterior se reemplazan al volver a tomarlas.
+    """
+
+    def __init__(self, paginas=PAGINAS_NAVEGADOR):
+        self.paginas = max(1, paginas)
+        self.browser = None
+        self._generacion = 0  # aumenta con cada navegador iniciado
+        self._libres = None   # cola de (generación, pestaña o None)
+        self._lock = None
+
+    async def __aenter__(self):
+        self._libres = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        for _ in range(self.paginas):
+            self._libres.put_nowait((self._generacion, None))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._cerrar_navegador()
+
+    async def capturar(self, url):
+        """Bytes del PDF de la URL."""
+        for intento in range(1, INTENTOS_CAPTURA + 1):
+            generacion, page = await self._libres.get()
+            try:
+                if page is None or generacion != self._generacion or page.isClosed():
+                    generacion, page = await self._nueva_pagina()
+                return await generate_pdf(page, url)
+            except Exception as e:
+                # La pestaña puede haber quedado a medio cargar o cerrada: se cierra y vuelve
+                # al pool una nueva, también tras el último intento
+                await self._cerrar_pagina(page)
+                generacion, page = await self._reemplazar_pagina()
+                if intento == INTENTOS_CAPTURA:
+                    raise
+                print(f"Error capturando {url} (intento {intento}): {e}. Reintentando.")
+            finally:
+                self._libres.put_nowait((generacion, page))
+
+    async def _nueva_pagina(self):
+        # Una sola corrutina reinicia el navegador; las demás esperan y usan el nuevo
+        async with self._lock:
+            if not self._navegador_vivo():
+                if self.browser is not None:
+                    print("El navegador se cerró inesperadamente; iniciando uno nuevo.")
+                await self._cerrar_navegador()
+                # pyppeteer solo se necesita en modo "navegador"
+                from pyppeteer import launch
+                self.browser = await launch(headless=True, args=['--no-sandbox'], executablePath=CHROME_PATH)
+                self._generacion += 1
+        page = await self.browser.newPage()
+        await page.setViewport(VIEWPORT)
+        return self._generacion, page
+
+    async def _reemplazar_pagina(self):
+        # Si no se puede abrir otra pestaña (navegador caído) se crea al volver a tomarla
+        try:
+            return await self._nueva_pagina()
+        except Exception:
+            return self._generacion, None
+
+    def _navegador_vivo(self):
+        return self.browser is not None and self.browser.process.poll() is None
+
+    async def _cerrar_pagina(self, page):
+        try:
+            if page is not None and not page.isClosed():
+                await page.close()
+        except Exception:
+            pass
+
+    async def _cerrar_navegador(self):
+        browser, self.browser = self.browser, None
+        try:
+            if browser is not None:
+                await browser.close()
+        except Exception:
+            pass
+
+async def capturar_clientes(clientes):
+    """
+    {customerId: bytes del PDF o None} capturando varios clientes
+    ({customerId: nombre}) a la vez con un solo navegador. La página se filtra
+    por nombre (?Cliente=), que es lo que ofrece su filtro.
+    """
+    async with PoolCapturas() as pool:
+        async def capturar(nombre):
+            url = BASE_DASHBOARD_URL + "?" + urlencode({"Cliente": nombre, "captura": 1})
+            print("Generando PDF para:", nombre, "con URL:", url)
+            try:
+                return await pool.capturar(url)
+            except Exception as e:
+                print(f"Error generando PDF para {nombre}: {e}")
+                return None
+        pdfs = await asyncio.gather(*(capturar(nombre) for nombre in clientes.values()))
+    return dict(zip(clientes, pdfs))
+
+def generar_pdfs(clientes, df_pagina=None):
+    """
+    {customerId: PDF del dashboard de consumibles filtrado para el cliente} de
+    los clientes {customerId: nombre}. En modo "nativo" se arma con los datos
+    de la página (df_pagina, cargados una vez para todos los clientes); en modo
+    "navegador" se capturan las páginas con ?Cliente= usando PAGINAS_NAVEGADOR
+    pestañas de un mismo navegador.
+    """
+    if INFORME_PDF == "navegador":
+        return asyncio.run(capturar_clientes(clientes))
+    return {customer_id: informe_cliente(df_pagina, customer_id, nombre) for customer_id, nombre in clientes.items()}
+
+def informe_cliente(df_pagina, customer_id, nombre):
+    """Bytes del PDF nativo del cliente, o None si falla (como en la captura, no detiene el lote)."""
+    try:
+        vista = vista_consumibles(df_pagina, customer_id=customer_id)
+        return informe_consumibles(vista, subtitulo=f"Cliente: {nombre}")
+    except Exception as e:
+        print(f"Error generando PDF para {nombre}: {e}")
+        return None
 
 def send_email_with_pdf_and_excel(pdf_data, excel_data, to_addrs, customer_name):
     msg = MIMEMultipart()
@@ -312,35 +310,34 @@ def main():
 
         print(f"Procesando {len(df_customers)} clientes...")
 
+        # Una sola carga y unión para todos los clientes; el detalle y los correos se reparten por cliente
+        df_pagina = cargar_datos_consumibles()
+        detalles = detalle_por_cliente(df_pagina)
+        destinatarios = correos_por_cliente(df_customers)
+
+        # PDF de todos los clientes (nativos con los datos de la página), por customerId
+        pdfs = generar_pdfs(dict(zip(df_customers["customerId"], df_customers["name"])), df_pagina)
+
         for idx, customer in df_customers.iterrows():
             try:
+                customer_id = customer["customerId"]
                 customer_name = customer["name"]
-                print(f"\nProcesando cliente: {customer_name}")
-
-                # Construir URL filtrada para este cliente (asumiendo que el dashboard usa el query param "Cliente")
-                params = {"Cliente": customer_name}
-                url = BASE_DASHBOARD_URL + "?" + urlencode(params)
-                print("Generando PDF para:", customer_name, "con URL:", url)
+                print(f"\nProcesando cliente: {customer_name} ({customer_id})")
 
-                # Generar PDF para la vista filtrada
-                pdf_data = asyncio.run(generate_pdf(url))
+                # PDF de la vista filtrada
+                pdf_data = pdfs[customer_id]
                 if not pdf_data:
                     print(f"No se pudo generar PDF para {customer_name}")
                     continue
 
-                # Obtener el DataFrame de detalle y filtrar por cliente
-                df_detail = unir_datos_consumibles()
-                if not df_detail.empty:
-                    df_detail = df_detail[df_detail["Cliente"] == customer_name]
-                    df_detail = marcar_estado_suministros(df_detail)
-                else:
-                    df_detail = pd.DataFrame()
+                # Detalle del cliente (vacío si no tiene consumibles en monitoreo)
+                df_detail = detalles.get(customer_id, df_pagina.iloc[:0])
 
                 # Generar el archivo Excel a partir de la tabla de detalle
                 excel_data = generate_excel_report(df_detail, filename=f"detalle_consumibles_{customer_name}.xlsx")
                 
                 # Obtener correos asociados al cliente
-                emails = get_emails_for_customer(customer_name)
+                emails = destinatarios.get(customer_id)
                 if not emails:
                     print(f"No se encontraron correos para {customer_name}, usando correos por defecto.")
                     emails = DEFAULT_TO_ADDRS
@@ -358,20 +355,22 @@ def main():
 def main_test():
     # Cliente de prueba
     customer_name = "Esenttia"
+    df_customers = get_customer_data()
+    coincidencias = df_customers.loc[df_customers["name"] == customer_name, "customerId"] if not df_customers.empty else []
+    if len(coincidencias) == 0:
+        print(f"No se encontró el cliente activo {customer_name}")
+        return
+    customer_id = coincidencias.iloc[0]
     
     # Obtener correos asociados al cliente
-    emails = get_emails_for_customer(customer_name)
+    emails = correos_por_cliente(df_customers).get(customer_id)
     if not emails:
         print(f"No se encontraron correos para {customer_name}, usando correos por defecto.")
         emails = DEFAULT_TO_ADDRS
 
-    # Construir URL filtrada para este cliente
-    params = {"Cliente": customer_name}
-    url = BASE_DASHBOARD_URL + "?" + urlencode(params)
-    print("Generando PDF para:", customer_name, "con URL:", url)
-    
     # Generar el PDF de la vista filtrada
-    pdf_data = asyncio.run(generate_pdf(url))
+    df_pagina = cargar_datos_consumibles()
+    pdf_data = generar_pdfs({customer_id: customer_name}, df_pagina)[customer_id]
     if not pdf_data:
         print(f"No se pudo generar PDF para {customer_name}")
         return
@@ -381,13 +380,8 @@ def main_test():
     with open(filename, "wb") as f:
         f.write(pdf_data)
     
-    # Obtener el DataFrame de detalle y filtrar por cliente
-    df_detail = unir_datos_consumibles()
-    if not df_detail.empty:
-        df_detail = df_detail[df_detail["Cliente"] == customer_name]
-        df_detail = marcar_estado_suministros(df_detail)
-    else:
-        df_detail = pd.DataFrame()
+    # Obtener el DataFrame de detalle del cliente
+    df_detail = detalle_por_cliente(df_pagina).get(customer_id, df_pagina.iloc[:0])
     
     # Generar el archivo Excel a partir de la tabla de detalle
     excel_data = generate_excel_report(df_detail, filename=f"detalle_consumibles_{customer_name}.xlsx")
@@ -1,6 +1,6 @@
 import os
+import sys
 import asyncio
-from pyppeteer import launch
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
@@ -10,6 +10,11 @@ from urllib.parse import urlencode
 import pandas as pd
 from pymongo import MongoClient
 
+# Módulos compartidos con el dashboard (carpeta app/)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datos.paginas import consumibles, datos_desde_db
+from datos.informes_pdf import informe_consumibles, vista_consumibles
+
 # Cargar variables de entorno
 load_dotenv("D:\\ProyectoSIMP\\2025\\DashBoardSIMP\\config.env")
 
@@ -21,8 +26,14 @@ FROM_ADDR = os.getenv("FROM_ADDR")
 DEFAULT_TO_ADDRS = os.getenv("TO_ADDRS").split(',')
 BASE_DASHBOARD_URL = os.getenv("DASHBOARD_URL", "http://10.0.1.58:8501/Consumibles")
 
+# Cómo se arma el PDF: "nativo" (datos.informes_pdf, sin navegador) o "navegador"
+# (captura de la página del dashboard en ejecución con Edge)
+INFORME_PDF = os.getenv("INFORME_PDF", "nativo")
+
 # Ruta al ejecutable de Edge (basado en Chromium)
 CHROME_PATH = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+# Espera máxima a la señal de "render completo" de la página (comun.captura)
+ESPERA_RENDER_MS = 90000
 
 # Conexión a MongoDB
 MONGO_URI = os.getenv("MONGO_URI")
@@ -48,8 +59,19 @@ def get_emails_for_customer(customer_name):
         return list(set(emails))
     return []
 
+# PDF nativo (datos.informes_pdf) de la página Consumibles filtrada para el cliente, sin navegador
+def generate_pdf_native(customer_name):
+    try:
+        df, _ = datos_desde_db(consumibles, db)
+        return informe_consumibles(vista_consumibles(df, customer_name), subtitulo=f"Cliente: {customer_name}")
+    except Exception as e:
+        print(f"Error generando PDF para {customer_name}: {e}")
+        return None
+
 # Función para generar PDF con pyppeteer a partir de una URL
 async def generate_pdf(url):
+    # pyppeteer solo se necesita en modo "navegador"
+    from pyppeteer import launch
     browser = await launch(headless=True, args=['--no-sandbox'], executablePath=CHROME_PATH)
     page = await browser.newPage()
     # Establecer un viewport amplio (puedes ajustarlo)
@@ -82,8 +104,11 @@ async def generate_pdf(url):
         });
     }''')
     
-    # Esperar tiempo suficiente para que se apliquen los filtros y se renderice todo
-    await asyncio.sleep(20)
+    # Esperar a que la página indique que terminó de dibujar los gráficos y tablas (?captura=1)
+    try:
+        await page.waitForFunction('() => document.body.dataset.render !== undefined', {'timeout': ESPERA_RENDER_MS})
+    except Exception as e:
+        print(f"Sin señal de render completo ({e}); se captura igual.")
     
     options = {
         'format': 'A4',
@@ -130,7 +155,7 @@ def send_email_with_pdf(pdf_data, to_addrs, customer_name):
 #     for idx, row in df_customers.iterrows():
 #         customer_name = row["name"]
 #         # Construir URL filtrada para este cliente
-#         params = {"Cliente": customer_name}
+#         params = {"Cliente": customer_name, "captura": 1}
 #         url = BASE_DASHBOARD_URL + "?" + urlencode(params)
 #         print("Generando PDF para:", customer_name, "URL:", url)
         
@@ -167,15 +192,18 @@ def main_test():
         print(f"No se encontraron correos para {customer_name}, usando correos por defecto.")
         emails = DEFAULT_TO_ADDRS
 
-    # Construir la URL filtrada para ese cliente
-    # Nota: Aquí se asume que tu dashboard (02_Consumibles.py) ha sido modificado
-    # para leer el parámetro "Cliente" de la URL y aplicar ese filtro automáticamente.
-    params = {"Cliente": customer_name}
-    url = BASE_DASHBOARD_URL + "?" + urlencode(params)
-    print("Generando PDF para:", customer_name, "con URL:", url)
-
     # Generar el PDF para la vista filtrada
-    pdf_data = asyncio.run(generate_pdf(url))
+    if INFORME_PDF == "navegador":
+        # Construir la URL filtrada para ese cliente
+        # Nota: Aquí se asume que tu dashboard (02_Consumibles.py) ha sido modificado
+        # para leer el parámetro "Cliente" de la URL y aplicar ese filtro automáticamente.
+        params = {"Cliente": customer_name, "captura": 1}
+        url = BASE_DASHBOARD_URL + "?" + urlencode(params)
+        print("Generando PDF para:", customer_name, "con URL:", url)
+        pdf_data = asyncio.run(generate_pdf(url))
+    else:
+        print("Generando PDF nativo para:", customer_name)
+        pdf_data = generate_pdf_native(customer_name)
     if not pdf_data:
         print(f"No se pudo generar PDF para {customer_name}")
         return
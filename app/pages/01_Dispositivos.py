@@ -1,165 +1,106 @@
 import streamlit as st
 import pandas as pd
-from pymongo import MongoClient
-from dotenv import load_dotenv
-import os
-import matplotlib.pyplot as plt
-import io
 import altair as alt
-import plotly.express as px
+from comun.accesos import registrar_acceso
+from comun.captura import marcar_render_completo
+from comun.cargas import boton_recarga
+from comun.paginas.dispositivos import cargar_datos, cargar_indicadores, cargar_resumen, clave_pagina, obtener_indice
+from comun.precalentado import iniciar_precalentado
+from comun.rendimiento import cerrar_medicion_pagina, iniciar_medicion_pagina, mostrar_altair, mostrar_plotly, mostrar_pyplot, mostrar_tabla, panel_memoria
+from comun.tablas import tabla_paginada
+from datos.esquemas import contar_valores
+from datos.paginas.dispositivos import alias_columnas, filtrar_datos
+from datos.rendimiento import medir
 
 # Configurar la página
 st.set_page_config(page_title="Dashboard - Dispositivos", layout="wide")
 
-# Cargar variables desde "Secrets" Streamlit
-#load_dotenv("D:\\ProyectoSIMP\\2025\\DashBoardSIMP\\config.env")
-MONGO_URI = st.secrets["MONGO_URI"]
-DATABASE_NAME = st.secrets["DATABASE_NAME"]
-
-# Conectar a MongoDB
-client = MongoClient(MONGO_URI)
-db = client[DATABASE_NAME]
-
-# Definir los campos necesarios para cada colección
-customer_fields = {"customerId": 1, "name": 1, "status": 1, "_id": 0}
-device_fields = {
-    "customerId": 1,
-    "serialNumber": 1,
-    "ipAddress": 1,
-    "monitorStatus": 1,
-    "extendedFields": 1,
-    "discoveryDate": 1,
-    "lastContact": 1,
-    "_id": 0
-}
+# Registrar el acceso (se escribe en lotes, sin esperar a MongoDB)
+registrar_acceso("Dispositivos")
 
-# Función para cargar datos desde MongoDB (se ejecuta una sola vez y se cachea)
-@st.cache_resource(ttl=300, show_spinner=False)
-def get_data():
-    # Cargar clientes activos
-    customers = list(db["CUSTOMER"].find({"status": "ACTIVE"}, customer_fields))
-    # Cargar dispositivos (sin filtro de status en este lado)
-    devices = list(db["DEVICE"].find({}, device_fields))
-    return customers, devices
-
-# Función para unir los datos de CUSTOMER y DEVICE
-def unir_datos(customers, devices):
-    df_customers = pd.DataFrame(customers)
-    df_devices = pd.DataFrame(devices)
-    
-    # Expandir la columna "extendedFields" en df_devices para extraer campos relevantes
-    if "extendedFields" in df_devices.columns:
-        extended_df = df_devices["extendedFields"].apply(pd.Series)
-        # Queremos todos los campos excepto "sku" e "internalId"
-        campos_extra = ["model", "zone", "location", "firmware", "hostName", "monitorName", "manufacturer", "mibDescription"]
-        extended_df = extended_df[campos_extra].fillna("Desconocido")
-        df_devices = pd.concat([df_devices.drop(columns=["extendedFields"]), extended_df], axis=1)
-    else:
-        for campo in ["model", "zone", "location", "firmware", "hostName", "monitorName", "manufacturer", "mibDescription"]:
-            df_devices[campo] = "Desconocido"
-    
-    # Convertir las fechas a datetime
-    df_devices["discoveryDate"] = pd.to_datetime(df_devices["discoveryDate"], errors="coerce")
-    df_devices["lastContact"] = pd.to_datetime(df_devices["lastContact"], errors="coerce")
-    
-    # Fusionar los DataFrames por "customerId"
-    if not df_customers.empty and not df_devices.empty:
-        df_merged = pd.merge(df_customers, df_devices, on="customerId", how="inner")
-        # Eliminar columnas innecesarias
-        df_merged = df_merged.drop(columns=["customerId", "status"], errors="ignore")
-        # Definir el orden deseado de columnas (ajusta según tus necesidades)
-        orden_columnas = ["name", "serialNumber", "ipAddress", "monitorStatus", "model", "zone", "location", "firmware", "discoveryDate", "lastContact"]
-        df_merged = df_merged[[col for col in orden_columnas if col in df_merged.columns]]
-        return df_merged
-    return pd.DataFrame()
+# Precalentar en segundo plano los datos de todas las páginas (un hilo por proceso)
+iniciar_precalentado()
+
+# Medir los tiempos por etapa de esta ejecución (muestreo o panel de administradores)
+iniciar_medicion_pagina("Dispositivos")
+
+# Tabla filtrada paginada: cambiar de página u orden vuelve a ejecutar solo este fragmento
+@st.fragment
+@medir("tabla_dispositivos")
+def tabla_dispositivos(df_filtered):
+    tabla_paginada(df_filtered, "dispositivos", nombre_archivo="dispositivos.csv")
 
 # Título de la página
 st.title("📊 Dashboard de Dispositivos")
 
-# Cargar y unir datos (se cachea en get_data)
-customers, devices = get_data()
-df = unir_datos(customers, devices)
+# Cargar y unir datos (las colecciones se cachean y refrescan en comun.cargas)
+boton_recarga()
+versiones = clave_pagina()
+resumen_datos = cargar_resumen(versiones)
+indice = obtener_indice(versiones)
 
 # Barra lateral: Filtros interactivos
 st.sidebar.header("📌 Filtros")
-clientes_unicos = sorted(df["name"].dropna().unique())
+clientes_unicos = indice.opciones("name")
 filtro_cliente = st.sidebar.multiselect("Seleccionar Cliente", clientes_unicos)
 
+panel_memoria(resumen_datos["reporte_memoria"])
+
 # Si se selecciona al menos un cliente, actualizar los demás filtros.
-if filtro_cliente:
-    df_filtrado_clientes = df[df["name"].isin(filtro_cliente)]
-    modelos_unicos       = sorted(df_filtrado_clientes["model"].dropna().unique())
-    monitor_status_unicos = sorted(df_filtrado_clientes["monitorStatus"].dropna().unique())
-    zonas_unicas         = sorted(df_filtrado_clientes["zone"].dropna().unique())
-    locations_unicas     = sorted(df_filtrado_clientes["location"].dropna().unique())
-else:
-    # Si no se filtra por cliente, usar los valores de todo el DataFrame
-    modelos_unicos       = sorted(df["model"].dropna().unique())
-    monitor_status_unicos = sorted(df["monitorStatus"].dropna().unique())
-    zonas_unicas         = sorted(df["zone"].dropna().unique())
-    locations_unicas     = sorted(df["location"].dropna().unique())
-    
+# (sin clientes seleccionados filas_clientes es None y se usan los valores de todo el DataFrame)
+filas_clientes = indice.filas({"name": filtro_cliente})
+modelos_unicos        = indice.opciones("model", filas_clientes)
+monitor_status_unicos = indice.opciones("monitorStatus", filas_clientes)
+zonas_unicas          = indice.opciones("zone", filas_clientes)
+locations_unicas      = indice.opciones("location", filas_clientes)
+
 filtro_modelo = st.sidebar.multiselect("Seleccionar Modelo", modelos_unicos)
 filtro_monitor = st.sidebar.multiselect("Seleccionar Monitor Status", monitor_status_unicos)
 filtro_zona = st.sidebar.multiselect("Seleccionar Zona", zonas_unicas)
 filtro_location = st.sidebar.multiselect("Seleccionar Location", locations_unicas)
 
-if not df["lastContact"].isnull().all():
-    fecha_inicio = st.sidebar.date_input("Fecha inicio (Last Contact)", df["lastContact"].min().date())
-    fecha_fin = st.sidebar.date_input("Fecha fin (Last Contact)", df["lastContact"].max().date())
+if resumen_datos["fechas"]["lastContact"]:
+    contacto_min, contacto_max = resumen_datos["fechas"]["lastContact"]
+    fecha_inicio = st.sidebar.date_input("Fecha inicio (Last Contact)", contacto_min)
+    fecha_fin = st.sidebar.date_input("Fecha fin (Last Contact)", contacto_max)
 else:
     fecha_inicio, fecha_fin = None, None
 
-if not df["discoveryDate"].isnull().all():
-    disc_inicio = st.sidebar.date_input("Fecha inicio (Discovery Date)", df["discoveryDate"].min().date(), key="disc_inicio")
-    disc_fin = st.sidebar.date_input("Fecha fin (Discovery Date)", df["discoveryDate"].max().date(), key="disc_fin")
+if resumen_datos["fechas"]["discoveryDate"]:
+    descubrimiento_min, descubrimiento_max = resumen_datos["fechas"]["discoveryDate"]
+    disc_inicio = st.sidebar.date_input("Fecha inicio (Discovery Date)", descubrimiento_min, key="disc_inicio")
+    disc_fin = st.sidebar.date_input("Fecha fin (Discovery Date)", descubrimiento_max, key="disc_fin")
 else:
     disc_inicio, disc_fin = None, None
 
-# Aplicar filtros a la copia de df
-df_filtered = df.copy()
-if filtro_cliente:
-    df_filtered = df_filtered[df_filtered["name"].isin(filtro_cliente)]
-if filtro_modelo:
-    df_filtered = df_filtered[df_filtered["model"].isin(filtro_modelo)]
-if filtro_monitor:
-    df_filtered = df_filtered[df_filtered["monitorStatus"].isin(filtro_monitor)]
-if filtro_zona:
-    df_filtered = df_filtered[df_filtered["zone"].isin(filtro_zona)]
-if filtro_location:
-    df_filtered = df_filtered[df_filtered["location"].isin(filtro_location)]
-if fecha_inicio and fecha_fin:
-    df_filtered = df_filtered[(df_filtered["lastContact"].dt.date >= fecha_inicio) & (df_filtered["lastContact"].dt.date <= fecha_fin)]
-if disc_inicio and disc_fin:
-    df_filtered = df_filtered[(df_filtered["discoveryDate"].dt.date >= disc_inicio) & (df_filtered["discoveryDate"].dt.date <= disc_fin)]
+filtros = {
+    "name": filtro_cliente,
+    "model": filtro_modelo,
+    "monitorStatus": filtro_monitor,
+    "zone": filtro_zona,
+    "location": filtro_location,
+}
+rango_contacto = (fecha_inicio, fecha_fin) if fecha_inicio and fecha_fin else None
+rango_descubrimiento = (disc_inicio, disc_fin) if disc_inicio and disc_fin else None
 
-# Asignar alias a las columnas
-df_filtered = df_filtered.rename(columns={
-    "name": "Cliente",
-    "serialNumber": "Serial",
-    "ipAddress": "IP",
-    "monitorStatus": "Estado de Monitoreo",
-    "model": "Modelo",
-    "zone": "Zona",
-    "location": "Ubicación",
-    "firmware": "Firmware",
-    "discoveryDate": "Fecha de Descubrimiento",
-    "lastContact": "Último Contacto"
-})
-
-# Indicadores clave
+# Aplicar filtros: intersección de las posiciones precalculadas en el índice y rangos de fechas
+df, _ = cargar_datos(versiones)
+df_filtered = filtrar_datos(df, filtros, indice, rango_contacto=rango_contacto, rango_descubrimiento=rango_descubrimiento)
+
+# Indicadores clave: de los mismos datos filtrados que la tabla (en vivo, calculados en MongoDB)
 st.subheader("Indicadores Clave")
-total_dispositivos = len(df_filtered)
-dispositivos_monitoreados = len(df_filtered[df_filtered["Estado de Monitoreo"] == "Y"])
-porcentaje_monitoreados = (dispositivos_monitoreados / total_dispositivos * 100) if total_dispositivos > 0 else 0
+kpi = cargar_indicadores(versiones, filtros, df_filtered, rango_contacto, rango_descubrimiento)
 
 col1, col2, col3 = st.columns(3)
-col1.metric("Total Dispositivos", total_dispositivos)
-col2.metric("Monitoreados", dispositivos_monitoreados)
-col3.metric("Porcentaje Monitoreados", f"{porcentaje_monitoreados:.1f}%")
+col1.metric("Total Dispositivos", kpi["total"])
+col2.metric("Monitoreados", kpi["monitoreados"])
+col3.metric("Porcentaje Monitoreados", f"{kpi['porcentaje_monitoreados']:.1f}%")
+
+# Asignar alias a las columnas
+df_filtered = df_filtered.rename(columns=alias_columnas, copy=False)
 
 # Mostrar la tabla filtrada
-st.dataframe(df_filtered)
+tabla_dispositivos(df_filtered)
 
 # Gráficos
 
@@ -171,7 +112,7 @@ st.subheader("Gráficos")
 #st.bar_chart(model_counts)
 
 # Calcula la distribución por modelo, ordenada de mayor a menor:
-model_counts = df_filtered["Modelo"].value_counts().sort_values(ascending=False).reset_index()
+model_counts = contar_valores(df_filtered["Modelo"]).sort_values(ascending=False).reset_index()
 model_counts.columns = ["Modelo", "count"]
 
 # Crea un gráfico de barras con Altair, definiendo explícitamente el orden de los modelos
@@ -186,7 +127,7 @@ chart = alt.Chart(model_counts).mark_bar().encode(
 )
 
 # Mostrar el gráfico en Streamlit
-st.altair_chart(chart, use_container_width=True)
+mostrar_altair(chart, "modelos", use_container_width=True)
 
 #Gráfico circular: Proporción de Dispositivos Monitoreados vs No Monitoreados
 st.markdown("**Proporción de Monitoreados vs No Monitoreados**")
@@ -194,21 +135,26 @@ st.markdown("**Proporción de Monitoreados vs No Monitoreados**")
 # Función auxiliar para graficar un pie chart (usando Matplotlib)
 
 def create_pie_chart(data):
+    # Matplotlib se importa al llegar a esta sección. Con Figure (sin pyplot) no se carga la
+    # maquinaria de ventanas de pyplot y la figura no queda abierta en el estado global entre ejecuciones
+    from matplotlib.figure import Figure
+
     # Crear una figura con tamaño fijo
-    fig, ax = plt.subplots(figsize=(2,2))
+    fig = Figure(figsize=(2,2))
+    ax = fig.subplots()
     ax.pie(data, labels=data.index, autopct="%1.1f%%", startangle=90)
     ax.axis("equal")
     fig.tight_layout(pad=0)
     return fig
 
 # 'df_filtered' es tu DataFrame ya filtrado
-monitor_counts = df_filtered["Estado de Monitoreo"].value_counts()
+monitor_counts = contar_valores(df_filtered["Estado de Monitoreo"])
 
 # Generar la figura usando los datos filtrados
 fig_pie = create_pie_chart(monitor_counts)
 
 # Mostrar la figura con st.pyplot, sin que se expanda al ancho del contenedor
-st.pyplot(fig_pie, use_container_width=False)
+mostrar_pyplot(fig_pie, "fig_pie", use_container_width=False)
 
 # Gráfico de líneas: Tendencia de Último Contacto
 
@@ -223,7 +169,7 @@ st.pyplot(fig_pie, use_container_width=False)
 if not df_filtered["Último Contacto"].isnull().all():
     # Calcular días transcurridos desde el último contacto
     current_time = pd.Timestamp.now(tz='UTC')
-    df_filtered["days_since_last_contact"] = (current_time - df_filtered["Último Contacto"]).dt.days
+    df_filtered = df_filtered.assign(days_since_last_contact=(current_time - df_filtered["Último Contacto"]).dt.days)
 
     # Crear un histograma con Altair para visualizar la distribución de días desde el último contacto
     chart = alt.Chart(df_filtered).mark_bar().encode(
@@ -235,22 +181,20 @@ if not df_filtered["Último Contacto"].isnull().all():
         height=400,
         title="Distribución de Días desde el Último Contacto"
     )
-    st.altair_chart(chart, use_container_width=True)
+    mostrar_altair(chart, "dias_sin_contacto", use_container_width=True)
 else:
     st.write("No hay datos de Last Contact para graficar tendencias.")
 
 # Gráfico de barras: Consolidado de versiones de firmware
 #st.markdown("**Consolidado de Versiones de Firmware**")
 #st.bar_chart(df_filtered["Firmware"].value_counts())
-import altair as alt
-import pandas as pd
 
 # Suponiendo que df_filtered es tu DataFrame filtrado y ya renombrado,
 # y que la columna de firmware ya se llama "Firmware"
 
 def consolidar_firmware(df, top_n=10):
     # Calcular la cantidad de dispositivos por cada versión de firmware
-    firmware_counts = df["Firmware"].value_counts()
+    firmware_counts = contar_valores(df["Firmware"])
     
     # Si hay más de top_n versiones, agrupar el resto en "Otros"
     if len(firmware_counts) > top_n:
@@ -268,16 +212,28 @@ def consolidar_firmware(df, top_n=10):
 # Usar la función para consolidar los datos
 firmware_df = consolidar_firmware(df_filtered, top_n=10)
 
-# Crear el treemap con Plotly Express
-treemap_fig = px.treemap(
-    firmware_df,
-    path=['Firmware'], 
-    values='Cantidad',  
-    title="Distribución de Firmware"
-)
-st.plotly_chart(treemap_fig, use_container_width=True)
+# Función auxiliar para crear el treemap con Plotly Express
+def create_treemap(firmware_df):
+    # Plotly Express se importa al llegar a esta sección: es la biblioteca más pesada de la página
+    import plotly.express as px
+
+    return px.treemap(
+        firmware_df,
+        path=['Firmware'], 
+        values='Cantidad',  
+        title="Distribución de Firmware"
+    )
+
+treemap_fig = create_treemap(firmware_df)
+mostrar_plotly(treemap_fig, "treemap_fig", use_container_width=True)
 
 # Tabla resumen: Agrupación por Zona y Location
 st.subheader("Agrupación por Zona y Ubicación")
-resumen = df_filtered.groupby(["Zona", "Ubicación"]).size().reset_index(name="Cantidad de Dispositivos")
-st.dataframe(resumen)
+resumen = df_filtered.groupby(["Zona", "Ubicación"], observed=True).size().reset_index(name="Cantidad de Dispositivos")
+mostrar_tabla(resumen, "resumen")
+
+# Guardar la medición en PERF_LOG y mostrar el panel de rendimiento a los administradores
+cerrar_medicion_pagina()
+
+# Señal para las capturas en PDF de los scripts de email (solo con ?captura=1)
+marcar_render_completo()
@@ -1,212 +1,60 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from pymongo import MongoClient
-from dotenv import load_dotenv
-import os
 import altair as alt
-import plotly.express as px
+from comun.accesos import registrar_acceso
+from comun.captura import marcar_render_completo
+from comun.cargas import boton_recarga
+from comun.paginas.contadores import cargar_datos, cargar_resumen, cargar_ultimas_lecturas, clave_pagina, obtener_indice
+from comun.precalentado import iniciar_precalentado
+from comun.rendimiento import cerrar_medicion_pagina, iniciar_medicion_pagina, mostrar_altair, panel_memoria
+from comun.tablas import tabla_paginada
+from datos.graficos import descripcion_muestreo, puntos_dispersion, serie_temporal
+from datos.paginas.contadores import filtrar_datos, indicadores, ultima_lectura_por_dispositivo
+from datos.rendimiento import medir
 
 # Configurar la página
 st.set_page_config(page_title="Dashboard - Contadores", layout="wide")
 
-# Cargar variables desde "Secrets" Streamlit
-#load_dotenv("D:\\ProyectoSIMP\\2025\\DashBoardSIMP\\config.env")
-MONGO_URI = st.secrets["MONGO_URI"]
-DATABASE_NAME = st.secrets["DATABASE_NAME"]
-
-# Conectar a MongoDB
-client = MongoClient(MONGO_URI)
-db = client[DATABASE_NAME]
-
-# Definir campos para cada colección
-
-# METERS (Contadores)
-meters_fields = {
-    "billingDate": 1,
-    "readingDate": 1,
-    "readingDateTime": 1,
-    "a4Mono": 1,
-    "a4Colour": 1,
-    "engineCycles": 1,
-    "scans": 1,
-    "nonCopyScans": 1,
-    "monoSmall": 1,
-    "monoLarge": 1,
-    "colourSmall": 1,
-    "colourLarge": 1,
-    "monoTier": 1,
-    "colourTier1": 1,
-    "colourTier2": 1,
-    "colourTier3": 1,
-    "monoPages": 1,
-    "colourPages": 1,
-    "duplex": 1,
-    "deviceId": 1,
-    "_id": 0
-}
-
-# DEVICE
-device_fields = {
-    "deviceId": 1,
-    "customerId": 1,
-    "serialNumber": 1,  # Serial del dispositivo
-    "ipAddress": 1,
-    "monitorStatus": 1,
-    "extendedFields": 1,  # (model, zone, location, firmware, etc.)
-    "discoveryDate": 1,
-    "lastContact": 1,
-    "_id": 0
-}
-
-# CUSTOMER
-customer_fields = {
-    "customerId": 1,
-    "name": 1,
-    "status": 1,
-    "city": 1,
-    "_id": 0
-}
-
-
-# Funciones de carga con caché (TTL de 300 segundos)
-@st.cache_data(ttl=300, show_spinner=False)
-def get_meters_data():
-    meters = list(db["METERS"].find({}, meters_fields))
-    df = pd.DataFrame(meters)
-    # Convertir readingDateTime y billingDate a datetime
-    df["readingDateTime"] = pd.to_datetime(df["readingDateTime"], errors="coerce")
-    df["billingDate"] = pd.to_datetime(df["billingDate"], errors="coerce")
-    return df
-
-@st.cache_data(ttl=300, show_spinner=False)
-def get_device_data():
-    devices = list(db["DEVICE"].find({}, device_fields))
-    df = pd.DataFrame(devices)
-    # Convertir fechas en devices
-    if not df.empty:
-        df["discoveryDate"] = pd.to_datetime(df["discoveryDate"], errors="coerce")
-        df["lastContact"] = pd.to_datetime(df["lastContact"], errors="coerce")
-    return df
-
-@st.cache_data(ttl=300, show_spinner=False)
-def get_customer_data():
-    customers = list(db["CUSTOMER"].find({"status": "ACTIVE"}, customer_fields))
-    return pd.DataFrame(customers)
-
-# Función para unir los datos de METERS, DEVICE, CUSTOMER y MONITOR
-def unir_datos_meters():
-    df_meters = get_meters_data()
-    df_devices = get_device_data()
-    df_customers = get_customer_data()
-
-    if df_meters.empty or df_devices.empty or df_customers.empty:
-        return pd.DataFrame()
-    
-    # Unir METERS con DEVICE usando "deviceId"
-    df = pd.merge(df_meters, df_devices, on="deviceId", how="inner")
-    # Unir con CUSTOMER usando "customerId" del DEVICE
-    df = pd.merge(df, df_customers, on="customerId", how="inner")
-
-    # Renombrar columnas para visualización
-    df = df.rename(columns={
-        "name": "Cliente",
-        "status": "Estado cliente",
-        "lastContact": "lastContact",
-        "city": "Ciudad",
-        "serialNumber": "Serial Dispositivo",
-        "engineCycles": "Ciclos de motor",
-        "monoSmall": "Paginas mono",
-        "colourPages": "paginas color"
-    })
-    return df
-
-# Función para calcular consumos diarios (diferencias) para contadores relevantes
-def calcular_consumo_diario(df):
-    # Ordenar por deviceId y readingDateTime
-    df = df.sort_values(["deviceId", "readingDateTime"])
-    # Calcular diferencias por dispositivo para engineCycles y monoPages
-    df["engineCycles_daily"] = df.groupby("deviceId")["Ciclos de motor"].diff()
-    df["monoPages_daily"] = df.groupby("deviceId")["Paginas mono"].diff()
-    df["colourPages_daily"] = df.groupby("deviceId")["paginas color"].diff()
-    df["totalPages_daily"] = df["monoPages_daily"] + df["colourPages_daily"]
-    # Otras métricas se pueden calcular de forma similar
-    return df
-
-# Cargar y unir los datos
-df = unir_datos_meters()
-if df.empty:
-    st.error("No se encontraron datos en la colección METERS o en los JOINs.")
-else:
-    # Calcular consumos diarios
-    df = calcular_consumo_diario(df)
-    
-    #Filtros
-    st.sidebar.header("Filtros de Contadores")
-    clientes_unicos = sorted(df["Cliente"].dropna().unique())
-    filtro_cliente = st.sidebar.multiselect("Seleccionar Cliente", clientes_unicos)
-    
-    if filtro_cliente:
-        dispositivos_unicos = sorted(df[df["Cliente"].isin(filtro_cliente)]["Serial Dispositivo"].dropna().unique())
-    else:
-        dispositivos_unicos = sorted(df["Serial Dispositivo"].dropna().unique())
+# Registrar el acceso (se escribe en lotes, sin esperar a MongoDB)
+registrar_acceso("Contadores")
 
-    filtro_device = st.sidebar.multiselect("Seleccionar Dispositivo", dispositivos_unicos)
+# Precalentar en segundo plano los datos de todas las páginas (un hilo por proceso)
+iniciar_precalentado()
 
-    if filtro_device:
-        clientes_unicos = sorted(df[df["Serial Dispositivo"].isin(filtro_device)]["Cliente"].dropna().unique())
-    else:
-        clientes_unicos = sorted(df["Cliente"].dropna().unique())
+# Medir los tiempos por etapa de esta ejecución (muestreo o panel de administradores)
+iniciar_medicion_pagina("Contadores")
 
-    # Filtro por rango de fecha (por ejemplo, readingDateTime)
-    min_date = df["billingDate"].min().date()
-    max_date = df["billingDate"].max().date()
-    filtro_fecha = st.sidebar.date_input("Rango de Fecha", value=(min_date, max_date))
-    
-    df_filtered = df.copy()
-    if filtro_cliente:
-        df_filtered = df_filtered[df_filtered["Cliente"].isin(filtro_cliente)]
-    if filtro_device:
-        df_filtered = df_filtered[df_filtered["Serial Dispositivo"].isin(filtro_device)]
-    if isinstance(filtro_fecha, (list, tuple)) and len(filtro_fecha)==2:
-        df_filtered = df_filtered[(df_filtered["billingDate"].dt.date >= filtro_fecha[0]) & 
-                                  (df_filtered["billingDate"].dt.date <= filtro_fecha[1])]
+# -------------------------------------------------
+# Secciones de la página
+# -------------------------------------------------
+# Cada sección es un fragmento: si un control propio de la sección cambia, solo se vuelve a
+# ejecutar esa sección. Los filtros de la barra lateral van en un formulario y se aplican juntos.
 
-    # Título de la página
-    st.title("📊 Dashboard de contadores")
+@st.fragment
+@medir("mostrar_indicadores")
+def mostrar_indicadores(df_filtered):
     st.subheader("Indicadores Clave")
-    total_registros = df_filtered.shape[0]
-    # Promedio diario de engineCycles para todos los dispositivos filtrados
-    avg_engineCycles = df_filtered[df_filtered["engineCycles_daily"] != 0]["engineCycles_daily"].mean()
-    # Promedio diario de monoPages
-    avg_monoPages = df_filtered[df_filtered["monoPages_daily"] != 0]["monoPages_daily"].mean()
-    # Promedio diario de colourPages
-    avg_colourPages = df_filtered[df_filtered["colourPages_daily"] != 0]["colourPages_daily"].mean()
+    # Promedios diarios de ciclos de motor, páginas mono y páginas color de los dispositivos filtrados
+    kpi = indicadores(df_filtered)
 
     col1, col2, col3 = st.columns(3)
-    #col1.metric("Total Registros (Contadores)", total_registros)
-    col1.metric("Promedio Diario (ciclos de motor)", f"{avg_engineCycles:.0f}")
-    col2.metric("Promedio Diario (Paginas mono)", f"{avg_monoPages:.0f}")
-    col3.metric("Promedio Diario (Paginas color)",f"{avg_colourPages:.0f}")
+    col1.metric("Promedio Diario (ciclos de motor)", f"{kpi['ciclos_motor']:.0f}")
+    col2.metric("Promedio Diario (Paginas mono)", f"{kpi['paginas_mono']:.0f}")
+    col3.metric("Promedio Diario (Paginas color)",f"{kpi['paginas_color']:.0f}")
 
+@st.fragment
+@medir("tabla_contadores")
+def tabla_contadores(df_filtered):
     st.subheader("Datos de Contadores")
-    # Formatear las columnas de fecha antes de mostrarlas
-    df_filtered["billingDate"] = df_filtered["billingDate"].dt.strftime("%Y-%m-%d")
-    df_filtered["readingDateTime"] = df_filtered["readingDateTime"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    # Crear la columna "simplex" (impresiones en modo simplex)
-    df_filtered["simplex"] = df_filtered["Ciclos de motor"] - df_filtered["duplex"]
-
-    st.dataframe(df_filtered[[
+    tabla_paginada(df_filtered[[
         "Cliente", "Serial Dispositivo", "billingDate", "readingDateTime", "Ciclos de motor", "engineCycles_daily",
         "Paginas mono", "monoPages_daily", "paginas color", "colourPages_daily", "scans", "duplex", "simplex"
-    ]])
-
-    st.subheader("Gráficos de Tendencia")
-    # 1. 
-    # Agrupar por "Serial Dispositivo" y tomar el último reading (según readingDateTime)
-    df_latest = df_filtered.sort_values("readingDateTime").groupby("Serial Dispositivo", as_index=False).tail(1)
+    ]], "contadores", nombre_archivo="contadores.csv")
 
+# 1. Top 20 impresoras con mayor y menor Engine Cycles (último reading)
+@st.fragment
+@medir("graficos_extremos")
+def graficos_extremos(df_latest):
+    # df_latest: último reading de cada "Serial Dispositivo" (según readingDateTime)
     # Top 20 Impresoras con MAYOR Engine Cycles
     df_top20 = df_latest.sort_values("Ciclos de motor", ascending=False).head(20)
     chart_top20 = alt.Chart(df_top20).mark_bar().encode(
@@ -218,7 +66,7 @@ else:
         height=400,
         title="Top 20 Impresoras con Mayor Engine Cycles"
     )
-    st.altair_chart(chart_top20, use_container_width=True)
+    mostrar_altair(chart_top20, "chart_top20", use_container_width=True)
 
     # Top 20 Impresoras con MENOR Engine Cycles (según el último reading)
     df_bottom20 = df_latest.sort_values("Ciclos de motor", ascending=True).head(20)
@@ -231,27 +79,35 @@ else:
         height=400,
         title="Top 20 Impresoras con Menor Engine Cycles"
     )
-    st.altair_chart(chart_bottom20, use_container_width=True)
+    mostrar_altair(chart_bottom20, "chart_bottom20", use_container_width=True)
 
+@st.fragment
+@medir("grafico_consumo_diario")
+def grafico_consumo_diario(df_filtered):
     # 2. Serie Temporal: Consumo Diario (Ciclos de motor)
-    chart_line_diff = alt.Chart(df_filtered.dropna(subset=["engineCycles_daily"])).mark_line().encode(
+    # Agregado por dispositivo y día en el servidor; si hay demasiados puntos se reduce (ver datos.graficos)
+    df_consumo, resumen = serie_temporal(df_filtered, "billingDate", "engineCycles_daily", "Serial Dispositivo",
+                                         extras=["Cliente"])
+    chart_line_diff = alt.Chart(df_consumo).mark_line().encode(
         x=alt.X("billingDate:O", title="Fecha"),
         y=alt.Y("engineCycles_daily:Q", title="Consumo Diario"),
         color=alt.Color("Serial Dispositivo:N", legend=alt.Legend(title="Dispositivo")),
-        tooltip=["Cliente", "Serial Dispositivo", "readingDateTime", "engineCycles_daily"]
+        tooltip=["Cliente", "Serial Dispositivo", "billingDate", "engineCycles_daily"]
     ).properties(
         width=700,
         height=400,
         title="Consumo Diario (ciclos de motor)"
     )
-    st.altair_chart(chart_line_diff, use_container_width=True)
+    mostrar_altair(chart_line_diff, "chart_line_diff", use_container_width=True)
+    if descripcion_muestreo(resumen):
+        st.caption(descripcion_muestreo(resumen))
 
+@st.fragment
+@medir("grafico_color")
+def grafico_color(df_ultimas):
     # 3. Estadisticas impresoras a color
-    # Filtrar impresoras a color (donde colourSmall > 0)
-    df_color = df_filtered[df_filtered["colourSmall"] > 0].copy()
-
-    # Agrupar por "Serial Dispositivo" y tomar el registro más reciente basado en billingDate
-    df_latest = df_color.sort_values("billingDate").groupby("Serial Dispositivo", as_index=False).tail(1)
+    # Filtrar impresoras a color (donde colourSmall > 0) en el registro más reciente de cada dispositivo
+    df_latest = df_ultimas[df_ultimas["colourSmall"] > 0]
 
     # Convertir el DataFrame a formato largo para las columnas "monoSmall" y "colourSmall"
     df_melt = df_latest.melt(
@@ -274,10 +130,16 @@ else:
         title="Estadísticas de Impresoras a Color: mono vs. colour"
     )
 
-    st.altair_chart(chart_color, use_container_width=True)
+    mostrar_altair(chart_color, "chart_color", use_container_width=True)
 
+@st.fragment
+@medir("grafico_eficiencia")
+def grafico_eficiencia(df_filtered):
     # 4. # Scatter Plot: Relación entre Total de Páginas Impresas y EngineCycles diarios
-    df_efficiency = df_filtered.dropna(subset=["totalPages_daily", "engineCycles_daily"])
+    df_efficiency, resumen = puntos_dispersion(
+        df_filtered.dropna(subset=["totalPages_daily", "engineCycles_daily"]),
+        ["Cliente", "Serial Dispositivo", "readingDateTime", "totalPages_daily", "engineCycles_daily"]
+    )
 
     chart_efficiency = alt.Chart(df_efficiency).mark_circle(size=60).encode(
         x=alt.X("totalPages_daily:Q", title="Total de Páginas Impresas Diarias"),
@@ -290,13 +152,15 @@ else:
         title="Relación: Total de Páginas Impresas vs. Ciclos de Motor Diarios"
     )
 
-    st.altair_chart(chart_efficiency, use_container_width=True)
-
+    mostrar_altair(chart_efficiency, "chart_efficiency", use_container_width=True)
+    if descripcion_muestreo(resumen):
+        st.caption(descripcion_muestreo(resumen))
 
+@st.fragment
+@medir("grafico_duplex")
+def grafico_duplex(df_latest):
     # 5. comparativa duplex y simplex
-    
-    # Agrupar por "Serial Dispositivo" y tomar el último registro (según readingDateTime)
-    df_latest = df_filtered.sort_values("readingDateTime").groupby("Serial Dispositivo", as_index=False).tail(1)
+    # df_latest: último registro de cada "Serial Dispositivo" (según readingDateTime)
 
     # Seleccionar las top 20 impresoras con mayor impresión en modo duplex
     df_top_duplex = df_latest.sort_values("duplex", ascending=False).head(20)
@@ -321,15 +185,18 @@ else:
         title="Comparativa: Impresiones Duplex vs. Simplex (Top Impresoras por Duplex)"
     )
 
-    st.altair_chart(chart_duplex, use_container_width=True)
+    mostrar_altair(chart_duplex, "chart_duplex", use_container_width=True)
 
+@st.fragment
+@medir("grafico_scans")
+def grafico_scans(df_ultimas):
     #6. ScatterPlot Scans Vs Impresiones
 
-    # Filtrar dispositivos que tienen scans > 0 (multifuncionales)
-    df_scans = df_filtered[df_filtered["scans"] > 0].copy()
-
-    # Agrupar por "Serial Dispositivo" y tomar el último registro (según readingDateTime)
-    df_latest_scans = df_scans.sort_values("readingDateTime").groupby("Serial Dispositivo", as_index=False).tail(1)
+    # Filtrar dispositivos que tienen scans > 0 (multifuncionales) en su último registro
+    df_latest_scans, resumen = puntos_dispersion(
+        df_ultimas[df_ultimas["scans"] > 0],
+        ["Cliente", "Serial Dispositivo", "Ciclos de motor", "scans", "readingDateTime"]
+    )
 
     # Crear el gráfico de dispersión: Engine Cycles vs. Scans
     chart_scans = alt.Chart(df_latest_scans).mark_circle(size=60).encode(
@@ -343,4 +210,75 @@ else:
         title="Relación: Engine Cycles vs. Scans (Multifuncionales)"
     )
 
-    st.altair_chart(chart_scans, use_container_width=True)
+    mostrar_altair(chart_scans, "chart_scans", use_container_width=True)
+    if descripcion_muestreo(resumen):
+        st.caption(descripcion_muestreo(resumen))
+
+# Cargar y unir los datos (las colecciones se cachean y refrescan en comun.cargas)
+boton_recarga()
+versiones = clave_pagina()
+resumen_datos = cargar_resumen(versiones)
+if resumen_datos["vacio"]:
+    st.error("No se encontraron datos en la colección METERS o en los JOINs.")
+else:
+    
+    #Filtros
+    st.sidebar.header("Filtros de Contadores")
+    panel_memoria(resumen_datos["reporte_memoria"])
+    indice = obtener_indice(versiones)
+    min_date, max_date = resumen_datos["fechas"]
+
+    # Los filtros se aplican juntos al enviar el formulario
+    with st.sidebar.form("filtros_contadores"):
+        clientes_unicos = indice.opciones("Cliente")
+        filtro_cliente = st.multiselect("Seleccionar Cliente", clientes_unicos)
+
+        # Dispositivos de los clientes aplicados (todos si no hay selección)
+        dispositivos_unicos = indice.opciones("Serial Dispositivo", indice.filas({"Cliente": filtro_cliente}))
+        filtro_device = st.multiselect("Seleccionar Dispositivo", dispositivos_unicos)
+
+        # Filtro por rango de fecha (por ejemplo, readingDateTime)
+        filtro_fecha = st.date_input("Rango de Fecha", value=(min_date, max_date))
+        st.form_submit_button("Aplicar filtros")
+    
+    # Filtros multiselect (intersección de las posiciones precalculadas en el índice) y rango de fechas
+    df, _ = cargar_datos(versiones)
+    df_filtered = filtrar_datos(df, {"Cliente": filtro_cliente, "Serial Dispositivo": filtro_device}, indice,
+                                rango_fechas=filtro_fecha if isinstance(filtro_fecha, (list, tuple)) else None)
+
+    # Última lectura por dispositivo para los gráficos: con el rango de fechas completo se toma la
+    # instantánea cacheada y solo se filtra por cliente/dispositivo con su índice; con un rango parcial se calcula aquí
+    if tuple(filtro_fecha) == (min_date, max_date):
+        df_ultimas, indice_ultimas = cargar_ultimas_lecturas(versiones)
+        df_ultimas = indice_ultimas.filtrar(df_ultimas, {"Cliente": filtro_cliente, "Serial Dispositivo": filtro_device})
+    else:
+        df_ultimas = ultima_lectura_por_dispositivo(df_filtered)
+
+    # Formatear las columnas de fecha antes de mostrarlas
+    df_filtered = df_filtered.assign(
+        billingDate=df_filtered["billingDate"].dt.strftime("%Y-%m-%d"),
+        readingDateTime=df_filtered["readingDateTime"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    df_ultimas = df_ultimas.assign(
+        billingDate=df_ultimas["billingDate"].dt.strftime("%Y-%m-%d"),
+        readingDateTime=df_ultimas["readingDateTime"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+    # Título de la página
+    st.title("📊 Dashboard de contadores")
+    mostrar_indicadores(df_filtered)
+    tabla_contadores(df_filtered)
+
+    st.subheader("Gráficos de Tendencia")
+    graficos_extremos(df_ultimas)
+    grafico_consumo_diario(df_filtered)
+    grafico_color(df_ultimas)
+    grafico_eficiencia(df_filtered)
+    grafico_duplex(df_ultimas)
+    grafico_scans(df_ultimas)
+
+# Guardar la medición en PERF_LOG y mostrar el panel de rendimiento a los administradores
+cerrar_medicion_pagina()
+
+# Señal para las capturas en PDF de los scripts de email (solo con ?captura=1)
+marcar_render_completo()
@@ -0,0 +1,74 @@
+import os
+import logging
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from pathlib import Path
+
+from datos.instantaneas import publicar_instantanea
+from datos.paginas import cargar_tablas, consumibles, contadores, dispositivos, monitores
+
+# -------------------------------------------------
+# Configuración del Logger para consola y archivo
+# -------------------------------------------------
+log_dir = r"D:\ProyectoSIMP\2025\DashBoardSIMP\app\logs"
+if not os.path.exists(log_dir):
+    os.makedirs(log_dir)
+log_file = os.path.join(log_dir, "instantaneas_script.log")
+
+logging.basicConfig(
+    level=logging.INFO,  # Se registran INFO, WARNING, ERROR y CRITICAL
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler(log_file, mode='a', encoding='utf-8'),
+        logging.StreamHandler()  # Muestra el log en la consola
+    ]
+)
+logger = logging.getLogger()
+
+# -------------------------------------------------
+# Cargar variables de entorno desde config.env
+# -------------------------------------------------
+env_path = Path(r"D:\ProyectoSIMP\2025\DashBoardSIMP\config.env")
+load_dotenv(dotenv_path=env_path)
+
+# -------------------------------------------------
+# Obtener configuraciones desde variables de entorno
+# -------------------------------------------------
+MONGO_URI = os.getenv("MONGO_URI")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "SDSAPI")
+# Debe coincidir con SNAPSHOT_DIR de los secrets del dashboard
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", r"D:\ProyectoSIMP\2025\DashBoardSIMP\instantaneas")
+
+# Páginas cuyos datos se publican
+PAGINAS = [dispositivos, monitores, consumibles, contadores]
+
+# -------------------------------------------------
+# Conectar a MongoDB
+# -------------------------------------------------
+client = MongoClient(MONGO_URI)
+db = client[DATABASE_NAME]
+
+# -------------------------------------------------
+# Función para armar y publicar los datos de cada página
+# -------------------------------------------------
+def publicar():
+    """Carga cada colección una sola vez, arma los datos de cada página y los publica en SNAPSHOT_DIR."""
+    colecciones = sorted({coleccion for pagina in PAGINAS for coleccion in pagina.COLECCIONES})
+    # Misma carga (proyección, filtro y fechas) que las cachés del dashboard
+    tablas = cargar_tablas(db, colecciones)
+
+    for pagina in PAGINAS:
+        df, reporte = pagina.armar_datos(tablas)
+        if df.empty:
+            logger.warning("Sin datos para %s: se mantiene la instantánea anterior.", pagina.NOMBRE)
+            continue
+        version = publicar_instantanea(SNAPSHOT_DIR, pagina.NOMBRE, df, reporte)
+        logger.info("Instantánea de %s publicada: versión %s, %d filas.", pagina.NOMBRE, version, len(df))
+
+# -------------------------------------------------
+# Ejecución del script (después de los sync_*.py y de sync_consumable_metrics.py)
+# -------------------------------------------------
+if __name__ == "__main__":
+    logger.info("Inicio de ejecución del script de instantáneas.")
+    publicar()
+    logger.info("Fin de ejecución del script.")
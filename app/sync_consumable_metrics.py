@@ -0,0 +1,111 @@
+import os
+import logging
+from datetime import datetime, timezone
+
+import pandas as pd
+from pymongo import MongoClient, ReplaceOne
+from dotenv import load_dotenv
+from pathlib import Path
+
+from datos.consultas import consumable_fields
+from datos.metricas_consumibles import calcular_metricas_consumibles
+
+# -------------------------------------------------
+# Configuración del Logger para consola y archivo
+# -------------------------------------------------
+log_dir = r"D:\ProyectoSIMP\2025\DashBoardSIMP\app\logs"
+if not os.path.exists(log_dir):
+    os.makedirs(log_dir)
+log_file = os.path.join(log_dir, "consumable_metrics_script.log")
+
+logging.basicConfig(
+    level=logging.INFO,  # Se registran INFO, WARNING, ERROR y CRITICAL
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.FileHandler(log_file, mode='a', encoding='utf-8'),
+        logging.StreamHandler()  # Muestra el log en la consola
+    ]
+)
+logger = logging.getLogger()
+
+# -------------------------------------------------
+# Cargar variables de entorno desde config.env
+# -------------------------------------------------
+env_path = Path(r"D:\ProyectoSIMP\2025\DashBoardSIMP\config.env")
+load_dotenv(dotenv_path=env_path)
+
+# -------------------------------------------------
+# Obtener configuraciones desde variables de entorno
+# -------------------------------------------------
+MONGO_URI = os.getenv("MONGO_URI")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "SDSAPI")
+CONSUMABLE_COLLECTION_NAME = "CONSUMABLE"
+DEVICE_COLLECTION_NAME = "DEVICE"
+METRICS_COLLECTION_NAME = "CONSUMABLE_METRICS"
+
+# -------------------------------------------------
+# Conectar a MongoDB
+# -------------------------------------------------
+client = MongoClient(MONGO_URI)
+db = client[DATABASE_NAME]
+consumable_collection = db[CONSUMABLE_COLLECTION_NAME]
+device_collection = db[DEVICE_COLLECTION_NAME]
+metrics_collection = db[METRICS_COLLECTION_NAME]
+
+# -------------------------------------------------
+# Función para calcular y guardar las métricas de consumibles
+# -------------------------------------------------
+def actualizar_metricas():
+    """Calcula las métricas derivadas de todos los consumibles y las guarda en CONSUMABLE_METRICS."""
+    logger.info("Iniciando cálculo de métricas de consumibles.")
+    df_consumables = pd.DataFrame(list(consumable_collection.find({}, consumable_fields)))
+    df_devices = pd.DataFrame(list(device_collection.find({}, {"deviceId": 1, "customerId": 1, "_id": 0})))
+    if df_consumables.empty or df_devices.empty:
+        logger.warning("No hay consumibles o dispositivos para calcular métricas.")
+        return
+
+    df_metricas = calcular_metricas_consumibles(df_consumables, df_devices)
+    # Reemplazar NaN por None para guardarlos como null
+    df_metricas = df_metricas.astype(object).where(df_metricas.notna(), None)
+
+    # Métricas guardadas, sin la marca: solo se reescriben las que cambiaron y así
+    # "updatedAt" indica un cambio real para el refresco incremental del dashboard
+    guardadas = {metrica["consumableId"]: metrica
+                 for metrica in metrics_collection.find({}, {"_id": 0, "updatedAt": 0})}
+
+    # MongoDB guarda las fechas con precisión de milisegundos
+    ahora = datetime.now(timezone.utc)
+    calculado = ahora.replace(microsecond=ahora.microsecond // 1000 * 1000)
+    operaciones = []
+    sin_cambios = 0
+    for metrica in df_metricas.to_dict("records"):
+        if guardadas.pop(metrica["consumableId"], None) == metrica:
+            sin_cambios += 1
+            continue
+        metrica["updatedAt"] = calculado
+        operaciones.append(ReplaceOne({"consumableId": metrica["consumableId"]}, metrica, upsert=True))
+    insertadas = actualizadas = 0
+    if operaciones:
+        result = metrics_collection.bulk_write(operaciones, ordered=False)
+        insertadas, actualizadas = result.upserted_count, result.modified_count
+
+    # Eliminar métricas de consumibles que ya no existen (las que quedaron sin calcular)
+    eliminados = 0
+    if guardadas:
+        eliminados = metrics_collection.delete_many({"consumableId": {"$in": list(guardadas)}}).deleted_count
+
+    metrics_collection.create_index("consumableId", unique=True)
+    metrics_collection.create_index("customerId")
+    metrics_collection.create_index("daysLeft")
+    metrics_collection.create_index("updatedAt")
+
+    logger.info("Métricas guardadas: %d insertadas, %d actualizadas, %d sin cambios, %d eliminadas.",
+                insertadas, actualizadas, sin_cambios, eliminados)
+
+# -------------------------------------------------
+# Ejecución del script (después de sincronizar CONSUMABLE)
+# -------------------------------------------------
+if __name__ == "__main__":
+    logger.info("Inicio de ejecución del script de métricas de consumibles.")
+    actualizar_metricas()
+    logger.info("Fin de ejecución del script.")
@@ -6,6 +6,8 @@ from pymongo import MongoClient
 from dotenv import load_dotenv
 from pathlib import Path
 
+from datos.marcas import actualizacion_con_marca
+
 # -------------------------------------------------
 # Configuración del Logger para consola y archivo
 # -------------------------------------------------
@@ -108,7 +110,7 @@ def extraer_dispositivos(token):
                             if device_id:
                                 result = device_collection.update_one(
                                     {"deviceId": device_id},
-                                    {"$set": dispositivo},
+                                    actualizacion_con_marca(dispositivo),
                                     upsert=True
                                 )
                                 if result.upserted_id:
@@ -123,7 +125,7 @@ def extraer_dispositivos(token):
                         if device_id:
                             result = device_collection.update_one(
                                 {"deviceId": device_id},
-                                {"$set": dispositivos},
+                                actualizacion_con_marca(dispositivos),
                                 upsert=True
                             )
                             if result.upserted_id:
@@ -6,6 +6,8 @@ from pymongo import MongoClient
 from dotenv import load_dotenv
 from pathlib import Path
 
+from datos.marcas import actualizacion_con_marca
+
 # -------------------------------------------------
 # Configuración del Logger para consola y archivo
 # -------------------------------------------------
@@ -107,7 +109,7 @@ def extraer_monitores(token):
                             if monitor_id:
                                 result = monitor_collection.update_one(
                                     {"monitorId": monitor_id},
-                                    {"$set": monitor},
+                                    actualizacion_con_marca(monitor),
                                     upsert=True
                                 )
                                 if result.upserted_id:  # Si se insertó un nuevo monitor
@@ -121,7 +123,7 @@ def extraer_monitores(token):
                         if monitor_id:
                             result = monitor_collection.update_one(
                                 {"monitorId": monitor_id},
-                                {"$set": monitores},
+                                actualizacion_con_marca(monitores),
                                 upsert=True
                             )
                             if result.upserted_id:  # Si se insertó un nuevo monitor